@@ -0,0 +1,181 @@
+"""User effective permissions
+
+Revision ID: 5c20e2ed047c
+Revises: 31b9d6382429
+Create Date: 2026-10-17 10:12:31.418205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "5c20e2ed047c"
+down_revision = "31b9d6382429"
+branch_labels = None
+depends_on = None
+
+EFFECTIVE_PERMISSIONS_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION grant_effective_permissions(user_ids uuid[], permission_ids uuid[])
+    RETURNS void AS $$
+        INSERT INTO user_effective_permissions (user_id, permission_id, src, type, grants)
+        SELECT grantees.user_id, permissions.id, permissions.src, permissions.type, 1
+        FROM (SELECT DISTINCT unnest(user_ids) AS user_id) AS grantees
+        CROSS JOIN permissions
+        WHERE permissions.id = ANY(permission_ids)
+        ON CONFLICT (user_id, permission_id)
+        DO UPDATE SET grants = user_effective_permissions.grants + 1;
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION revoke_effective_permissions(user_ids uuid[], permission_ids uuid[])
+    RETURNS void AS $$
+        DELETE FROM user_effective_permissions
+        WHERE user_id = ANY(user_ids) AND permission_id = ANY(permission_ids) AND grants <= 1;
+        UPDATE user_effective_permissions SET grants = grants - 1
+        WHERE user_id = ANY(user_ids) AND permission_id = ANY(permission_ids);
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION users_permissions_effective_permissions() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM revoke_effective_permissions(ARRAY[OLD.user_id], ARRAY[OLD.permission_id]);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM grant_effective_permissions(ARRAY[NEW.user_id], ARRAY[NEW.permission_id]);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION user_roles_effective_permissions() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM revoke_effective_permissions(
+                ARRAY[OLD.user_id],
+                ARRAY(SELECT permission_id FROM role_permissions WHERE role_id = OLD.role_id)
+            );
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM grant_effective_permissions(
+                ARRAY[NEW.user_id],
+                ARRAY(SELECT permission_id FROM role_permissions WHERE role_id = NEW.role_id)
+            );
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # a role permission change refreshes all the role members within a single set-based statement
+    """
+    CREATE OR REPLACE FUNCTION role_permissions_effective_permissions() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM revoke_effective_permissions(
+                ARRAY(SELECT user_id FROM user_roles WHERE role_id = OLD.role_id),
+                ARRAY[OLD.permission_id]
+            );
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM grant_effective_permissions(
+                ARRAY(SELECT user_id FROM user_roles WHERE role_id = NEW.role_id),
+                ARRAY[NEW.permission_id]
+            );
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION permissions_effective_permissions() RETURNS trigger AS $$
+    BEGIN
+        UPDATE user_effective_permissions SET src = NEW.src, type = NEW.type
+        WHERE permission_id = NEW.id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER users_permissions_effective_permissions
+    AFTER INSERT OR UPDATE OR DELETE ON users_permissions
+    FOR EACH ROW EXECUTE FUNCTION users_permissions_effective_permissions()
+    """,
+    """
+    CREATE TRIGGER user_roles_effective_permissions
+    AFTER INSERT OR UPDATE OR DELETE ON user_roles
+    FOR EACH ROW EXECUTE FUNCTION user_roles_effective_permissions()
+    """,
+    """
+    CREATE TRIGGER role_permissions_effective_permissions
+    AFTER INSERT OR UPDATE OR DELETE ON role_permissions
+    FOR EACH ROW EXECUTE FUNCTION role_permissions_effective_permissions()
+    """,
+    """
+    CREATE TRIGGER permissions_effective_permissions
+    AFTER UPDATE OF src, type ON permissions
+    FOR EACH ROW EXECUTE FUNCTION permissions_effective_permissions()
+    """,
+)
+
+BACKFILL = """
+    INSERT INTO user_effective_permissions (user_id, permission_id, src, type, grants)
+    SELECT grants.user_id, permissions.id, permissions.src, permissions.type, count(*)
+    FROM (
+        SELECT user_id, permission_id FROM users_permissions
+        UNION ALL
+        SELECT user_roles.user_id, role_permissions.permission_id
+        FROM user_roles JOIN role_permissions ON role_permissions.role_id = user_roles.role_id
+    ) AS grants
+    JOIN permissions ON permissions.id = grants.permission_id
+    GROUP BY grants.user_id, permissions.id, permissions.src, permissions.type
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_effective_permissions",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("permission_id", sa.UUID(), nullable=False),
+        sa.Column("src", sa.String(length=255), nullable=False),
+        sa.Column(
+            "type",
+            postgresql.ENUM(
+                "READ", "CREATE", "DELETE", "UPDATE", "BLOCKED", name="permissiontype", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column("grants", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["permission_id"], ["permissions.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "permission_id"),
+    )
+    op.create_index(
+        op.f("ix_user_effective_permissions_permission_id"),
+        "user_effective_permissions",
+        ["permission_id"],
+        unique=False,
+    )
+    for ddl in EFFECTIVE_PERMISSIONS_DDL:
+        op.execute(ddl)
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    for table in ("users_permissions", "user_roles", "role_permissions", "permissions"):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_effective_permissions ON {table}")
+    for function in (
+        "users_permissions_effective_permissions()",
+        "user_roles_effective_permissions()",
+        "role_permissions_effective_permissions()",
+        "permissions_effective_permissions()",
+        "grant_effective_permissions(uuid[], uuid[])",
+        "revoke_effective_permissions(uuid[], uuid[])",
+    ):
+        op.execute(f"DROP FUNCTION IF EXISTS {function}")
+    op.drop_index(
+        op.f("ix_user_effective_permissions_permission_id"), table_name="user_effective_permissions"
+    )
+    op.drop_table("user_effective_permissions")
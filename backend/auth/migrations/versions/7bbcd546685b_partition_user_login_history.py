@@ -0,0 +1,98 @@
+"""Partition user login history by months
+
+Revision ID: 7bbcd546685b
+Revises: 5c20e2ed047c
+Create Date: 2026-10-17 12:41:08.530127
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "7bbcd546685b"
+down_revision = "5c20e2ed047c"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, user_id, user_agent, ip_address, created_at, modified_at"
+# partitions are created for the months of the existing records and a few months ahead
+MONTHS_AHEAD = 3
+
+
+def add_months(month: date, months: int) -> date:
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def create_login_history_table(*args, **kwargs) -> None:
+    op.create_table(
+        "user_login_history",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("user_agent", sa.String(length=255), nullable=False),
+        sa.Column("ip_address", postgresql.INET(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("modified_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        *args,
+        **kwargs,
+    )
+
+
+def upgrade() -> None:
+    op.rename_table("user_login_history", "user_login_history_unpartitioned")
+    op.execute(
+        "ALTER TABLE user_login_history_unpartitioned "
+        "RENAME CONSTRAINT user_login_history_pkey TO user_login_history_unpartitioned_pkey"
+    )
+
+    create_login_history_table(
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_primary_key("user_login_history_pkey", "user_login_history", ["id", "created_at"])
+    op.create_index(
+        "ix_user_login_history_user_id_created_at",
+        "user_login_history",
+        ["user_id", "created_at"],
+        unique=False,
+    )
+    op.execute("CREATE TABLE user_login_history_default PARTITION OF user_login_history DEFAULT")
+
+    first_created_at = op.get_bind().scalar(
+        sa.text("SELECT min(created_at) FROM user_login_history_unpartitioned")
+    )
+    month = (first_created_at.date() if first_created_at else date.today()).replace(day=1)
+    last_month = add_months(date.today().replace(day=1), MONTHS_AHEAD)
+    while month <= last_month:
+        op.execute(
+            f"CREATE TABLE user_login_history_y{month.year:04d}m{month.month:02d} "
+            f"PARTITION OF user_login_history "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+        month = add_months(month, 1)
+
+    op.execute(
+        f"INSERT INTO user_login_history ({COLUMNS}) SELECT {COLUMNS} FROM user_login_history_unpartitioned"
+    )
+    op.drop_table("user_login_history_unpartitioned")
+
+
+def downgrade() -> None:
+    op.rename_table("user_login_history", "user_login_history_partitioned")
+    op.execute(
+        "ALTER TABLE user_login_history_partitioned "
+        "RENAME CONSTRAINT user_login_history_pkey TO user_login_history_partitioned_pkey"
+    )
+    op.execute(
+        "ALTER INDEX ix_user_login_history_user_id_created_at RENAME TO ix_user_login_history_partitioned"
+    )
+
+    create_login_history_table(sa.PrimaryKeyConstraint("id"))
+    op.execute(
+        f"INSERT INTO user_login_history ({COLUMNS}) SELECT {COLUMNS} FROM user_login_history_partitioned"
+    )
+    # partitions are dropped together with the partitioned table
+    op.drop_table("user_login_history_partitioned")
@@ -22,6 +22,7 @@ from src.auth.dependencies import (
     get_user_fingerprint,
     handle_access_token,
     handle_refresh_token,
+    validate_access_token,
 )
 from src.auth.exceptions import (
     InvalidAccessTokenError,
@@ -33,6 +34,9 @@ from src.auth.jwt import (
 from src.auth.jwt.backend import (
     JWTAuthorizationBackend,
 )
+from src.auth.jwt.keys import (
+    get_key_ring,
+)
 from src.settings.app import (
     get_app_settings,
 )
@@ -126,6 +130,29 @@ async def signout(
     return await user_service.signout(decoded_jwt=access_token)
 
 
+@router.post(
+    path="/signout-everywhere",
+    response_model=None,
+    summary="User sign out from all sessions",
+    description="Sign out user by revoking all the credentials issued to the user",
+    response_description="Empty response",
+)
+async def signout_everywhere(
+    rate_limiter: Annotated[
+        RateLimiter,
+        Depends(
+            RateLimiter(
+                times=settings.rate_limiter_times,
+                seconds=settings.rate_limiter_seconds,
+            )
+        ),
+    ],
+    access_token: Annotated[jwt_schemas.JWTDecoded, Depends(handle_access_token)],
+    user_service: Annotated[UserService, Depends(get_user_service)],
+) -> None:
+    return await user_service.signout_everywhere(decoded_jwt=access_token)
+
+
 @router.post(
     path="/token-verify",
     response_model=jwt_schemas.AccessTokenInfo,
@@ -156,15 +183,10 @@ async def verify_token(
         provided_access_token=access_token.token_string,
     )
     try:
-        decoded_access_token = await handle_access_token(
-            access_token=access_token.token_string, auth_backend=auth_backend
-        )
+        await handle_access_token(access_token=access_token.token_string, auth_backend=auth_backend)
     except InvalidAccessTokenError:
         return invalid_info
 
-    if not await auth_backend.verify_jwt_credentials_are_active(decoded_access_token):
-        return invalid_info
-
     return jwt_schemas.AccessTokenInfo(
         status=jwt_schemas.Status.VALID,
         detail=jwt_schemas.StatusDetail.VALID,
@@ -172,6 +194,72 @@ async def verify_token(
     )
 
 
+@router.post(
+    path="/token-introspect",
+    response_model=list[jwt_schemas.AccessTokenInfo],
+    summary="Batch access tokens verification",
+    description="Verify provided access token strings, revocations are checked in a single round trip",
+    response_description="Status of every provided access token in the same order",
+)
+async def introspect_tokens(
+    rate_limiter: Annotated[
+        RateLimiter,
+        Depends(
+            RateLimiter(
+                times=settings.rate_limiter_times,
+                seconds=settings.rate_limiter_seconds,
+            )
+        ),
+    ],
+    client_access_token: Annotated[
+        jwt_schemas.JWTDecoded,
+        Depends(handle_access_token),
+    ],
+    access_tokens: auth_depends.AccessTokensBatch,
+    auth_backend: Annotated[JWTAuthorizationBackend, Depends(get_auth_backend)],
+) -> list[jwt_schemas.AccessTokenInfo]:
+    decoded_tokens: dict[int, jwt_schemas.JWTDecoded] = {}
+    for position, token_string in enumerate(access_tokens.token_strings):
+        try:
+            decoded_tokens[position] = await validate_access_token(token_string)
+        except InvalidAccessTokenError:
+            continue
+
+    are_active = await auth_backend.verify_many_jwt_credentials_are_active(list(decoded_tokens.values()))
+    active_positions = {position for position, is_active in zip(decoded_tokens, are_active) if is_active}
+
+    valid_info = (jwt_schemas.Status.VALID, jwt_schemas.StatusDetail.VALID)
+    invalid_info = (jwt_schemas.Status.INVALID, jwt_schemas.StatusDetail.INVALID)
+    tokens_info = []
+    for position, token_string in enumerate(access_tokens.token_strings):
+        (status, detail) = valid_info if position in active_positions else invalid_info
+        tokens_info.append(
+            jwt_schemas.AccessTokenInfo(status=status, detail=detail, provided_access_token=token_string)
+        )
+    return tokens_info
+
+
+@router.get(
+    path="/jwks",
+    response_model=jwt_schemas.JWKS,
+    summary="JSON Web Key Set",
+    description="Public keys to verify tokens signed with an asymmetric algorithm",
+    response_description="Public keys of all signing keys that are still in use",
+)
+async def get_jwks(
+    rate_limiter: Annotated[
+        RateLimiter,
+        Depends(
+            RateLimiter(
+                times=settings.rate_limiter_times,
+                seconds=settings.rate_limiter_seconds,
+            )
+        ),
+    ],
+) -> jwt_schemas.JWKS:
+    return jwt_schemas.JWKS(**get_key_ring().jwks())
+
+
 @router.post(
     path="/token-refresh",
     response_model=jwt_schemas.JWTCredentials,
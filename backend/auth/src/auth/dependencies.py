@@ -37,6 +37,8 @@ from src.auth.jwt.service import (
 )
 from src.auth.jwt.storage import (
     JWTStorage,
+    not_revoked_tokens,
+    revoked_jtis,
 )
 from src.common.cache import (
     RedisCache,
@@ -44,12 +46,16 @@ from src.common.cache import (
 from src.common.database import (
     get_redis,
 )
+from src.settings.app import (
+    get_app_settings,
+)
 from src.users.settings import (
     get_users_settings,
 )
 
 logger = logging.getLogger(__name__)
 
+settings = get_app_settings()
 users_settings = get_users_settings()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/signin")
@@ -95,18 +101,23 @@ class RefreshToken(BaseModel):
     token_string: str = Field(pattern=r"^(?:[\w-]*\.){2}[\w-]*$")
 
 
+class AccessTokensBatch(BaseModel):
+    token_strings: list[str] = Field(min_length=1, max_length=settings.auth.introspection_batch_max_size)
+
+
 async def get_auth_backend(redis: Annotated[Redis, Depends(get_redis)]) -> JWTAuthorizationBackend:
     """Initialize JWT authorization backend that uses Redis cache as a storage."""
-    return JWTAuthorizationBackend(jwt_storage=JWTStorage(cache=RedisCache(redis_client=redis)))
+    return JWTAuthorizationBackend(
+        jwt_storage=JWTStorage(
+            cache=RedisCache(redis_client=redis),
+            not_revoked_cache=not_revoked_tokens,
+            revoked_jtis=revoked_jtis,
+        )
+    )
 
 
-async def handle_access_token(
-    access_token: Annotated[str, Depends(oauth2_scheme)],
-    auth_backend: Annotated[JWTAuthorizationBackend, Depends(get_auth_backend)],
-) -> jwt_schemas.JWTDecoded:
-    """Retrieve access token from `OAuth2PasswordBearer`, decode it
-    and verify it is active (not revoked).
-    """
+async def validate_access_token(access_token: str) -> jwt_schemas.JWTDecoded:
+    """Decode access token and validate its signature, reserved claims and type."""
     try:
         access_token_data = await validate_jwt(access_token)
     except InvalidJWTError:
@@ -120,6 +131,18 @@ async def handle_access_token(
         )
         raise InvalidAccessTokenError
 
+    return access_token_data
+
+
+async def handle_access_token(
+    access_token: Annotated[str, Depends(oauth2_scheme)],
+    auth_backend: Annotated[JWTAuthorizationBackend, Depends(get_auth_backend)],
+) -> jwt_schemas.JWTDecoded:
+    """Retrieve access token from `OAuth2PasswordBearer`, decode it
+    and verify it is active (not revoked).
+    """
+    access_token_data = await validate_access_token(access_token)
+
     is_jwt_active = await auth_backend.verify_jwt_credentials_are_active(decoded_token=access_token_data)
     if not is_jwt_active:
         logger.error("Token is revoked (not active)")
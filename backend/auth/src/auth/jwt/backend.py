@@ -1,3 +1,5 @@
+import time
+
 from src.auth.jwt import schemas as jwt_schemas
 from src.auth.jwt.service import create_tokens
 from src.auth.jwt.storage import JWTStorage
@@ -7,6 +9,16 @@ from typing_extensions import Self
 settings = get_app_settings()
 
 
+def get_tokens_expiration(decoded_token: jwt_schemas.JWTDecoded) -> tuple[int, int] | None:
+    """Get expiration timestamps of the access and refresh tokens issued together with the decoded one.
+
+    Both are written into the claims at the time of issue, older tokens have none.
+    """
+    if decoded_token.access_exp is None or decoded_token.refresh_exp is None:
+        return None
+    return (decoded_token.access_exp, decoded_token.refresh_exp)
+
+
 class JWTAuthorizationBackend:
     """Authorization backend that uses JWT."""
 
@@ -19,7 +31,14 @@ class JWTAuthorizationBackend:
     async def generate_jwt_credentials(
         self, user_identity: jwt_schemas.JWTUserIdentity
     ) -> jwt_schemas.JWTCredentials:
-        token_identity = jwt_schemas.JWTIdentity.from_user_identity(user=user_identity)
+        generation = await self.jwt_storage.get_tokens_generation(user_identity.id)
+        issued_at = int(time.time())
+        token_identity = jwt_schemas.JWTIdentity.from_user_identity(
+            user=user_identity,
+            generation=generation,
+            access_exp=issued_at + settings.auth.access_token_expires_secs,
+            refresh_exp=issued_at + settings.auth.refresh_token_expires_secs,
+        )
         (access_token, refresh_token) = await create_tokens(identity=token_identity)
         return jwt_schemas.JWTCredentials(access_token=access_token, refresh_token=refresh_token)
 
@@ -31,19 +50,52 @@ class JWTAuthorizationBackend:
         return await self.generate_jwt_credentials(user_identity=decoded_token.user)
 
     async def revoke_jwt_credentials(self, decoded_token: jwt_schemas.JWTDecoded) -> None:
-        """Revoke jwt credentials by their jtis (JWT IDs)."""
-        await self.jwt_storage.revoke_token(
-            jti=decoded_token.access_jti,
-            expire_secs=settings.auth.access_token_expires_secs,
-        )
-        await self.jwt_storage.revoke_token(
-            jti=decoded_token.refresh_jti,
-            expire_secs=settings.auth.refresh_token_expires_secs,
+        """Revoke jwt credentials by their jtis (JWT IDs) until the tokens expire."""
+        expires_at = get_tokens_expiration(decoded_token)
+        if expires_at is None:
+            # the jtis of older tokens are looked up in every bucket, only their expiration is estimated
+            issued_at = int(decoded_token.iat.timestamp())
+            expires_at = (
+                issued_at + settings.auth.access_token_expires_secs,
+                issued_at + settings.auth.refresh_token_expires_secs,
+            )
+        (access_expires_at, refresh_expires_at) = expires_at
+        # the expiration timestamps are passed as they are, so that the jtis are bucketed on the claims
+        await self.jwt_storage.revoke_tokens(
+            {decoded_token.access_jti: access_expires_at, decoded_token.refresh_jti: refresh_expires_at}
         )
         return None
 
+    async def revoke_user_jwt_credentials(self, user_id: str) -> None:
+        """Revoke all jwt credentials issued to the user so far."""
+        await self.jwt_storage.revoke_user_tokens(user_id)
+
     async def verify_jwt_credentials_are_active(self, decoded_token: jwt_schemas.JWTDecoded) -> bool:
         """Verify that all jwt credentials are active (not revoked)."""
-        tokens_jtis = (decoded_token.access_jti, decoded_token.refresh_jti)
-        are_active = [not await self.jwt_storage.is_token_revoked(jti) for jti in tokens_jtis]
-        return all(are_active)
+        return not await self.jwt_storage.is_any_token_revoked(
+            decoded_token.access_jti,
+            decoded_token.refresh_jti,
+            user_id=decoded_token.user.id,
+            generation=decoded_token.generation,
+            expires_at=get_tokens_expiration(decoded_token),
+        )
+
+    async def verify_many_jwt_credentials_are_active(
+        self, decoded_tokens: list[jwt_schemas.JWTDecoded]
+    ) -> list[bool]:
+        """Verify jwt credentials of every token are active (not revoked) within a single round trip."""
+        tokens_jtis = [jti for token in decoded_tokens for jti in (token.access_jti, token.refresh_jti)]
+        generations = [(token.user.id, token.generation) for token in decoded_tokens for _ in range(2)]
+        tokens_expiration = [get_tokens_expiration(token) for token in decoded_tokens]
+        expires_at = (
+            None
+            if None in tokens_expiration
+            else [expires_at for expiration in tokens_expiration for expires_at in expiration or ()]
+        )
+        are_revoked = await self.jwt_storage.are_tokens_revoked(
+            *tokens_jtis, generations=generations, expires_at=expires_at
+        )
+        return [
+            not (is_access_revoked or is_refresh_revoked)
+            for is_access_revoked, is_refresh_revoked in zip(are_revoked[::2], are_revoked[1::2])
+        ]
@@ -0,0 +1,105 @@
+from functools import (
+    lru_cache,
+)
+from pathlib import (
+    Path,
+)
+from typing import (
+    Any,
+)
+
+from jose import (
+    jwk,
+)
+from src.auth.jwt.exceptions import (
+    InvalidJWTError,
+)
+from src.settings.app import (
+    get_app_settings,
+)
+
+settings = get_app_settings()
+
+VerificationKey = str | dict[str, Any]
+
+
+class JWTKeyRing:
+    """Keys used to sign and verify JWTs.
+
+    HMAC algorithms (HS*) use the shared secret key. For asymmetric algorithms (RS*, ES*)
+    every `<kid>.pem` private key from the keys directory is loaded: tokens are signed with
+    the active key only, while the public parts of all keys are published as JWKS. Thus a key
+    can be rotated by adding a new one, switching the active kid and removing the old key
+    once all tokens signed with it have expired.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: str | None = None,
+        keys_dir: Path | None = None,
+        active_kid: str | None = None,
+    ) -> None:
+        self.algorithm = algorithm
+        self.secret_key = secret_key
+        self.active_kid = active_kid
+
+        self.private_keys: dict[str, str] = {}
+        self.public_keys: dict[str, dict[str, Any]] = {}
+
+        if self.is_symmetric:
+            if not secret_key:
+                raise ValueError(f"Secret key is required for {algorithm} algorithm")
+        else:
+            self._load_keys(keys_dir)
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm.startswith("HS")
+
+    def get_signing_key(self) -> tuple[str | None, str]:
+        """Get kid (key id) and key to sign new tokens with."""
+        if self.is_symmetric:
+            return None, self.secret_key  # type: ignore
+        return self.active_kid, self.private_keys[self.active_kid]  # type: ignore
+
+    def get_verification_key(self, kid: str | None) -> VerificationKey:
+        """Get key to verify a token signed with the given kid (key id)."""
+        if self.is_symmetric:
+            return self.secret_key  # type: ignore
+
+        if kid is None or kid not in self.public_keys:
+            raise InvalidJWTError
+        return self.public_keys[kid]
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        """Public keys in JWK Set format."""
+        return {"keys": list(self.public_keys.values())}
+
+    def _load_keys(self, keys_dir: Path | None) -> None:
+        if keys_dir is None:
+            raise ValueError(f"Keys directory is required for {self.algorithm} algorithm")
+
+        for path in sorted(keys_dir.glob("*.pem")):
+            kid = path.stem
+            private_key = path.read_text()
+
+            public_key = jwk.construct(private_key, algorithm=self.algorithm).public_key().to_dict()
+            public_key.update({"kid": kid, "use": "sig"})
+
+            self.private_keys[kid] = private_key
+            self.public_keys[kid] = public_key
+
+        if self.active_kid not in self.private_keys:
+            raise ValueError(f"Active key '{self.active_kid}' was not found in {keys_dir}")
+
+
+@lru_cache(maxsize=1)
+def get_key_ring() -> JWTKeyRing:
+    keys_dir = settings.auth.jwt_keys_dir
+    return JWTKeyRing(
+        algorithm=settings.auth.jwt_encoding_algorithm,
+        secret_key=settings.auth.jwt_secret_key,
+        keys_dir=Path(keys_dir) if keys_dir else None,
+        active_kid=settings.auth.jwt_active_kid,
+    )
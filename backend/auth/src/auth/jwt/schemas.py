@@ -4,6 +4,7 @@ from enum import StrEnum
 
 from pydantic import Field, BaseModel
 from src.common import schemas as common_schemas
+from src.permissions.encoding import EncodedPermissions
 from src.users import schemas as users_schemas
 from typing_extensions import Self
 
@@ -39,9 +40,14 @@ class JWTCredentials(
     ...
 
 
+class JWKS(BaseModel):
+    keys: list[dict[str, str]]
+
+
 class JWTUserIdentity(BaseModel):
     id: str
-    permissions: dict[str, list[str]]
+    # accepts a mapping of src to the list of permissions as well
+    permissions: EncodedPermissions
     role: str
 
     @classmethod
@@ -53,16 +59,39 @@ class JWTIdentity(BaseModel):
     user: JWTUserIdentity
     access_jti: str
     refresh_jti: str
+    # generation of the user's tokens at the time of issue
+    generation: int = 0
+    # expiration timestamps of both tokens, so that either token locates the revoked jtis of the pair
+    access_exp: int | None = None
+    refresh_exp: int | None = None
 
     @classmethod
-    def from_user_identity(cls, user: JWTUserIdentity) -> Self:
-        return cls(user=user, access_jti=str(uuid.uuid4()), refresh_jti=str(uuid.uuid4()))
+    def from_user_identity(
+        cls,
+        user: JWTUserIdentity,
+        generation: int = 0,
+        access_exp: int | None = None,
+        refresh_exp: int | None = None,
+    ) -> Self:
+        return cls(
+            user=user,
+            access_jti=str(uuid.uuid4()),
+            refresh_jti=str(uuid.uuid4()),
+            generation=generation,
+            access_exp=access_exp,
+            refresh_exp=refresh_exp,
+        )
 
 
 class JWTDecoded(BaseModel):
     user: JWTUserIdentity
     access_jti: str
     refresh_jti: str
+    # tokens issued before the generation was introduced have none
+    generation: int = 0
+    # tokens issued before the expirations of the pair were introduced have none
+    access_exp: int | None = None
+    refresh_exp: int | None = None
     type: str
     exp: datetime
     iat: datetime
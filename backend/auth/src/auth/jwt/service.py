@@ -12,9 +12,13 @@ from src.auth.jwt import (
 from src.auth.jwt.exceptions import (
     InvalidJWTError,
 )
+from src.auth.jwt.keys import (
+    get_key_ring,
+)
 from src.auth.jwt.utils import (
     decode_jwt,
     encode_jwt,
+    get_unverified_kid,
 )
 from src.settings.app import (
     get_app_settings,
@@ -28,8 +32,9 @@ async def validate_jwt(
 ) -> jwt_schemas.JWTDecoded:
     """Validate a JWT string's signature and validate reserved claims."""
     try:
+        key = get_key_ring().get_verification_key(kid=get_unverified_kid(token))
         decoded_token_data = await decode_jwt(
-            token=token, key=settings.auth.jwt_secret_key, algorithms=(settings.auth.jwt_encoding_algorithm,)
+            token=token, key=key, algorithms=(settings.auth.jwt_encoding_algorithm,)
         )
     except (jose_exc.JWEError, jose_exc.JWTError) as err:
         raise InvalidJWTError from err
@@ -41,19 +46,23 @@ async def create_tokens(
     identity: jwt_schemas.JWTIdentity,
 ) -> list[str]:
     """Create access and refresh tokens pair with the same identity."""
+    (key_id, key) = get_key_ring().get_signing_key()
     tokens = (
-        ("access", settings.auth.access_token_expires_secs),
-        ("refresh", settings.auth.refresh_token_expires_secs),
+        ("access", settings.auth.access_token_expires_secs, identity.access_exp),
+        ("refresh", settings.auth.refresh_token_expires_secs, identity.refresh_exp),
     )
     created_tokens = []
-    for token_type, token_expire_secs in tokens:
+    for token_type, token_expire_secs, token_exp in tokens:
         created_tokens.append(
             await create_token(
                 data_to_encode=identity,
                 token_type=token_type,
-                secret_key=settings.auth.jwt_secret_key,
-                expires_delta=timedelta(token_expire_secs),
+                secret_key=key,
+                expires_delta=timedelta(seconds=token_expire_secs),
                 algorithm=settings.auth.jwt_encoding_algorithm,
+                # the expiration of the identity is the one revoked jtis are bucketed on
+                additional_claims=None if token_exp is None else {"exp": token_exp},
+                key_id=key_id,
             )
         )
     return created_tokens
@@ -66,6 +75,7 @@ async def create_token(
     expires_delta: timedelta,
     algorithm: str,
     additional_claims: dict[str, Any] | None = None,
+    key_id: str | None = None,
 ) -> str:
     return await encode_jwt(
         claims=data_to_encode.model_dump(),
@@ -74,4 +84,5 @@ async def create_token(
         token_type=token_type,
         algorithm=algorithm,
         additional_claims=additional_claims,
+        headers={"kid": key_id} if key_id else None,
     )
@@ -1,18 +1,327 @@
+import time
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from collections import (
+    defaultdict,
+)
+from typing import (
+    Any,
+    Sequence,
+)
+
+import orjson
+
 from src.common.cache import (
     AbstractCache,
+    AbstractCacheBatch,
+)
+from src.settings.app import (
+    get_app_settings,
+)
+from src.settings.auth import (
+    RevokedJtisLayout,
+)
+
+settings = get_app_settings()
+
+
+class NotRevokedTokensCache:
+    """Process local cache of jtis (JWT ids) recently checked not to be revoked.
+
+    A jti revoked by another process may still be considered active for up to `ttl_sec`.
+    """
+
+    def __init__(self, ttl_sec: float, max_size: int) -> None:
+        self.ttl_sec = ttl_sec
+        self.max_size = max_size
+        self._expires_at: dict[str, float] = {}
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.ttl_sec > 0 and self.max_size > 0
+
+    def contains_all(self, *jtis: str) -> bool:
+        now = time.monotonic()
+        return all(self._expires_at.get(jti, 0) > now for jti in jtis)
+
+    def add(self, *jtis: str) -> None:
+        if not self.is_enabled:
+            return
+
+        now = time.monotonic()
+        if len(self._expires_at) + len(jtis) > self.max_size:
+            self._expires_at = {
+                jti: expires_at for jti, expires_at in self._expires_at.items() if expires_at > now
+            }
+            if len(self._expires_at) + len(jtis) > self.max_size:
+                self._expires_at.clear()
+
+        for jti in jtis:
+            self._expires_at[jti] = now + self.ttl_sec
+
+    def discard(self, *jtis: str) -> None:
+        for jti in jtis:
+            self._expires_at.pop(jti, None)
+
+    def clear(self) -> None:
+        self._expires_at.clear()
+
+
+not_revoked_tokens = NotRevokedTokensCache(
+    ttl_sec=settings.auth.not_revoked_tokens_cache_ttl_sec,
+    max_size=settings.auth.not_revoked_tokens_cache_max_size,
 )
 
 
+class RevokedJtis(ABC):
+    """Layout of the revoked jtis (JWT ids) in the cache.
+
+    Commands are queued into a batch shared with other commands, so that checks
+    and revocations still take a single round trip.
+    """
+
+    @abstractmethod
+    def queue_revoke(self, batch: AbstractCacheBatch, expires_at_by_jti: dict[str, int], now: int) -> None:
+        """Queue saving of jtis until their tokens expire."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def queue_check(
+        self, batch: AbstractCacheBatch, jtis: Sequence[str], expires_at: Sequence[int] | None, now: int
+    ) -> int:
+        """Queue check of jtis and get the number of queued commands.
+
+        `expires_at` holds expiration timestamps of the jtis tokens, when known.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_revoked(
+        self, results: list[Any], jtis: Sequence[str], expires_at: Sequence[int] | None
+    ) -> list[bool]:
+        """Get whether every jti is revoked from the results of the queued check."""
+        raise NotImplementedError
+
+
+class RevokedJtisKeys(RevokedJtis):
+    """Key per revoked jti expiring together with its token."""
+
+    def queue_revoke(self, batch: AbstractCacheBatch, expires_at_by_jti: dict[str, int], now: int) -> None:
+        for jti, expires_at in expires_at_by_jti.items():
+            batch.set(key=jti, data="", timeout_secs=max(expires_at - now, 1))
+
+    def queue_check(
+        self, batch: AbstractCacheBatch, jtis: Sequence[str], expires_at: Sequence[int] | None, now: int
+    ) -> int:
+        for jti in jtis:
+            batch.exist(jti)
+        return len(jtis)
+
+    def get_revoked(
+        self, results: list[Any], jtis: Sequence[str], expires_at: Sequence[int] | None
+    ) -> list[bool]:
+        return [bool(exists) for exists in results]
+
+
+class RevokedJtisBuckets(RevokedJtis):
+    """Set of revoked jtis per time bucket of their tokens expiration.
+
+    A bucket expires as a whole once all of its tokens have expired, which takes far less memory
+    than a key per jti. Given the expiration of a token, its jti is looked up in a single bucket,
+    otherwise in every bucket that may still hold a live token.
+    """
+
+    def __init__(
+        self, bucket_secs: int, max_token_expires_secs: int, key_prefix: str = "auth:revoked-jtis"
+    ) -> None:
+        self.bucket_secs = bucket_secs
+        self.max_token_expires_secs = max_token_expires_secs
+        self.key_prefix = key_prefix
+
+    def get_bucket(self, expires_at: int) -> int:
+        return expires_at // self.bucket_secs
+
+    def get_bucket_key(self, bucket: int) -> str:
+        return f"{self.key_prefix}:{bucket}"
+
+    def queue_revoke(self, batch: AbstractCacheBatch, expires_at_by_jti: dict[str, int], now: int) -> None:
+        jtis_by_bucket = self.__group_by_bucket(list(expires_at_by_jti), list(expires_at_by_jti.values()))
+        for bucket, jtis in jtis_by_bucket.items():
+            batch.set_add(self.get_bucket_key(bucket), *jtis)
+            batch.expire_at(self.get_bucket_key(bucket), (bucket + 1) * self.bucket_secs)
+
+    def queue_check(
+        self, batch: AbstractCacheBatch, jtis: Sequence[str], expires_at: Sequence[int] | None, now: int
+    ) -> int:
+        if expires_at is None:
+            buckets = range(self.get_bucket(now), self.get_bucket(now + self.max_token_expires_secs) + 1)
+            for bucket in buckets:
+                batch.set_contains_many(self.get_bucket_key(bucket), *jtis)
+            return len(buckets)
+
+        jtis_by_bucket = self.__group_by_bucket(jtis, expires_at)
+        for bucket, bucket_jtis in jtis_by_bucket.items():
+            batch.set_contains_many(self.get_bucket_key(bucket), *bucket_jtis)
+        return len(jtis_by_bucket)
+
+    def get_revoked(
+        self, results: list[Any], jtis: Sequence[str], expires_at: Sequence[int] | None
+    ) -> list[bool]:
+        if expires_at is None:
+            return [any(is_member) for is_member in zip(*results)]
+
+        is_revoked_by_jti = {}
+        for bucket_jtis, are_members in zip(self.__group_by_bucket(jtis, expires_at).values(), results):
+            is_revoked_by_jti.update(zip(bucket_jtis, map(bool, are_members)))
+        return [is_revoked_by_jti[jti] for jti in jtis]
+
+    def __group_by_bucket(self, jtis: Sequence[str], expires_at: Sequence[int]) -> dict[int, list[str]]:
+        jtis_by_bucket: dict[int, list[str]] = defaultdict(list)
+        for jti, jti_expires_at in zip(jtis, expires_at):
+            jtis_by_bucket[self.get_bucket(jti_expires_at)].append(jti)
+        return jtis_by_bucket
+
+
+def get_revoked_jtis(layout: RevokedJtisLayout) -> RevokedJtis:
+    if layout == RevokedJtisLayout.buckets:
+        return RevokedJtisBuckets(
+            bucket_secs=settings.auth.revoked_jtis_bucket_secs,
+            max_token_expires_secs=max(
+                settings.auth.access_token_expires_secs, settings.auth.refresh_token_expires_secs
+            ),
+        )
+    return RevokedJtisKeys()
+
+
+revoked_jtis = get_revoked_jtis(settings.auth.revoked_jtis_layout)
+
+
 class JWTStorage:
-    """JWT storage that contains revoked tokens."""
+    """JWT storage that contains revoked tokens.
+
+    Revoked jtis are looked up in the layout of `revoked_jtis`. Besides, every revoked jti is kept
+    in a sorted set scored by its expiration timestamp and announced on a pub/sub channel,
+    so that other services can hold a local replica of the revoked tokens.
 
-    def __init__(self, cache: AbstractCache) -> None:
+    All the tokens of a user are revoked at once by incrementing the user's tokens generation
+    kept in a hash: tokens carry the generation they were issued at and the ones issued
+    at an older generation are considered revoked.
+    """
+
+    def __init__(
+        self,
+        cache: AbstractCache,
+        not_revoked_cache: NotRevokedTokensCache | None = None,
+        revoked_jtis: RevokedJtis | None = None,
+    ) -> None:
         self.cache = cache
+        self.not_revoked_cache = not_revoked_cache or NotRevokedTokensCache(ttl_sec=0, max_size=0)
+        self.revoked_jtis = revoked_jtis or RevokedJtisKeys()
 
     async def is_token_revoked(self, jti: str) -> bool:
         """Check that jti (JWT id) is revoked."""
-        return bool(await self.cache.exist(jti))
+        return await self.is_any_token_revoked(jti)
+
+    async def is_any_token_revoked(
+        self,
+        *jtis: str,
+        user_id: str | None = None,
+        generation: int = 0,
+        expires_at: Sequence[int] | None = None,
+    ) -> bool:
+        """Check that any of jtis (JWT ids) is revoked within a single round trip at most.
+
+        Given the user id and the generation the tokens were issued at, the tokens are revoked
+        as well if all the user's tokens have been revoked since.
+        """
+        if self.not_revoked_cache.contains_all(*jtis):
+            return False
+
+        generations = None if user_id is None else [(user_id, generation)] * len(jtis)
+        is_revoked = any(await self.are_tokens_revoked(*jtis, generations=generations, expires_at=expires_at))
+
+        if not is_revoked:
+            self.not_revoked_cache.add(*jtis)
+        return is_revoked
+
+    async def are_tokens_revoked(
+        self,
+        *jtis: str,
+        generations: list[tuple[str, int]] | None = None,
+        expires_at: Sequence[int] | None = None,
+    ) -> list[bool]:
+        """Check every jti (JWT id) is revoked within a single round trip.
+
+        `generations` holds the user id and the generation every jti was issued at,
+        `expires_at` holds the expiration timestamp of every jti token.
+        """
+        if not jtis:
+            return []
+
+        batch = self.cache.batch()
+        checks_count = self.revoked_jtis.queue_check(batch, jtis, expires_at, now=int(time.time()))
+        if generations is not None:
+            user_ids = (user_id for user_id, _ in generations)
+            batch.hash_get_many(settings.auth.tokens_generations_key, *user_ids)
+        results = await batch.execute()
+
+        are_revoked = self.revoked_jtis.get_revoked(results[:checks_count], jtis, expires_at)
+        if generations is None:
+            return are_revoked
+
+        return [
+            is_revoked or generation < int(current_generation or 0)
+            for is_revoked, (_, generation), current_generation in zip(
+                are_revoked, generations, results[checks_count]
+            )
+        ]
+
+    async def get_tokens_generation(self, user_id: str) -> int:
+        """Get the generation new tokens of the user are issued at."""
+        return int(await self.cache.hash_get(settings.auth.tokens_generations_key, user_id) or 0)
+
+    async def revoke_user_tokens(self, user_id: str) -> int:
+        """Revoke all the tokens issued to the user so far and announce it to the replicas.
+
+        Returns the generation new tokens of the user are issued at.
+        """
+        generation = await self.cache.hash_increment(settings.auth.tokens_generations_key, user_id)
+        # jtis of the user are unknown, the local cache is short-lived anyway
+        self.not_revoked_cache.clear()
+        await self.cache.publish(
+            channel=settings.auth.revocation_channel,
+            message=orjson.dumps({"user": user_id, "generation": generation}),
+        )
+        return generation
+
+    async def revoke_token(self, jti: str, expires_at: int) -> bool:
+        """Save revoked jti (JWT id) to the cache and announce it to the replicas."""
+        (is_revoked,) = await self.revoke_tokens({jti: expires_at})
+        return is_revoked
+
+    async def revoke_tokens(self, expires_at_by_jti: dict[str, int]) -> list[bool]:
+        """Save revoked jtis (JWT ids) and announce them to the replicas within a single round trip.
+
+        `expires_at_by_jti` holds the expiration timestamp of every jti token, the jtis are kept
+        until then and looked up by the same timestamp.
+        """
+        self.not_revoked_cache.discard(*expires_at_by_jti)
+
+        now = int(time.time())
+        batch = self.cache.batch()
+        self.revoked_jtis.queue_revoke(batch, expires_at_by_jti, now=now)
+        batch.sorted_set_add(key=settings.auth.revoked_tokens_key, mapping=expires_at_by_jti)
+        batch.sorted_set_remove_by_score(
+            key=settings.auth.revoked_tokens_key, min_score=float("-inf"), max_score=now
+        )
+        for jti, expires_at in expires_at_by_jti.items():
+            batch.publish(
+                channel=settings.auth.revocation_channel,
+                message=orjson.dumps({"jti": jti, "exp": expires_at}),
+            )
+        # commands of a failed batch raise errors
+        await batch.execute()
 
-    async def revoke_token(self, jti: str, expire_secs: int) -> bool:
-        """Save revoked jti (JWT id) to the cache."""
-        return await self.cache.set(key=jti, data="", timeout_secs=expire_secs)
+        return [True] * len(expires_at_by_jti)
@@ -19,6 +19,7 @@ async def encode_jwt(
     token_type: str,
     algorithm: str,
     additional_claims: dict[str, Any] | None = None,
+    headers: dict[str, Any] | None = None,
 ) -> str:
     now = datetime.utcnow()
     data_to_encode = claims.copy()
@@ -29,10 +30,16 @@ async def encode_jwt(
         claims=data_to_encode,
         key=key,
         algorithm=algorithm,
+        headers=headers,
     )
 
 
 async def decode_jwt(
-    token: str, key: str, algorithms: Container[str]
+    token: str, key: str | dict[str, Any], algorithms: Container[str]
 ) -> dict[str, Any,]:
     return jose_jwt.decode(token=token, key=key, algorithms=algorithms)
+
+
+def get_unverified_kid(token: str) -> str | None:
+    """Get kid (key id) from the token header without verifying the token."""
+    return jose_jwt.get_unverified_header(token).get("kid")
@@ -0,0 +1,141 @@
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from redis import asyncio as aioredis
+from sqlalchemy import event
+
+from src.auth.jwt.storage import RevokedJtis, RevokedJtisBuckets, RevokedJtisKeys
+from src.cli.database import get_async_db_session
+from src.common.cache import RedisCache
+from src.settings.app import get_app_settings
+from src.settings.auth import RevokedJtisLayout
+from src.users.hashing import password_hashing_pool
+from src.users.repositories import PostgresUserRepository
+
+settings = get_app_settings()
+
+BENCHMARK_BUCKETS_KEY_PREFIX = "benchmark:revoked-jtis"
+
+
+@dataclass(frozen=True)
+class SigninBenchmark:
+    # database statements per signin
+    round_trips: float
+    p50_ms: float
+    p99_ms: float
+
+
+async def benchmark_signin(username: str, password: str, requests: int) -> dict[str, SigninBenchmark]:
+    """Measure signin database round trips and latency of the previous and the current signin paths.
+
+    Password hashing is a part of both, the signin record is written aside and not measured.
+    """
+    async with get_async_db_session() as db:
+        repository = PostgresUserRepository(db)
+        statements_count = 0
+
+        def count_statement(*args) -> None:
+            nonlocal statements_count
+            statements_count += 1
+
+        async def signin_by_user_and_password() -> None:
+            (user,) = await repository.filter_by(username=username)
+            await repository.check_password(user.id, password)
+
+        async def signin_by_credentials() -> None:
+            await repository.authenticate(username, password)
+
+        signins: dict[str, Callable[[], Awaitable[None]]] = {
+            "user, then password": signin_by_user_and_password,
+            "credentials": signin_by_credentials,
+        }
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            benchmarks = {}
+            for name, signin in signins.items():
+                # warm up the connection and the hashing workers
+                await signin()
+
+                statements_count = 0
+                durations_ms = []
+                for _ in range(requests):
+                    started_at = time.perf_counter()
+                    await signin()
+                    durations_ms.append((time.perf_counter() - started_at) * 1000)
+
+                percentiles = statistics.quantiles(durations_ms, n=100)
+                benchmarks[name] = SigninBenchmark(
+                    round_trips=statements_count / requests, p50_ms=percentiles[49], p99_ms=percentiles[98]
+                )
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+            password_hashing_pool.shutdown()
+
+    return benchmarks
+
+
+@dataclass(frozen=True)
+class RevokedJtisMemory:
+    keys: int
+    used_memory_bytes: int
+
+    def bytes_per_revocation(self, revocations: int) -> float:
+        return self.used_memory_bytes / revocations
+
+
+async def benchmark_revoked_jtis_memory(
+    revocations: int, batch_size: int = 10_000
+) -> dict[RevokedJtisLayout, RevokedJtisMemory]:
+    """Measure Redis memory taken by the revoked jtis in every layout.
+
+    Revoked tokens expire uniformly within the refresh token lifetime, as they do when users sign out
+    over time. Jtis of a layout are deleted once the layout is measured.
+    """
+    max_expires_secs = max(settings.auth.access_token_expires_secs, settings.auth.refresh_token_expires_secs)
+    layouts: dict[RevokedJtisLayout, RevokedJtis] = {
+        RevokedJtisLayout.keys: RevokedJtisKeys(),
+        RevokedJtisLayout.buckets: RevokedJtisBuckets(
+            bucket_secs=settings.auth.revoked_jtis_bucket_secs,
+            max_token_expires_secs=max_expires_secs,
+            key_prefix=BENCHMARK_BUCKETS_KEY_PREFIX,
+        ),
+    }
+    client = aioredis.from_url(settings.redis.dsn)
+    cache = RedisCache(redis_client=client)
+
+    benchmarks = {}
+    try:
+        for layout, revoked_jtis in layouts.items():
+            keys_before = await client.dbsize()
+            used_memory_before = (await client.info("memory"))["used_memory"]
+
+            now = int(time.time())
+            jtis = [str(uuid4()) for _ in range(revocations)]
+            for i in range(0, revocations, batch_size):
+                batch = cache.batch()
+                expires_at_by_jti = {
+                    jti: now + random.randint(1, max_expires_secs) for jti in jtis[i : i + batch_size]
+                }
+                revoked_jtis.queue_revoke(batch, expires_at_by_jti, now=now)
+                await batch.execute()
+
+            benchmarks[layout] = RevokedJtisMemory(
+                keys=await client.dbsize() - keys_before,
+                used_memory_bytes=(await client.info("memory"))["used_memory"] - used_memory_before,
+            )
+
+            if layout == RevokedJtisLayout.keys:
+                keys = jtis
+            else:
+                keys = [key async for key in client.scan_iter(match=f"{BENCHMARK_BUCKETS_KEY_PREFIX}:*")]
+            for i in range(0, len(keys), batch_size):
+                await client.delete(*keys[i : i + batch_size])
+    finally:
+        await client.close()
+
+    return benchmarks
@@ -1,4 +1,11 @@
 import asyncio
+import time
+from datetime import (
+    date,
+)
+from pathlib import (
+    Path,
+)
 from typing import (
     Annotated,
 )
@@ -14,9 +21,29 @@ from src.auth.exceptions import (
 from src.cli import (
     messages as msg,
 )
+from src.cli.benchmark import (
+    benchmark_revoked_jtis_memory,
+    benchmark_signin,
+)
+from src.cli.import_users import (
+    BatchReport,
+    ImportFormat,
+    import_users,
+)
+from src.cli.signin_history import (
+    maintain_signin_history_partitions,
+)
 from src.cli.superuser import (
     create_user_with_internal_permissions,
 )
+from src.settings.app import (
+    get_app_settings,
+)
+from src.users import (
+    utils as users_utils,
+)
+
+settings = get_app_settings()
 
 app = typer.Typer(name="Create superuser with all permissions granted")
 
@@ -64,5 +91,150 @@ def create_superuser(
     typer.echo(success_permissions_msg.format(permissions=created_role_name))
 
 
+@app.command()
+def calibrate_password_hashing(
+    target_ms: Annotated[float, typer.Option(min=1)] = 50,
+    samples: Annotated[int, typer.Option(min=1)] = 5,
+) -> None:
+    """Choose the number of pbkdf2 rounds to hash a password in about `target_ms` on this machine."""
+    rounds = users_utils.calibrate_rounds(target_duration_sec=target_ms / 1000, samples=samples)
+
+    typer.echo(msg.HASHING_BENCHMARK_HEADER.format(rounds="rounds", duration="hashing time"))
+    default_rounds = users_utils.pbkdf2_sha256.default_rounds
+    for benchmark_rounds in sorted({rounds // 2, rounds, rounds * 2, default_rounds}):
+        duration_sec = users_utils.measure_hashing_duration(benchmark_rounds, samples)
+        typer.echo(msg.HASHING_BENCHMARK_ROW.format(rounds=benchmark_rounds, duration_ms=duration_sec * 1000))
+
+    success_msg = typer.style(msg.HASHING_ROUNDS_CALIBRATED, fg=typer.colors.GREEN, bold=True)
+    typer.echo(
+        success_msg.format(target_ms=target_ms, env_var="AUTH__AUTH_PASSWORD_HASHING_ROUNDS", rounds=rounds)
+    )
+
+
+@app.command()
+def benchmark_signin_queries(
+    username: Annotated[str, typer.Option()],
+    requests: Annotated[int, typer.Option(min=2)] = 200,
+) -> None:
+    """Compare signin round trips and latency of selecting the user and then its password
+    with selecting the credentials at once.
+    """
+    password = typer.prompt(msg.ENTER_PASSWORD, hide_input=True)
+    benchmarks = asyncio.run(benchmark_signin(username=username, password=password, requests=requests))
+
+    typer.echo(
+        msg.SIGNIN_BENCHMARK_HEADER.format(name="signin", round_trips="round trips", p50="p50", p99="p99")
+    )
+    for name, benchmark in benchmarks.items():
+        typer.echo(
+            msg.SIGNIN_BENCHMARK_ROW.format(
+                name=name, round_trips=benchmark.round_trips, p50_ms=benchmark.p50_ms, p99_ms=benchmark.p99_ms
+            )
+        )
+
+
+@app.command()
+def benchmark_revoked_jtis_memory_usage(
+    revocations: Annotated[int, typer.Option(min=1)] = 1_000_000,
+) -> None:
+    """Compare Redis memory taken by revoked jtis kept as a key per jti and as sets per expiration bucket.
+
+    Run against a Redis instance without other writers, the used memory is measured for the whole instance.
+    """
+    benchmarks = asyncio.run(benchmark_revoked_jtis_memory(revocations=revocations))
+
+    typer.echo(
+        msg.REVOKED_JTIS_BENCHMARK_HEADER.format(
+            layout="layout", keys="keys", memory="memory", per_revocation="per revocation"
+        )
+    )
+    for layout, benchmark in benchmarks.items():
+        typer.echo(
+            msg.REVOKED_JTIS_BENCHMARK_ROW.format(
+                layout=layout,
+                keys=benchmark.keys,
+                memory_mb=benchmark.used_memory_bytes / 2**20,
+                bytes_per_revocation=benchmark.bytes_per_revocation(revocations),
+            )
+        )
+
+
+@app.command(name="import-users")
+def import_users_from_file(
+    path: Annotated[Path, typer.Argument(exists=True, dir_okay=False, readable=True)],
+    import_format: Annotated[ImportFormat | None, typer.Option("--format")] = None,
+    batch_size: Annotated[int, typer.Option(min=1)] = 5000,
+    workers: Annotated[int | None, typer.Option(min=1)] = None,
+    restart: Annotated[bool, typer.Option(help="Ignore the checkpoint of the previous import")] = False,
+) -> None:
+    """Import users from a CSV or NDJSON file.
+
+    Rows have username, password, first_name, last_name and optional email, role
+    and permissions (`src:type` separated by spaces in CSV or a list in NDJSON).
+    """
+    import_format = import_format or (ImportFormat.csv if path.suffix == ".csv" else ImportFormat.ndjson)
+    totals = {"imported": 0, "skipped": 0, "rejected": 0}
+
+    def on_batch(report: BatchReport) -> None:
+        totals["imported"] += report.result.imported
+        totals["skipped"] += report.result.skipped
+        totals["rejected"] += report.rejected
+        typer.echo(
+            msg.IMPORT_BATCH_REPORT.format(
+                batch=report.number,
+                imported=report.result.imported,
+                skipped=report.result.skipped,
+                rejected=report.rejected,
+                unknown_roles=report.result.unknown_roles,
+                unknown_permissions=report.result.unknown_permissions,
+                users_per_sec=report.users_per_sec,
+            )
+        )
+
+    started_at = time.perf_counter()
+    try:
+        asyncio.run(
+            import_users(
+                path=path,
+                import_format=import_format,
+                batch_size=batch_size,
+                workers=workers,
+                restart=restart,
+                on_batch=on_batch,
+            )
+        )
+    except ValueError as err:
+        typer.echo(err, err=True)
+        raise typer.Exit(code=1)
+
+    duration_sec = time.perf_counter() - started_at
+    success_msg = typer.style(msg.USERS_IMPORTED, fg=typer.colors.GREEN, bold=True)
+    typer.echo(
+        success_msg.format(
+            **totals,
+            users_per_sec=(totals["imported"] + totals["skipped"] + totals["rejected"]) / duration_sec,
+        )
+    )
+
+
+@app.command()
+def maintain_signin_history(
+    months_ahead: Annotated[int, typer.Option(min=0)] = settings.auth.signin_history_partitions_ahead,
+    retention_months: Annotated[int, typer.Option(min=1)] = settings.auth.signin_history_retention_months,
+) -> None:
+    """Create partitions of the signin history ahead of time and drop the expired ones.
+
+    Meant to be run periodically, e.g. daily by cron.
+    """
+    created_partitions, dropped_partitions = asyncio.run(
+        maintain_signin_history_partitions(
+            today=date.today(), months_ahead=months_ahead, retention_months=retention_months
+        )
+    )
+
+    typer.echo(msg.SIGNIN_HISTORY_PARTITIONS_CREATED.format(partitions=", ".join(created_partitions) or "-"))
+    typer.echo(msg.SIGNIN_HISTORY_PARTITIONS_DROPPED.format(partitions=", ".join(dropped_partitions) or "-"))
+
+
 if __name__ == "__main__":
     app()
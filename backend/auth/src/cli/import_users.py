@@ -0,0 +1,206 @@
+import asyncio
+import csv
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator
+
+import orjson
+import pydantic
+
+from src.cli.database import get_async_db_session
+from src.settings.app import get_app_settings
+from src.users import utils as users_utils
+from src.users.bulk_import import ImportedBatch, ImportedUser, UsersImporter
+
+settings = get_app_settings()
+
+
+class ImportFormat(StrEnum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+@dataclass(frozen=True)
+class BatchReport:
+    number: int
+    result: ImportedBatch
+    rejected: int
+    duration_sec: float
+
+    @property
+    def users_per_sec(self) -> float:
+        return (self.result.imported + self.result.skipped) / self.duration_sec if self.duration_sec else 0.0
+
+
+@dataclass(frozen=True)
+class UndecodableRow:
+    error: str
+
+
+def read_rows(path: Path, import_format: ImportFormat) -> Iterator[tuple[int, Any]]:
+    """Read rows of the file with their line numbers, a line that is not JSON is read as `UndecodableRow`."""
+    with path.open(encoding="utf-8", newline="") as file:
+        if import_format == ImportFormat.csv:
+            # cells beyond the header are kept under the `None` key
+            reader = csv.DictReader(file)
+            for row in reader:
+                # the last line of the row, quoted values may span several lines
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, orjson.loads(line)
+                except orjson.JSONDecodeError as err:
+                    yield line_number, UndecodableRow(error=f"Invalid JSON: {err}")
+
+
+class ImportCheckpoint:
+    """Number of the last imported batch saved next to the imported file."""
+
+    def __init__(self, path: Path, batch_size: int) -> None:
+        self.path = path
+        self.batch_size = batch_size
+
+    def load(self) -> tuple[int, int | None]:
+        """Get the number of the last imported batch and the size of the rejects file at the time."""
+        if not self.path.exists():
+            return 0, 0
+
+        checkpoint = orjson.loads(self.path.read_bytes())
+        if checkpoint["batch_size"] != self.batch_size:
+            raise ValueError(
+                f"{self.path} was saved for batches of {checkpoint['batch_size']} users, "
+                f"resume with the same batch size or restart the import"
+            )
+        # checkpoints saved before the size of the rejects file was kept leave the file as it is
+        return checkpoint["batch"], checkpoint.get("rejects_size")
+
+    def save(self, batch_number: int, rejects_size: int) -> None:
+        self.path.write_bytes(
+            orjson.dumps({"batch": batch_number, "batch_size": self.batch_size, "rejects_size": rejects_size})
+        )
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def validate_rows(rows: list[tuple[int, Any]], rejects_file: BinaryIO) -> tuple[list[ImportedUser], int]:
+    """Get users of the valid rows and write the invalid ones without passwords to the rejects file.
+
+    Rows that are not objects are rejected as well, their content is not written since it may hold passwords.
+    """
+    users = []
+    rejected = 0
+    for line, row in rows:
+        if isinstance(row, UndecodableRow):
+            errors = [{"loc": [], "msg": row.error}]
+        else:
+            try:
+                users.append(ImportedUser.model_validate(row))
+                continue
+            except pydantic.ValidationError as err:
+                errors = [{"loc": error["loc"], "msg": error["msg"]} for error in err.errors()]
+
+        rejected += 1
+        if isinstance(row, dict):
+            row.pop("password", None)
+        else:
+            row = None
+        # extra CSV cells are kept under the `None` key, which is written as "null"
+        reject = orjson.dumps({"line": line, "row": row, "errors": errors}, option=orjson.OPT_NON_STR_KEYS)
+        rejects_file.write(reject + b"\n")
+    return users, rejected
+
+
+async def hash_passwords(executor: ProcessPoolExecutor, workers: int, users: list[ImportedUser]) -> list[str]:
+    """Hash passwords of the users split into a chunk per worker."""
+    if not users:
+        return []
+
+    loop = asyncio.get_running_loop()
+    chunk_size = -(-len(users) // workers)
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                executor,
+                users_utils.hash_passwords,
+                [user.password for user in users[i : i + chunk_size]],
+                settings.auth.password_hashing_rounds,
+            )
+            for i in range(0, len(users), chunk_size)
+        )
+    )
+    return list(itertools.chain.from_iterable(chunks))
+
+
+async def import_users(
+    path: Path,
+    import_format: ImportFormat,
+    batch_size: int,
+    workers: int | None,
+    restart: bool,
+    on_batch: Callable[[BatchReport], None],
+) -> None:
+    """Import users from the file by batches.
+
+    Passwords of a batch are hashed by a pool of processes while the previous batch is written,
+    invalid rows are written to the `.rejects.ndjson` file next to the imported one.
+    Every imported batch is checkpointed, so a failed import is resumed from the next batch.
+    """
+    checkpoint = ImportCheckpoint(path.with_suffix(path.suffix + ".checkpoint"), batch_size)
+    if restart:
+        checkpoint.clear()
+    (imported_batches, rejects_size) = checkpoint.load()
+
+    workers = workers or settings.auth.password_hashing_workers or os.cpu_count() or 1
+    rows = read_rows(path, import_format)
+    batches = iter(lambda: list(itertools.islice(rows, batch_size)), [])
+    # rejects of the batches imported before are kept on resume
+    rejects_mode = "ab" if imported_batches else "wb"
+
+    with (
+        ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor,
+        path.with_suffix(path.suffix + ".rejects.ndjson").open(rejects_mode) as rejects_file,
+    ):
+        if rejects_size is not None:
+            # rejects of the batches validated but not checkpointed are dropped, they are written again
+            rejects_file.truncate(rejects_size)
+
+        async with get_async_db_session() as db:
+            importer = UsersImporter(db)
+
+            async def write_batch(
+                batch_number: int,
+                users: list[ImportedUser],
+                rejected: int,
+                hashing: asyncio.Future,
+                rejects_size: int,
+            ) -> None:
+                started_at = time.perf_counter()
+                result = await importer.import_batch(users, await hashing)
+                # the checkpointed size of the rejects file is never beyond its content
+                rejects_file.flush()
+                checkpoint.save(batch_number, rejects_size)
+                on_batch(BatchReport(batch_number, result, rejected, time.perf_counter() - started_at))
+
+            pending = None
+            for batch_number, batch in enumerate(batches, start=1):
+                if batch_number <= imported_batches:
+                    continue
+
+                users, rejected = validate_rows(batch, rejects_file)
+                hashing = asyncio.ensure_future(hash_passwords(executor, workers, users))
+                if pending is not None:
+                    await write_batch(*pending)
+                pending = (batch_number, users, rejected, hashing, rejects_file.tell())
+
+            if pending is not None:
+                await write_batch(*pending)
@@ -8,3 +8,29 @@ PERMISSIONS_CREATED = "permissions: {permissions}\n"
 USERNAME_ALREADY_EXISTS = "User with username '{username}' already exists. Choose another username.\n"
 
 ABORTING = "Superuser has not been created. Aborting\n"
+
+HASHING_BENCHMARK_HEADER = "{rounds:>10} | {duration:>12}"
+HASHING_BENCHMARK_ROW = "{rounds:>10} | {duration_ms:>9.1f} ms"
+HASHING_ROUNDS_CALIBRATED = (
+    "Set the following to hash a password in about {target_ms} ms:\n\n" "{env_var}={rounds}\n"
+)
+
+SIGNIN_BENCHMARK_HEADER = "{name:>20} | {round_trips:>11} | {p50:>9} | {p99:>9}"
+SIGNIN_BENCHMARK_ROW = "{name:>20} | {round_trips:>11.1f} | {p50_ms:>6.1f} ms | {p99_ms:>6.1f} ms"
+
+REVOKED_JTIS_BENCHMARK_HEADER = "{layout:>10} | {keys:>10} | {memory:>12} | {per_revocation:>16}"
+REVOKED_JTIS_BENCHMARK_ROW = (
+    "{layout:>10} | {keys:>10} | {memory_mb:>9.1f} MB | {bytes_per_revocation:>10.1f} bytes"
+)
+
+SIGNIN_HISTORY_PARTITIONS_CREATED = "Signin history partitions created: {partitions}"
+SIGNIN_HISTORY_PARTITIONS_DROPPED = "Signin history partitions dropped: {partitions}"
+
+IMPORT_BATCH_REPORT = (
+    "batch {batch}: {imported} imported, {skipped} skipped as existing, {rejected} rejected, "
+    "{unknown_roles} unknown roles, {unknown_permissions} unknown permissions, {users_per_sec:.0f} users/s"
+)
+USERS_IMPORTED = (
+    "Users have been imported: {imported} imported, {skipped} skipped as existing, {rejected} rejected, "
+    "{users_per_sec:.0f} users/s\n"
+)
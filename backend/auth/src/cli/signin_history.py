@@ -0,0 +1,24 @@
+from datetime import date
+
+from src.cli.database import get_async_db_session
+from src.users.partitions import (
+    add_months,
+    create_signin_history_partitions,
+    drop_signin_history_partitions,
+)
+
+
+async def maintain_signin_history_partitions(
+    today: date, months_ahead: int, retention_months: int
+) -> tuple[list[str], list[str]]:
+    """Create partitions of the signin history for the current and next months and drop expired ones."""
+    current_month = today.replace(day=1)
+
+    async with get_async_db_session() as db:
+        created_partitions = await create_signin_history_partitions(
+            db, since=current_month, months=months_ahead + 1
+        )
+        dropped_partitions = await drop_signin_history_partitions(
+            db, before=add_months(current_month, -retention_months)
+        )
+    return created_partitions, dropped_partitions
@@ -10,7 +10,12 @@ from src.permissions.repositories import PostgresPermissionRepository
 from src.permissions.services import PermissionsService
 from src.settings.app import get_app_settings
 from src.users import schemas as users_schemas
-from src.users.repositories import PostgresUserRepository, PostgresUserSigninHistoryRepository
+from src.users.cache import get_users_cache
+from src.users.repositories import (
+    CachedUserRepository,
+    PostgresUserRepository,
+    PostgresUserSigninHistoryRepository,
+)
 from src.users.service import UserService
 from .database import get_async_db_session
 
@@ -59,9 +64,11 @@ async def create_user_with_internal_permissions(
 
 
 async def get_user_service(db: AsyncSession) -> UserService:
-    auth_backend = await get_auth_backend(redis=aioredis.from_url(settings.redis.dsn, encoding="utf-8"))
+    redis = aioredis.from_url(settings.redis.dsn, encoding="utf-8")
+    auth_backend = await get_auth_backend(redis=redis)
+    users_cache = await get_users_cache(redis=redis)
     return UserService(
-        user_repository=PostgresUserRepository(session=db),
+        user_repository=CachedUserRepository(PostgresUserRepository(session=db), users_cache),
         log_repository=PostgresUserSigninHistoryRepository(session=db),
         jwt_auth_backend=auth_backend,
     )
@@ -9,6 +9,54 @@ from typing import (
 from redis.asyncio import (
     Redis as AsyncRedisClient,
 )
+from redis.asyncio.client import (
+    Pipeline as AsyncRedisPipeline,
+)
+
+
+class AbstractCacheBatch(ABC):
+    """Commands queued to be sent to the cache within a single round trip."""
+
+    @abstractmethod
+    def set(self, key: str, data: Any, timeout_secs: int | None = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def exist(self, *keys) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def hash_get_many(self, key: str, *fields: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_add(self, key: str, *members: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_contains_many(self, key: str, *members: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def expire_at(self, key: str, timestamp: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def sorted_set_add(self, key: str, mapping: dict[str, float]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def sorted_set_remove_by_score(self, key: str, min_score: float, max_score: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def publish(self, channel: str, message: Any) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def execute(self) -> list[Any]:
+        """Send the queued commands and get their results in order."""
+        raise NotImplementedError
 
 
 class AbstractCache(ABC):
@@ -17,6 +65,16 @@ class AbstractCache(ABC):
         """Check that keys exist in cache."""
         raise NotImplementedError
 
+    @abstractmethod
+    def batch(self) -> AbstractCacheBatch:
+        """Start a batch of commands sent within a single round trip."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def exist_each(self, *keys) -> list[bool]:
+        """Check existence of every key separately within a single round trip."""
+        raise NotImplementedError
+
     @abstractmethod
     async def get(
         self,
@@ -25,6 +83,26 @@ class AbstractCache(ABC):
         """Get data from cache by the key."""
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_many(self, *keys: str) -> list[Any]:
+        """Get data of every key within a single round trip, None for missing keys."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def increment(self, key: str) -> int:
+        """Increment the integer stored at the key and get the new value."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def hash_get(self, key: str, field: str) -> Any:
+        """Get data of the field of the hash stored at the key."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def hash_increment(self, key: str, field: str) -> int:
+        """Increment the integer stored in the field of the hash at the key and get the new value."""
+        raise NotImplementedError
+
     @abstractmethod
     async def set(self, key: str, data: Any, timeout_secs: int | None = None) -> bool:
         """Save data (key: value) in cache with the given key and timeout."""
@@ -35,6 +113,59 @@ class AbstractCache(ABC):
         """Delete keys from cache."""
         raise NotImplementedError
 
+    @abstractmethod
+    async def sorted_set_add(self, key: str, mapping: dict[str, float]) -> int:
+        """Add members (member: score) to the sorted set stored at the key."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def sorted_set_remove_by_score(self, key: str, min_score: float, max_score: float) -> int:
+        """Remove members with a score within the given range from the sorted set."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Any) -> int:
+        """Publish message to the channel."""
+        raise NotImplementedError
+
+
+class RedisCacheBatch(AbstractCacheBatch):
+    """Redis pipeline without a transaction."""
+
+    def __init__(self, pipeline: AsyncRedisPipeline):
+        self.pipeline = pipeline
+
+    def set(self, key: str, data: Any, timeout_secs: int | None = None) -> None:
+        self.pipeline.set(name=key, value=data, ex=timeout_secs)
+
+    def exist(self, *keys) -> None:
+        self.pipeline.exists(*keys)
+
+    def hash_get_many(self, key: str, *fields: str) -> None:
+        self.pipeline.hmget(key, fields)
+
+    def set_add(self, key: str, *members: str) -> None:
+        self.pipeline.sadd(key, *members)
+
+    def set_contains_many(self, key: str, *members: str) -> None:
+        self.pipeline.smismember(key, members)
+
+    def expire_at(self, key: str, timestamp: int) -> None:
+        self.pipeline.expireat(key, timestamp)
+
+    def sorted_set_add(self, key: str, mapping: dict[str, float]) -> None:
+        self.pipeline.zadd(name=key, mapping=mapping)
+
+    def sorted_set_remove_by_score(self, key: str, min_score: float, max_score: float) -> None:
+        self.pipeline.zremrangebyscore(name=key, min=min_score, max=max_score)
+
+    def publish(self, channel: str, message: Any) -> None:
+        self.pipeline.publish(channel=channel, message=message)
+
+    async def execute(self) -> list[Any]:
+        async with self.pipeline as pipeline:
+            return await pipeline.execute()
+
 
 class RedisCache(AbstractCache):
     """Redis cache implementation."""
@@ -45,11 +176,41 @@ class RedisCache(AbstractCache):
     async def exist(self, *keys) -> int:
         return await self.client.exists(*keys)
 
+    def batch(self) -> RedisCacheBatch:
+        return RedisCacheBatch(self.client.pipeline(transaction=False))
+
+    async def exist_each(self, *keys) -> list[bool]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.exists(key)
+            return [bool(exists) for exists in await pipe.execute()]
+
     async def get(self, key: str) -> Any | None:
         return await self.client.get(key)
 
+    async def get_many(self, *keys: str) -> list[Any]:
+        return await self.client.mget(keys)
+
+    async def increment(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def hash_get(self, key: str, field: str) -> Any | None:
+        return await self.client.hget(key, field)
+
+    async def hash_increment(self, key: str, field: str) -> int:
+        return await self.client.hincrby(key, field)
+
     async def set(self, key: str, data: Any, timeout_secs: int | None = None) -> bool:
         return bool(await self.client.set(name=key, value=data, ex=timeout_secs))
 
     async def delete(self, *keys) -> int:
         return await self.client.delete(*keys)
+
+    async def sorted_set_add(self, key: str, mapping: dict[str, float]) -> int:
+        return await self.client.zadd(name=key, mapping=mapping)
+
+    async def sorted_set_remove_by_score(self, key: str, min_score: float, max_score: float) -> int:
+        return await self.client.zremrangebyscore(name=key, min=min_score, max=max_score)
+
+    async def publish(self, channel: str, message: Any) -> int:
+        return await self.client.publish(channel=channel, message=message)
@@ -28,7 +28,7 @@ class Base(
     ...
 
 
-async_session: async_sessionmaker | None
+async_session: async_sessionmaker | None = None
 engine: None | AsyncEngine = None
 redis: None | Redis = None
 
@@ -4,10 +4,10 @@ from fastapi import Depends
 
 from src.auth.dependencies import handle_access_token
 from src.auth.jwt import schemas as jwt_schemas
+from src.permissions.encoding import PermissionChecker
 from src.permissions.enums import (
     ServiceInternalRoles,
     ServiceInternalActions,
-    ServiceInternalPermission,
     ServiceInternalSrc,
 )
 from src.permissions.exceptions import PermissionNotGrantedError, PermissionUserBlocked
@@ -19,18 +19,18 @@ def check_permission(
     src: ServiceInternalSrc,
     action: ServiceInternalActions,
 ) -> CheckPermissionsType:
+    permission_checker = PermissionChecker(src, action)
+
     async def _check_permission(
         access_token: jwt_schemas.JWTDecoded = Depends(handle_access_token),
     ) -> jwt_schemas.JWTDecoded:
         if access_token.user.role == ServiceInternalRoles.superadmin:
             return access_token
 
-        permissions = access_token.user.permissions.get(src, [])
-
-        if ServiceInternalPermission.blocked in permissions:
+        if permission_checker.is_blocked(access_token.user.permissions):
             raise PermissionUserBlocked
 
-        if action.upper() not in permissions:
+        if not permission_checker.is_granted(access_token.user.permissions):
             raise PermissionNotGrantedError
 
         return access_token
@@ -18,7 +18,8 @@ from src.permissions.api.v1 import router as permissions_router
 from src.role.api.v1 import router as roles_router
 from src.settings.app import get_app_settings
 from src.settings.logging import configure_logger
-from src.tracer.config import configure_tracer
+from src.tracer.config import configure_meter, configure_tracer
+from src.users import hashing, signin_history
 from src.users.api.v1 import router as users_router
 
 settings = get_app_settings()
@@ -34,7 +35,11 @@ async def lifespan(app: FastAPI):
     database.redis = aioredis.from_url(settings.redis.dsn, encoding="utf-8")
     await FastAPILimiter.init(database.redis)
     database.init_database(settings)
+    signin_history.signin_history_writer.start(database.async_session)
     yield
+    await signin_history.signin_history_writer.stop()
+    await hashing.password_rehasher.wait()
+    hashing.password_hashing_pool.shutdown()
     await database.redis.close()
 
 
@@ -108,6 +113,7 @@ add_pagination(app)
 
 if settings.jaeger.enabled:
     configure_tracer(app)
+    configure_meter()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+"""Compact encoding of the user permissions in JWT claims.
+
+Permissions are packed into a single integer with a bit per (src, permission) pair, srcs are numbered
+by a versioned dictionary shared with the library API (`src/common/permissions.py`). Srcs missing
+in the dictionary are kept in a separate mapping of src to its permissions bitmask.
+
+Claim format: {"v": <dictionary version>, "m": <bitmask>, "x": {<src>: <bitmask>}}.
+"""
+from typing import Any
+
+from pydantic import BaseModel, model_serializer, model_validator
+
+PERMISSIONS_DICTIONARY_VERSION = 1
+# positions are a part of the tokens format: never reorder or remove srcs, add a new version instead
+SRC_DICTIONARIES: dict[int, tuple[str, ...]] = {
+    1: (
+        "users",
+        "permissions",
+        "roles",
+        "books",
+        "authors",
+        "categories",
+        "books_categories",
+        "books_authors",
+    ),
+}
+PERMISSION_BITS: dict[str, int] = {
+    "READ": 0,
+    "UPDATE": 1,
+    "CREATE": 2,
+    "DELETE": 3,
+    "BLOCKED": 4,
+}
+BITS_PER_SRC = len(PERMISSION_BITS)
+SRC_INDEXES: dict[int, dict[str, int]] = {
+    version: {src: index for index, src in enumerate(srcs)} for version, srcs in SRC_DICTIONARIES.items()
+}
+
+
+def get_permission_bit(src_index: int, permission: str) -> int:
+    return 1 << (src_index * BITS_PER_SRC + PERMISSION_BITS[permission])
+
+
+class EncodedPermissions(BaseModel):
+    version: int = PERMISSIONS_DICTIONARY_VERSION
+    mask: int = 0
+    extra: dict[str, int] = {}
+
+    @model_validator(mode="before")
+    @classmethod
+    def from_claim(cls, data: Any) -> Any:
+        if not isinstance(data, dict) or "version" in data:
+            return data
+        if "v" in data:
+            return {"version": data["v"], "mask": data.get("m", 0), "extra": data.get("x", {})}
+        # plain mapping of src to the list of permissions
+        return cls.encode(data).__dict__
+
+    @model_serializer
+    def to_claim(self) -> dict[str, Any]:
+        claim: dict[str, Any] = {"v": self.version, "m": self.mask}
+        if self.extra:
+            claim["x"] = self.extra
+        return claim
+
+    @classmethod
+    def encode(cls, permissions: dict[str, list[str]]) -> "EncodedPermissions":
+        src_indexes = SRC_INDEXES[PERMISSIONS_DICTIONARY_VERSION]
+        mask = 0
+        extra: dict[str, int] = {}
+        for src, src_permissions in permissions.items():
+            for permission in src_permissions:
+                if permission not in PERMISSION_BITS:
+                    continue
+                if src in src_indexes:
+                    mask |= get_permission_bit(src_indexes[src], permission)
+                else:
+                    extra[src] = extra.get(src, 0) | get_permission_bit(0, permission)
+        return cls.model_construct(version=PERMISSIONS_DICTIONARY_VERSION, mask=mask, extra=extra)
+
+    def decode(self) -> dict[str, list[str]]:
+        src_masks = {
+            src: self.mask >> (index * BITS_PER_SRC)
+            for index, src in enumerate(SRC_DICTIONARIES.get(self.version, ()))
+        }
+        src_masks.update(self.extra)
+        return {
+            src: [permission for permission, bit in PERMISSION_BITS.items() if src_mask & (1 << bit)]
+            for src, src_mask in src_masks.items()
+            if src_mask & ((1 << BITS_PER_SRC) - 1)
+        }
+
+
+class PermissionChecker:
+    """Check of a single src and action precompiled to bitmasks, so each check is a couple of integer ops."""
+
+    def __init__(self, src: str, action: str) -> None:
+        self.src = src
+        permission = action.upper()
+        self._bits_by_version = {
+            version: (
+                get_permission_bit(src_indexes[src], permission),
+                get_permission_bit(src_indexes[src], "BLOCKED"),
+            )
+            for version, src_indexes in SRC_INDEXES.items()
+            if src in src_indexes
+        }
+        self._extra_bits = (get_permission_bit(0, permission), get_permission_bit(0, "BLOCKED"))
+
+    def _get_mask_and_bits(self, permissions: EncodedPermissions) -> tuple[int, int, int]:
+        bits = self._bits_by_version.get(permissions.version)
+        if bits is not None:
+            return permissions.mask, *bits
+        return permissions.extra.get(self.src, 0), *self._extra_bits
+
+    def is_blocked(self, permissions: EncodedPermissions) -> bool:
+        mask, _, blocked_bit = self._get_mask_and_bits(permissions)
+        return bool(mask & blocked_bit)
+
+    def is_granted(self, permissions: EncodedPermissions) -> bool:
+        mask, granted_bit, _ = self._get_mask_and_bits(permissions)
+        return bool(mask & granted_bit)
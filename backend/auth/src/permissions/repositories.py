@@ -34,6 +34,9 @@ from src.permissions import (
 from src.permissions import (
     schemas as permissions_schemas,
 )
+from src.users.cache import (
+    UsersCache,
+)
 
 logger = logging.getLogger("root")
 
@@ -75,8 +78,9 @@ class PermissionRepository(ABC):
 
 
 class PostgresPermissionRepository(PermissionRepository):
-    def __init__(self, async_session: AsyncSession) -> None:
+    def __init__(self, async_session: AsyncSession, users_cache: UsersCache | None = None) -> None:
         self.async_session = async_session
+        self.users_cache = users_cache
 
     async def get(self, permission_id: UUID) -> permissions_schemas.Permission | None:
         stmt = select(permissions_models.Permission).where(permissions_models.Permission.id == permission_id)
@@ -118,6 +122,9 @@ class PostgresPermissionRepository(PermissionRepository):
             .values(**values_to_update)
         )
         await self.async_session.execute(stmt)
+        # cached users are invalidated once the update is visible to the other sessions
+        await self.async_session.commit()
+        await self.__invalidate_users_cache()
 
         return await self.get(permission_id)  # type: ignore
 
@@ -179,3 +186,9 @@ class PostgresPermissionRepository(PermissionRepository):
         )
         await self.async_session.execute(stmt)
         await self.async_session.commit()
+        await self.__invalidate_users_cache()
+
+    async def __invalidate_users_cache(self) -> None:
+        # permissions are part of the cached users identities
+        if self.users_cache is not None:
+            await self.users_cache.invalidate_all()
@@ -9,6 +9,7 @@ from src.permissions import schemas as permissions_schemas
 from src.permissions.enums import ServiceInternalPermission
 from src.permissions.exceptions import PermissionDoesNotExistError, PermissionNameExistsError
 from src.permissions.repositories import PermissionRepository, PostgresPermissionRepository
+from src.users.cache import UsersCache, get_users_cache
 
 
 class IPermissionsService(ABC):
@@ -101,5 +102,9 @@ class PermissionsService(IPermissionsService):
         return [str(permission.value) for permission in ServiceInternalPermission]
 
 
-async def get_permissions_service(db_session: AsyncSession = Depends(get_db)) -> IPermissionsService:
-    return PermissionsService(permissions_repo=PostgresPermissionRepository(async_session=db_session))
+async def get_permissions_service(
+    db_session: AsyncSession = Depends(get_db), users_cache: UsersCache = Depends(get_users_cache)
+) -> IPermissionsService:
+    return PermissionsService(
+        permissions_repo=PostgresPermissionRepository(async_session=db_session, users_cache=users_cache)
+    )
@@ -11,6 +11,7 @@ from src.permissions import enums as permission_enums
 from src.role import schemas as roles_schemas
 from src.role.repository import IRoleRepository
 from src.settings.app import get_app_settings
+from src.users import schemas as users_schemas
 
 settings = get_app_settings()
 
@@ -143,3 +144,69 @@ async def get_roles(
     ],
 ) -> list[roles_schemas.Role]:
     return await service.all()
+
+
+@router.post(
+    path="/{role_id:uuid}/assign-users",
+    response_model=users_schemas.BulkAssignmentResult,
+    summary="",
+    description="",
+    response_description="",
+)
+async def assign_role_for_users(
+    rate_limiter: Annotated[
+        RateLimiter,
+        Depends(
+            RateLimiter(
+                times=settings.rate_limiter_times,
+                seconds=settings.rate_limiter_seconds,
+            )
+        ),
+    ],
+    role_id: UUID,
+    selection: users_schemas.UsersSelection,
+    service: Annotated[IRoleRepository, Depends(get_role_repository)],
+    access_token: Annotated[
+        jwt_schemas.JWTDecoded,
+        Depends(
+            check_permission(
+                permission_enums.ServiceInternalSrc.roles,
+                permission_enums.ServiceInternalPermission.update,
+            )
+        ),
+    ],
+) -> users_schemas.BulkAssignmentResult:
+    return await service.assign_users(role_id, selection)
+
+
+@router.post(
+    path="/{role_id:uuid}/revoke-users",
+    response_model=users_schemas.BulkAssignmentResult,
+    summary="",
+    description="",
+    response_description="",
+)
+async def revoke_role_from_users(
+    rate_limiter: Annotated[
+        RateLimiter,
+        Depends(
+            RateLimiter(
+                times=settings.rate_limiter_times,
+                seconds=settings.rate_limiter_seconds,
+            )
+        ),
+    ],
+    role_id: UUID,
+    selection: users_schemas.UsersSelection,
+    service: Annotated[IRoleRepository, Depends(get_role_repository)],
+    access_token: Annotated[
+        jwt_schemas.JWTDecoded,
+        Depends(
+            check_permission(
+                permission_enums.ServiceInternalSrc.roles,
+                permission_enums.ServiceInternalPermission.update,
+            )
+        ),
+    ],
+) -> users_schemas.BulkAssignmentResult:
+    return await service.revoke_users(role_id, selection)
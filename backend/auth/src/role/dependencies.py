@@ -5,7 +5,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.role.repository import IRoleRepository, PostgresRoleRepository
 from src.common.database import get_db
+from src.users.cache import UsersCache, get_users_cache
 
 
-async def get_role_repository(db_session: Annotated[AsyncSession, Depends(get_db)]) -> IRoleRepository:
-    return PostgresRoleRepository(db_session)
+async def get_role_repository(
+    db_session: Annotated[AsyncSession, Depends(get_db)],
+    users_cache: Annotated[UsersCache, Depends(get_users_cache)],
+) -> IRoleRepository:
+    return PostgresRoleRepository(db_session, users_cache=users_cache)
@@ -3,13 +3,18 @@ from abc import ABC
 from typing import TypeVar, Generic
 from uuid import UUID
 
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, func, literal, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.base import Executable
 
 from src.role.exceptions import RoleNotFound
 from src.role.models import Role
 from src.common.database import Base
+from src.users import schemas as users_schemas
+from src.users.cache import UsersCache
+from src.users.models import UserRole
+from src.users.repositories import select_user_ids
 
 TModel = TypeVar("TModel", bound=Base)
 
@@ -35,13 +40,26 @@ class IRoleRepository(abc.ABC, Generic[TModel]):
     async def update(self, role_id: UUID, name: str) -> TModel:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    async def assign_users(
+        self, role_id: UUID, selection: users_schemas.UsersSelection
+    ) -> users_schemas.BulkAssignmentResult:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def revoke_users(
+        self, role_id: UUID, selection: users_schemas.UsersSelection
+    ) -> users_schemas.BulkAssignmentResult:
+        raise NotImplementedError
+
 
 class PostgresRoleRepository(
     IRoleRepository[Role],
     ABC,
 ):
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, users_cache: UsersCache | None = None):
         self.session = session
+        self.users_cache = users_cache
 
     async def insert(self, name: str) -> Role:
         role = Role(name=name)
@@ -65,14 +83,66 @@ class PostgresRoleRepository(
         stmt = delete(Role).where(Role.id == role_id)
         await self.session.execute(stmt)
         await self.session.commit()
+        await self.__invalidate_users_cache()
 
     async def update(self, role_id: UUID, name: str) -> Role:
         stmt = update(Role).where(Role.id == role_id).values(name=name)
         await self.session.execute(stmt)
         await self.session.commit()
+        await self.__invalidate_users_cache()
 
         return await self.get(role_id)
 
+    async def assign_users(
+        self, role_id: UUID, selection: users_schemas.UsersSelection
+    ) -> users_schemas.BulkAssignmentResult:
+        await self.get(role_id)
+
+        user_ids = select_user_ids(selection).subquery()
+        stmt = (
+            insert(UserRole)
+            .from_select(
+                ["id", "role_id", "user_id", "created_at", "modified_at"],
+                select(
+                    func.gen_random_uuid(),
+                    literal(role_id, UserRole.role_id.type),
+                    user_ids.c.id,
+                    func.now(),
+                    func.now(),
+                ),
+            )
+            .on_conflict_do_nothing()
+        )
+        return await self.__apply_bulk_assignment(selection, stmt)
+
+    async def revoke_users(
+        self, role_id: UUID, selection: users_schemas.UsersSelection
+    ) -> users_schemas.BulkAssignmentResult:
+        await self.get(role_id)
+
+        stmt = delete(UserRole).where(
+            UserRole.role_id == role_id, UserRole.user_id.in_(select_user_ids(selection))
+        )
+        return await self.__apply_bulk_assignment(selection, stmt)
+
+    async def __apply_bulk_assignment(
+        self, selection: users_schemas.UsersSelection, statement: Executable
+    ) -> users_schemas.BulkAssignmentResult:
+        matched_users = await self.session.scalar(
+            select(func.count()).select_from(select_user_ids(selection).subquery())
+        )
+        result = await self.session.execute(statement)
+        await self.session.commit()
+        if result.rowcount:
+            await self.__invalidate_users_cache()
+
+        return users_schemas.BulkAssignmentResult(matched_users=matched_users, affected=result.rowcount)
+
+    async def __invalidate_users_cache(self) -> None:
+        # role names and permissions are part of the cached users identities
+        if self.users_cache is not None:
+            await self.users_cache.invalidate_all()
+
     async def __scalars(self, statement: Executable) -> list[Role | None]:
         result = await self.session.scalars(statement)
         return list(result.all())
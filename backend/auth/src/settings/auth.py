@@ -1,10 +1,66 @@
+from enum import StrEnum
+
 from pydantic import BaseModel, Field
 
 
+class RevokedJtisLayout(StrEnum):
+    # key per revoked jti
+    keys = "keys"
+    # set of revoked jtis per time bucket of their tokens expiration
+    buckets = "buckets"
+
+
 class AuthSettings(BaseModel):
     secret_key: str = Field(alias="secret_key")
     jwt_encoding_algorithm: str = Field(alias="auth_jwt_encoding_algorithm", default="HS256")
-    jwt_secret_key: str = Field(alias="auth_jwt_secret_key")
+    jwt_secret_key: str | None = Field(alias="auth_jwt_secret_key", default=None)
+    # asymmetric algorithms (RS*, ES*) only: directory with `<kid>.pem` private keys and the kid to sign with
+    jwt_keys_dir: str | None = Field(alias="auth_jwt_keys_dir", default=None)
+    jwt_active_kid: str | None = Field(alias="auth_jwt_active_kid", default=None)
 
     access_token_expires_secs: int = Field(alias="auth_access_token_expires_secs")
     refresh_token_expires_secs: int = Field(alias="auth_refresh_token_expires_secs")
+
+    revoked_tokens_key: str = Field(alias="auth_revoked_tokens_key", default="auth:revoked-tokens")
+    revocation_channel: str = Field(alias="auth_revocation_channel", default="auth:revoked-tokens")
+    revoked_jtis_layout: RevokedJtisLayout = Field(
+        alias="auth_revoked_jtis_layout", default=RevokedJtisLayout.keys
+    )
+    # buckets layout only: tokens expiring within the same `bucket` seconds share a bucket
+    revoked_jtis_bucket_secs: int = Field(alias="auth_revoked_jtis_bucket_secs", default=3600)
+    # hash of users tokens generations, all the tokens of a user are revoked by incrementing the generation
+    tokens_generations_key: str = Field(
+        alias="auth_tokens_generations_key", default="auth:tokens-generations"
+    )
+
+    # jtis checked not to be revoked are cached in process for `ttl` seconds, 0 disables the cache
+    not_revoked_tokens_cache_ttl_sec: float = Field(alias="auth_not_revoked_tokens_cache_ttl_sec", default=1)
+    not_revoked_tokens_cache_max_size: int = Field(
+        alias="auth_not_revoked_tokens_cache_max_size", default=100_000
+    )
+
+    # password hashing runs in a pool of processes, None means the number of CPUs
+    password_hashing_workers: int | None = Field(alias="auth_password_hashing_workers", default=None)
+    # pbkdf2 rounds to hash passwords with, None means the passlib default
+    # use `python -m src.cli.cli calibrate-password-hashing` to choose the value for the target latency
+    password_hashing_rounds: int | None = Field(alias="auth_password_hashing_rounds", default=None)
+    # hashing requests waiting for a free worker, requests over the limit are rejected with 503
+    password_hashing_queue_size: int = Field(alias="auth_password_hashing_queue_size", default=64)
+
+    # users identities (profile, role and permissions) are cached in Redis for `ttl` seconds,
+    # 0 disables the cache
+    users_cache_ttl_sec: int = Field(alias="auth_users_cache_ttl_sec", default=300)
+
+    # signin records are written in the background by batches of up to `batch_size` records
+    # at least every `flush_interval` seconds, records over the queue size are written right away
+    signin_history_batch_size: int = Field(alias="auth_signin_history_batch_size", default=500)
+    signin_history_flush_interval_sec: float = Field(
+        alias="auth_signin_history_flush_interval_sec", default=1
+    )
+    signin_history_queue_size: int = Field(alias="auth_signin_history_queue_size", default=10_000)
+
+    # signin history is partitioned by months, partitions older than `retention` months are dropped
+    signin_history_partitions_ahead: int = Field(alias="auth_signin_history_partitions_ahead", default=3)
+    signin_history_retention_months: int = Field(alias="auth_signin_history_retention_months", default=12)
+
+    introspection_batch_max_size: int = Field(alias="auth_introspection_batch_max_size", default=100)
@@ -3,7 +3,6 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query
 from fastapi_limiter.depends import RateLimiter
-from fastapi_pagination import Page
 
 from src.auth.jwt import schemas as jwt_schemas
 from src.common.dependencies import check_permission
@@ -113,7 +112,7 @@ async def get_users(
 
 @router.get(
     path="/{user_id:uuid}/signin-history",
-    response_model=Page[users_schemas.UserLoginRecord],
+    response_model=users_schemas.UserLoginRecordsPage,
     summary="",
     description="",
     response_description="",
@@ -139,8 +138,10 @@ async def get_user_signin_history(
             )
         ),
     ],
-) -> Page[users_schemas.UserLoginRecord]:
-    return await service.get_user_history(user_id)
+    size: Annotated[int, Query(ge=1, le=100)] = 50,
+    cursor: Annotated[str | None, Query(description="`next_cursor` of the previous page")] = None,
+) -> users_schemas.UserLoginRecordsPage:
+    return await service.get_user_history(user_id, size=size, cursor=cursor)
 
 
 @router.put(
@@ -209,6 +210,38 @@ async def change_password(
     return await service.change_user_password(user_id, password_change.old_password, password_change.password)
 
 
+@router.post(
+    path="/{user_id:uuid}/revoke-tokens",
+    response_model=None,
+    summary="",
+    description="",
+    response_description="",
+)
+async def revoke_user_tokens(
+    rate_limiter: Annotated[
+        RateLimiter,
+        Depends(
+            RateLimiter(
+                times=settings.rate_limiter_times,
+                seconds=settings.rate_limiter_seconds,
+            )
+        ),
+    ],
+    user_id: UUID,
+    service: Annotated[IUserService, Depends(get_user_service)],
+    _: Annotated[
+        jwt_schemas.JWTDecoded,
+        Depends(
+            check_permission(
+                permissions_enums.ServiceInternalSrc.users,
+                permissions_enums.ServiceInternalPermission.update,
+            )
+        ),
+    ],
+) -> None:
+    return await service.revoke_user_tokens(user_id)
+
+
 @router.post(
     path="/{user_id:uuid}/assign-permission",
     response_model=users_schemas.User,
@@ -342,3 +375,67 @@ async def revoke_role_from_user(
     ],
 ) -> users_schemas.User:
     return await service.revoke_user_role(user_id, user_role.role_id)
+
+
+@router.post(
+    path="/bulk/assign-permissions",
+    response_model=users_schemas.BulkAssignmentResult,
+    summary="",
+    description="",
+    response_description="",
+)
+async def assign_permissions_for_users(
+    rate_limiter: Annotated[
+        RateLimiter,
+        Depends(
+            RateLimiter(
+                times=settings.rate_limiter_times,
+                seconds=settings.rate_limiter_seconds,
+            )
+        ),
+    ],
+    users_permissions: users_dependencies.UsersPermissions,
+    service: Annotated[IUserService, Depends(get_user_service)],
+    _: Annotated[
+        jwt_schemas.JWTDecoded,
+        Depends(
+            check_permission(
+                permissions_enums.ServiceInternalSrc.users,
+                permissions_enums.ServiceInternalPermission.update,
+            )
+        ),
+    ],
+) -> users_schemas.BulkAssignmentResult:
+    return await service.assign_users_permissions(users_permissions, users_permissions.permission_ids)
+
+
+@router.post(
+    path="/bulk/revoke-permissions",
+    response_model=users_schemas.BulkAssignmentResult,
+    summary="",
+    description="",
+    response_description="",
+)
+async def revoke_permissions_from_users(
+    rate_limiter: Annotated[
+        RateLimiter,
+        Depends(
+            RateLimiter(
+                times=settings.rate_limiter_times,
+                seconds=settings.rate_limiter_seconds,
+            )
+        ),
+    ],
+    users_permissions: users_dependencies.UsersPermissions,
+    service: Annotated[IUserService, Depends(get_user_service)],
+    _: Annotated[
+        jwt_schemas.JWTDecoded,
+        Depends(
+            check_permission(
+                permissions_enums.ServiceInternalSrc.users,
+                permissions_enums.ServiceInternalPermission.update,
+            )
+        ),
+    ],
+) -> users_schemas.BulkAssignmentResult:
+    return await service.revoke_users_permissions(users_permissions, users_permissions.permission_ids)
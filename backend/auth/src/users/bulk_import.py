@@ -0,0 +1,167 @@
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+
+from pydantic import Field, field_validator
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import dependencies as auth_depends
+
+STAGING_TABLE = "users_import"
+STAGING_COLUMNS = ("id", "username", "password", "first_name", "last_name", "email", "role", "permissions")
+
+
+class ImportedUser(auth_depends.UserSignUp):
+    role: str | None = None
+    # permissions as `src:type`, e.g. `users:READ`
+    permissions: list[str] = Field(default_factory=list)
+
+    @field_validator("role", "email", mode="before")
+    @classmethod
+    def empty_as_none(cls, value: str | None) -> str | None:
+        # CSV has no nulls, so empty cells are taken as missing values
+        return value or None
+
+    @field_validator("permissions", mode="before")
+    @classmethod
+    def split_permissions(cls, value: str | list[str] | None) -> list[str]:
+        if isinstance(value, str):
+            return value.split()
+        return value or []
+
+
+@dataclass(frozen=True)
+class ImportedBatch:
+    # users inserted, users skipped because the username or email is taken
+    imported: int
+    skipped: int
+    # assignments skipped because the role or permission does not exist
+    unknown_roles: int
+    unknown_permissions: int
+
+
+class UsersImporter:
+    """Import users by batches with set-based statements.
+
+    A batch is copied into a temporary staging table, users are inserted from there
+    and their roles and permissions are resolved by joins, all within a single transaction.
+    Importing is idempotent: users with taken usernames or emails are skipped,
+    so a batch interrupted before being committed can be imported again.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def import_batch(self, users: list[ImportedUser], hashed_passwords: list[str]) -> ImportedBatch:
+        await self.session.execute(
+            text(
+                f"""
+                CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                    id uuid PRIMARY KEY,
+                    username varchar(50) NOT NULL,
+                    password varchar(255) NOT NULL,
+                    first_name varchar(255) NOT NULL,
+                    last_name varchar(255) NOT NULL,
+                    email varchar(255),
+                    role varchar,
+                    permissions varchar[] NOT NULL
+                ) ON COMMIT DROP
+                """
+            )
+        )
+        await self.__copy(
+            [
+                (
+                    uuid4(),
+                    user.username,
+                    hashed_password,
+                    user.first_name,
+                    user.last_name,
+                    user.email,
+                    user.role,
+                    user.permissions,
+                )
+                for user, hashed_password in zip(users, hashed_passwords)
+            ]
+        )
+
+        imported = await self.session.execute(
+            text(
+                f"""
+                INSERT INTO users (id, username, password, email, first_name, last_name, membership,
+                                   created_at, modified_at)
+                SELECT id, username, password, email, first_name, last_name, false, now(), now()
+                FROM {STAGING_TABLE}
+                ON CONFLICT DO NOTHING
+                """
+            )
+        )
+        # only the users inserted by the batch get roles and permissions
+        await self.session.execute(
+            text(
+                f"""
+                INSERT INTO user_roles (id, role_id, user_id, created_at, modified_at)
+                SELECT gen_random_uuid(), roles.id, staged.id, now(), now()
+                FROM {STAGING_TABLE} AS staged
+                JOIN users ON users.id = staged.id
+                JOIN roles ON roles.name = staged.role
+                ON CONFLICT DO NOTHING
+                """
+            )
+        )
+        await self.session.execute(
+            text(
+                f"""
+                INSERT INTO users_permissions (id, permission_id, user_id, created_at, modified_at)
+                SELECT gen_random_uuid(), permissions.id, staged.id, now(), now()
+                FROM {STAGING_TABLE} AS staged
+                JOIN users ON users.id = staged.id
+                CROSS JOIN LATERAL unnest(staged.permissions) AS granted(permission)
+                JOIN permissions
+                    ON permissions.src = split_part(granted.permission, ':', 1)
+                    AND permissions.type::text = upper(split_part(granted.permission, ':', 2))
+                ON CONFLICT DO NOTHING
+                """
+            )
+        )
+        # only the users inserted by the batch are counted, skipped ones get no roles or permissions anyway
+        unknown = (
+            await self.session.execute(
+                text(
+                    f"""
+                    SELECT
+                        count(*) FILTER (
+                            WHERE staged.role IS NOT NULL
+                            AND NOT EXISTS (SELECT FROM roles WHERE roles.name = staged.role)
+                        ) AS roles,
+                        coalesce(sum(unknown_permissions.count), 0)::bigint AS permissions
+                    FROM {STAGING_TABLE} AS staged
+                    JOIN users ON users.id = staged.id
+                    CROSS JOIN LATERAL (
+                        SELECT count(*) FROM unnest(staged.permissions) AS granted(permission)
+                        WHERE NOT EXISTS (
+                            SELECT FROM permissions
+                            WHERE permissions.src = split_part(granted.permission, ':', 1)
+                            AND permissions.type::text = upper(split_part(granted.permission, ':', 2))
+                        )
+                    ) AS unknown_permissions
+                    """
+                )
+            )
+        ).one()
+        await self.session.commit()
+
+        return ImportedBatch(
+            imported=imported.rowcount,
+            skipped=len(users) - imported.rowcount,
+            unknown_roles=unknown.roles,
+            unknown_permissions=unknown.permissions,
+        )
+
+    async def __copy(self, records: list[tuple[UUID | str | list[str] | None, ...]]) -> None:
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        # COPY is not supported by SQLAlchemy, so the asyncpg connection is used directly
+        await raw_connection.driver_connection.copy_records_to_table(
+            STAGING_TABLE, records=records, columns=STAGING_COLUMNS
+        )
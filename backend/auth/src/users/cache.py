@@ -0,0 +1,130 @@
+from typing import Annotated, Any
+from uuid import UUID
+
+import orjson
+from fastapi import Depends
+from opentelemetry import metrics
+from redis.asyncio import Redis
+
+from src.common.cache import AbstractCache, RedisCache
+from src.common.database import get_redis
+from src.settings.app import get_app_settings
+from src.users import schemas as users_schemas
+
+settings = get_app_settings()
+
+# bump on every change of `users_schemas.User`, so entries of the previous shape are never read
+USERS_CACHE_VERSION = 1
+
+
+class UsersCacheStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+users_cache_stats = UsersCacheStats()
+
+meter = metrics.get_meter(__name__)
+users_cache_hits = meter.create_counter(
+    "auth.users_cache.hits",
+    description="Number of users identities read from the cache",
+)
+users_cache_misses = meter.create_counter(
+    "auth.users_cache.misses",
+    description="Number of users identities missing in the cache and read from the database",
+)
+meter.create_observable_gauge(
+    "auth.users_cache.hit_ratio",
+    callbacks=[lambda _: [metrics.Observation(users_cache_stats.hit_ratio)]],
+    description="Share of users identities lookups served by the cache since the start",
+)
+
+
+class UsersCache:
+    """Read-through cache of users identities: profile, role and effective permissions.
+
+    Every entry keeps the generation of the cache it was loaded at. A role or permission change
+    bumps the generation and so invalidates all the entries with a single command,
+    while a change of a user deletes the entry of the user only.
+    """
+
+    def __init__(self, cache: AbstractCache, ttl_sec: int, key_prefix: str = "auth:users") -> None:
+        self.cache = cache
+        self.ttl_sec = ttl_sec
+        self.key_prefix = f"{key_prefix}:v{USERS_CACHE_VERSION}"
+        self.generation_key = f"{key_prefix}:generation"
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.ttl_sec > 0
+
+    def user_key(self, user_id: UUID) -> str:
+        return f"{self.key_prefix}:id:{user_id}"
+
+    def username_key(self, username: str) -> str:
+        return f"{self.key_prefix}:username:{username}"
+
+    async def get_many(self, user_ids: list[UUID]) -> tuple[dict[UUID, users_schemas.User], int]:
+        """Get cached users by their ids and the current generation to cache the missing ones with."""
+        *entries, generation = await self.cache.get_many(
+            *(self.user_key(user_id) for user_id in user_ids), self.generation_key
+        )
+        generation = int(generation or 0)
+
+        users = {}
+        for user_id, entry in zip(user_ids, entries):
+            if entry is not None and (entry := orjson.loads(entry))["generation"] == generation:
+                users[user_id] = users_schemas.User.model_validate(entry["user"])
+
+        self.__count_lookups(hits=len(users), misses=len(user_ids) - len(users))
+        return users, generation
+
+    async def get_user_id(self, username: str) -> tuple[UUID | None, int]:
+        """Get the id of the last user cached with the username and the current generation."""
+        user_id, generation = await self.cache.get_many(self.username_key(username), self.generation_key)
+        return (
+            UUID(orjson.loads(user_id)) if user_id is not None else None,
+            int(generation or 0),
+        )
+
+    async def set_many(self, users: list[users_schemas.User], generation: int) -> None:
+        if not users:
+            return
+
+        batch = self.cache.batch()
+        for user in users:
+            entry: dict[str, Any] = {"generation": generation, "user": user.model_dump(mode="json")}
+            batch.set(key=self.user_key(user.id), data=orjson.dumps(entry), timeout_secs=self.ttl_sec)
+            batch.set(
+                key=self.username_key(user.username),
+                data=orjson.dumps(str(user.id)),
+                timeout_secs=self.ttl_sec,
+            )
+        await batch.execute()
+
+    async def invalidate(self, *user_ids: UUID) -> None:
+        """Invalidate the cached users, e.g. after a change of their role or permissions."""
+        await self.cache.delete(*(self.user_key(user_id) for user_id in user_ids))
+
+    async def invalidate_all(self) -> None:
+        """Invalidate all the cached users, e.g. after a change of a role or a permission."""
+        await self.cache.increment(self.generation_key)
+
+    @staticmethod
+    def __count_lookups(hits: int, misses: int) -> None:
+        users_cache_stats.hits += hits
+        users_cache_stats.misses += misses
+        if hits:
+            users_cache_hits.add(hits)
+        if misses:
+            users_cache_misses.add(misses)
+
+
+async def get_users_cache(redis: Annotated[Redis, Depends(get_redis)]) -> UsersCache:
+    return UsersCache(cache=RedisCache(redis_client=redis), ttl_sec=settings.auth.users_cache_ttl_sec)
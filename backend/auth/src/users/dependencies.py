@@ -2,10 +2,11 @@ from typing import Annotated
 from uuid import UUID
 
 from fastapi import Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.auth import dependencies as auth_depends
 from src.auth.jwt.backend import JWTAuthorizationBackend
+from src.users import schemas as users_schemas
 from src.users.repositories import (
     UserRepository,
     UserSignInHistoryRepository,
@@ -29,6 +30,10 @@ class UserRole(BaseModel):
     role_id: UUID
 
 
+class UsersPermissions(users_schemas.UsersSelection):
+    permission_ids: list[UUID] = Field(min_length=1)
+
+
 class PasswordChange(BaseModel):
     old_password: str
     password: str
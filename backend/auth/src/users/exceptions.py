@@ -13,3 +13,13 @@ class UserPermissionError(ServiceAPIError):
 
 class UserUpdateError(ServiceAPIError):
     status_code: int = HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+class PasswordHashingOverloadedError(ServiceAPIError):
+    status_code: int = HTTPStatus.SERVICE_UNAVAILABLE
+    detail: str = "Service is overloaded. Please try again later."
+
+
+class SigninHistoryCursorError(ServiceAPIError):
+    status_code: int = HTTPStatus.BAD_REQUEST
+    detail: str = "Invalid signin history cursor."
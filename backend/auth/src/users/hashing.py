@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, TypeVar
+from uuid import UUID
+
+from opentelemetry import metrics
+from sqlalchemy import update
+
+from src.common import database
+from src.settings.app import get_app_settings
+from src.users import models as users_models
+from src.users import utils
+from src.users.exceptions import PasswordHashingOverloadedError
+
+logger = logging.getLogger(__name__)
+
+settings = get_app_settings()
+
+T = TypeVar("T")
+
+
+class PasswordHashingPool:
+    """Pool of processes to hash passwords without blocking the event loop.
+
+    At most `max_workers` hashes are computed at once and up to `max_queue_size` more wait
+    for a free worker. Requests over that are rejected right away, so a burst of signins
+    can't make the rest of the requests wait behind it.
+    """
+
+    def __init__(self, max_workers: int | None, max_queue_size: int) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_size = max_queue_size
+
+        self.rejected = 0
+        self._in_flight = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._in_flight - self.max_workers, 0)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._in_flight >= self.max_workers + self.max_queue_size:
+            self.rejected += 1
+            raise PasswordHashingOverloadedError(headers={"Retry-After": "1"})
+
+        if self._executor is None:
+            # workers are spawned, so they do not inherit the event loop and connections of the service
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+        self._in_flight += 1
+        started_at = time.monotonic()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._in_flight -= 1
+            hashing_duration.record(time.monotonic() - started_at, {"operation": func.__name__})
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hashing_pool = PasswordHashingPool(
+    max_workers=settings.auth.password_hashing_workers,
+    max_queue_size=settings.auth.password_hashing_queue_size,
+)
+
+meter = metrics.get_meter(__name__)
+hashing_duration = meter.create_histogram(
+    "auth.password_hashing.duration",
+    unit="s",
+    description="Time to hash or verify a password including the time waiting for a worker",
+)
+meter.create_observable_gauge(
+    "auth.password_hashing.queue_depth",
+    callbacks=[lambda _: [metrics.Observation(password_hashing_pool.queue_depth)]],
+    description="Number of passwords waiting for a free hashing worker",
+)
+meter.create_observable_counter(
+    "auth.password_hashing.rejected",
+    callbacks=[lambda _: [metrics.Observation(password_hashing_pool.rejected)]],
+    description="Number of password hashing requests rejected because the queue is full",
+)
+
+
+class PasswordRehasher:
+    """Rehash passwords stored with stale hashing parameters after a successful signin.
+
+    Rehashing runs in the background, so signin does not wait for the second hash.
+    """
+
+    def __init__(self, rounds: int | None) -> None:
+        self.rounds = rounds
+        self._tasks: set[asyncio.Task] = set()
+
+    def is_stale(self, hashed_password: str) -> bool:
+        return utils.needs_rehash(hashed_password, self.rounds)
+
+    def schedule(self, user_id: UUID, password: str, hashed_password: str) -> None:
+        task = asyncio.create_task(self._rehash(user_id, password, hashed_password))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def wait(self) -> None:
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _rehash(self, user_id: UUID, password: str, hashed_password: str) -> None:
+        if database.async_session is None:
+            return
+
+        try:
+            new_hashed_password = await hash_password(password)
+            async with database.async_session() as session:
+                # the password might have been changed meanwhile
+                stmt = (
+                    update(users_models.User)
+                    .where(users_models.User.id == user_id, users_models.User.password == hashed_password)
+                    .values(password=new_hashed_password)
+                )
+                await session.execute(stmt)
+                await session.commit()
+        except PasswordHashingOverloadedError:
+            logger.info("Password of user %s has not been rehashed, hashing is overloaded", user_id)
+        except Exception:
+            logger.exception("Error when rehashing password of user %s", user_id)
+        else:
+            logger.debug("Password of user %s has been rehashed", user_id)
+
+
+password_rehasher = PasswordRehasher(rounds=settings.auth.password_hashing_rounds)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hashing_pool.run(
+        utils.hash_password, password, settings.auth.password_hashing_rounds
+    )
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await password_hashing_pool.run(utils.verify_password, password, hashed_password)
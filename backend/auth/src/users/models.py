@@ -1,9 +1,13 @@
-from sqlalchemy import ForeignKey, String, Boolean, UniqueConstraint
+from datetime import datetime
+
+from sqlalchemy import DDL, Boolean, Enum, ForeignKey, Index, Integer, String, UniqueConstraint, event
 from sqlalchemy.dialects.postgresql import INET, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 
 from src.common import models
 from src.common.database import Base
+from src.permissions.models import PermissionType
 
 
 class User(models.UUIDSchemaMixin, models.TimestampSchemaMixin, Base):
@@ -27,12 +31,29 @@ class User(models.UUIDSchemaMixin, models.TimestampSchemaMixin, Base):
 class UserSigninHistory(models.UUIDSchemaMixin, models.TimestampSchemaMixin, Base):
     __tablename__ = "user_login_history"
 
+    # the table is partitioned by months of `created_at`, so it has to be a part of the primary key
+    created_at: Mapped[datetime] = mapped_column(primary_key=True, default=func.now())
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     user_agent: Mapped[str] = mapped_column(String(255))
     ip_address: Mapped[INET] = mapped_column(INET())
 
     user: Mapped[User] = relationship(back_populates="user_history")
 
+    __table_args__ = (
+        Index("ix_user_login_history_user_id_created_at", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+# records out of the monthly partitions (see `src.users.partitions`) go to the default one
+event.listen(
+    UserSigninHistory.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE user_login_history_default PARTITION OF user_login_history DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
+
 
 class UserPermissions(models.UUIDSchemaMixin, models.TimestampSchemaMixin, Base):
     __tablename__ = "users_permissions"
@@ -51,3 +72,21 @@ class UserRole(models.UUIDSchemaMixin, models.TimestampSchemaMixin, Base):
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
 
     __table_args__ =( UniqueConstraint(role_id, user_id, name="unique_together_role_id_user_id"),)
+
+
+class UserEffectivePermission(Base):
+    """Materialized union of the permissions assigned to a user directly and through roles.
+
+    The rows are maintained by the database triggers of the migration, `grants` counts the assignments
+    (direct and through every role) that grant the permission to the user.
+    """
+
+    __tablename__ = "user_effective_permissions"
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    permission_id: Mapped[UUID] = mapped_column(
+        ForeignKey("permissions.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    src: Mapped[str] = mapped_column(String(255), nullable=False)
+    type: Mapped[PermissionType] = mapped_column(Enum(PermissionType), nullable=False)
+    grants: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
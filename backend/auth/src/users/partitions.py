@@ -0,0 +1,87 @@
+import logging
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+SIGNIN_HISTORY_TABLE = "user_login_history"
+SIGNIN_HISTORY_PARTITION_PATTERN = re.compile(rf"^{SIGNIN_HISTORY_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def add_months(month: date, months: int) -> date:
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def get_partition_name(month: date) -> str:
+    return f"{SIGNIN_HISTORY_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+async def get_signin_history_partitions(session: AsyncSession) -> dict[str, date]:
+    """Get monthly partitions of the signin history by their first day."""
+    stmt = text(
+        """
+        SELECT partition.relname FROM pg_inherits
+        JOIN pg_class AS partition ON partition.oid = pg_inherits.inhrelid
+        JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+        WHERE parent.relname = :table
+        """
+    )
+    result = await session.execute(stmt, {"table": SIGNIN_HISTORY_TABLE})
+
+    partitions = {}
+    for (name,) in result:
+        if match := SIGNIN_HISTORY_PARTITION_PATTERN.match(name):
+            partitions[name] = date(int(match[1]), int(match[2]), 1)
+    return partitions
+
+
+async def create_signin_history_partitions(session: AsyncSession, since: date, months: int) -> list[str]:
+    """Create monthly partitions of the signin history for `months` months since the month of `since`.
+
+    Partitions should be created ahead of time: a partition can't be created for a month
+    that already has records in the default partition.
+    """
+    existing_partitions = await get_signin_history_partitions(session)
+
+    created_partitions = []
+    for i in range(months):
+        month = add_months(since.replace(day=1), i)
+        if (name := get_partition_name(month)) in existing_partitions:
+            continue
+
+        await session.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF {SIGNIN_HISTORY_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+        )
+        created_partitions.append(name)
+        logger.info("Signin history partition %s has been created", name)
+
+    await session.commit()
+    return created_partitions
+
+
+async def drop_signin_history_partitions(session: AsyncSession, before: date) -> list[str]:
+    """Drop monthly partitions of the signin history ending before the month of `before`.
+
+    Dropping a partition is instant, unlike deleting its records one by one.
+    """
+    before = before.replace(day=1)
+    partitions = await get_signin_history_partitions(session)
+
+    dropped_partitions = []
+    for name, month in sorted(partitions.items(), key=lambda partition: partition[1]):
+        if month >= before:
+            break
+
+        await session.execute(text(f"DROP TABLE {name}"))
+        dropped_partitions.append(name)
+        logger.info("Signin history partition %s has been dropped", name)
+
+    await session.commit()
+    return dropped_partitions
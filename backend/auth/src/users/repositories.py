@@ -1,13 +1,12 @@
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
 from typing import Annotated, Any, cast
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from fastapi import Depends
-from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy import delete, select, update, func
+from sqlalchemy import JSON, Executable, Row, Select, delete, func, select, true, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
 from permissions.enums import ServiceInternalRoles
 from src.common.database import get_db
@@ -15,12 +14,37 @@ from src.permissions import models as permissions_models
 from src.role import models as role_models
 from src.users import models as users_models
 from src.users import schemas as users_schemas
-from src.users.utils import hash_password, verify_password
+from src.users.cache import UsersCache, get_users_cache
+from src.users.hashing import hash_password, password_rehasher, verify_password
+from src.users.signin_history import SigninHistoryWriter, signin_history_writer
+
+
+def select_user_ids(selection: users_schemas.UsersSelection) -> Select:
+    """Select ids of the users selected by their ids or the filter."""
+    stmt = select(users_models.User.id)
+    if selection.user_ids is not None:
+        return stmt.where(users_models.User.id.in_(selection.user_ids))
+
+    users_filter = selection.filter
+    if users_filter.role_id is not None:
+        stmt = stmt.where(
+            select(users_models.UserRole.id)
+            .where(
+                users_models.UserRole.user_id == users_models.User.id,
+                users_models.UserRole.role_id == users_filter.role_id,
+            )
+            .exists()
+        )
+    if users_filter.membership is not None:
+        stmt = stmt.where(users_models.User.membership == users_filter.membership)
+    return stmt
 
 
 class UserSignInHistoryRepository(ABC):
     @abstractmethod
-    async def get_user_signin_history(self, user_id) -> Page[users_schemas.UserLoginRecord]:
+    async def get_user_signin_history(
+        self, user_id: UUID, size: int, cursor: users_schemas.SigninHistoryCursor | None = None
+    ) -> users_schemas.UserLoginRecordsPage:
         ...
 
     @abstractmethod
@@ -67,6 +91,11 @@ class UserRepository(ABC):
     async def check_password(self, user_id: UUID, password: str) -> bool:
         ...
 
+    @abstractmethod
+    async def authenticate(self, username: str, password: str) -> users_schemas.User | None:
+        """Get the user by the username if the password is correct."""
+        ...
+
     @abstractmethod
     async def assign_role(self, user_id: UUID, role_id: UUID) -> users_schemas.User:
         ...
@@ -87,6 +116,18 @@ class UserRepository(ABC):
     async def revoke_role(self, user_id: UUID, role_id: UUID) -> users_schemas.User:
         ...
 
+    @abstractmethod
+    async def assign_permissions_to_users(
+        self, selection: users_schemas.UsersSelection, permission_ids: list[UUID]
+    ) -> users_schemas.BulkAssignmentResult:
+        ...
+
+    @abstractmethod
+    async def revoke_permissions_from_users(
+        self, selection: users_schemas.UsersSelection, permission_ids: list[UUID]
+    ) -> users_schemas.BulkAssignmentResult:
+        ...
+
     @abstractmethod
     async def delete_user(self, user_id: UUID) -> None:
         ...
@@ -96,15 +137,32 @@ class PostgresUserSigninHistoryRepository(UserSignInHistoryRepository):
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
-    async def get_user_signin_history(self, user_id) -> Page[users_schemas.UserLoginRecord]:
-        stmt = select(users_models.UserSigninHistory).where(users_models.UserSigninHistory.user_id == user_id)
-
-        def transformer(
-            items: list[users_models.UserSigninHistory],
-        ) -> list[users_schemas.UserLoginRecord]:
-            return [users_schemas.UserLoginRecord.model_validate(record) for record in items]
+    async def get_user_signin_history(
+        self, user_id: UUID, size: int, cursor: users_schemas.SigninHistoryCursor | None = None
+    ) -> users_schemas.UserLoginRecordsPage:
+        """Get a page of the user's signin records from the newest.
 
-        return await paginate(self.session, stmt, transformer=transformer)  # type: ignore
+        Pages are selected by the (user_id, created_at) index from the cursor on, instead of an offset,
+        so getting a page does not slow down with the history growth.
+        """
+        history = users_models.UserSigninHistory
+        stmt = (
+            select(history)
+            .where(history.user_id == user_id)
+            .order_by(history.created_at.desc(), history.id.desc())
+            .limit(size + 1)
+        )
+        if cursor is not None:
+            stmt = stmt.where(tuple_(history.created_at, history.id) < tuple_(cursor.created_at, cursor.id))
+        records = (await self.session.scalars(stmt)).all()
+
+        items = [users_schemas.UserLoginRecord.model_validate(record) for record in records[:size]]
+        next_cursor = None
+        if len(records) > size:
+            next_cursor = users_schemas.SigninHistoryCursor(
+                created_at=items[-1].created_at, id=items[-1].id
+            ).encode()
+        return users_schemas.UserLoginRecordsPage(items=items, next_cursor=next_cursor)
 
     async def create_record(
         self, user_id: UUID, user_agent: str, ip_address: str
@@ -117,73 +175,62 @@ class PostgresUserSigninHistoryRepository(UserSignInHistoryRepository):
         return users_schemas.UserLoginRecord.model_validate(record)
 
 
-class PostgresUserRepository(UserRepository):
-    def __init__(self, session: AsyncSession) -> None:
-        self.session = session
+class BufferedUserSigninHistoryRepository(UserSignInHistoryRepository):
+    """Signin history repository writing records by the background writer.
 
-    async def get(self, user_id: UUID) -> users_schemas.User | None:
-        user = await self.session.get(
-            users_models.User,
-            user_id,
-        )
+    Records are written right away if the writer is not running or overloaded.
+    """
 
-        if user is None:
-            return None
+    def __init__(self, repository: UserSignInHistoryRepository, writer: SigninHistoryWriter) -> None:
+        self.repository = repository
+        self.writer = writer
 
-        permissions = await self.__get_permissions(user.id)
+    async def get_user_signin_history(
+        self, user_id: UUID, size: int, cursor: users_schemas.SigninHistoryCursor | None = None
+    ) -> users_schemas.UserLoginRecordsPage:
+        return await self.repository.get_user_signin_history(user_id, size, cursor)
 
-        user_schema = users_schemas.User(
-            id=user.id,
-            username=user.username,
-            email=user.email,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            role=user.role.name if user.role else ServiceInternalRoles.guest,
-            permissions=permissions,
+    async def create_record(
+        self, user_id: UUID, user_agent: str, ip_address: str
+    ) -> users_schemas.UserLoginRecord:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        record = users_schemas.UserLoginRecord(
+            id=uuid4(),
+            user_id=user_id,
+            user_agent=user_agent,
+            ip_address=ip_address,
+            created_at=now,
+            modified_at=now,
         )
+        if self.writer.put(record.model_dump()):
+            return record
+        return await self.repository.create_record(user_id, user_agent, ip_address)
+
+
+class PostgresUserRepository(UserRepository):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get(self, user_id: UUID) -> users_schemas.User | None:
+        stmt = self.__select_users().where(users_models.User.id == user_id)
+        result = await self.session.execute(stmt)
+        row = result.first()
 
-        return user_schema
+        return self.__to_user_schema(row) if row is not None else None
 
     async def get_by_ids(self, ids: list[UUID]) -> list[users_schemas.User]:
-        stmt = (
-            select(users_models.User)
-            .options(
-                joinedload(users_models.User.permissions).joinedload(users_models.UserPermissions.permission)
-            )
-            .where(users_models.User.id.in_(ids))
-        )
+        stmt = self.__select_users().where(users_models.User.id.in_(ids))
         result = await self.session.execute(stmt)
-        users = result.unique().scalars().all()
-
-        return [
-            users_schemas.User(
-                id=user.id,
-                username=user.username,
-                email=user.email,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                permissions=[user_permission.Permission.src for user_permission in user.permissions],
-            )
-            for user in users
-        ]
+
+        return [self.__to_user_schema(row) for row in result]
 
     async def filter_by(self, **kwargs: Any) -> list[users_schemas.User]:
-        stmt = select(users_models.User).filter_by(**kwargs)
+        stmt = self.__select_users().where(
+            *(getattr(users_models.User, field) == value for field, value in kwargs.items())
+        )
         result = await self.session.execute(stmt)
-        users = result.unique().scalars().all()
-
-        return [
-            users_schemas.User(
-                id=user.id,
-                username=user.username,
-                email=user.email,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                role=user.role.name if user.role else ServiceInternalRoles.guest,
-                permissions=await self.__get_permissions(user.id),
-            )
-            for user in users
-        ]
+
+        return [self.__to_user_schema(row) for row in result]
 
     async def update(
         self,
@@ -197,6 +244,7 @@ class PostgresUserRepository(UserRepository):
 
         stmt = update(users_models.User).where(users_models.User.id == user_id).values(**values_to_update)
         await self.session.execute(stmt)
+        await self.session.commit()
 
         return cast(
             users_schemas.User,
@@ -211,7 +259,7 @@ class PostgresUserRepository(UserRepository):
             email=email,
             first_name=first_name,
             last_name=last_name,
-            password=hash_password(password),
+            password=await hash_password(password),
         )
         self.session.add(user)
         await self.session.commit()
@@ -222,7 +270,7 @@ class PostgresUserRepository(UserRepository):
         stmt = (
             update(users_models.User)
             .where(users_models.User.id == user_id)
-            .values(password=hash_password(new_password))
+            .values(password=await hash_password(new_password))
         )
         await self.session.execute(stmt)
         await self.session.commit()
@@ -240,8 +288,19 @@ class PostgresUserRepository(UserRepository):
         if password_row is None:
             raise ValueError(f"there is not User with {user_id=}")
 
-        current_password = password_row[0]
-        return verify_password(password, current_password)
+        return await self.__verify_password(user_id, password, password_row[0])
+
+    async def authenticate(self, username: str, password: str) -> users_schemas.User | None:
+        # the password hash is selected along with the user identity, so it takes a single round trip
+        stmt = self.__select_users().add_columns(users_models.User.password).where(
+            users_models.User.username == username
+        )
+        result = await self.session.execute(stmt)
+        row = result.first()
+
+        if row is not None and await self.__verify_password(row.id, password, row.password):
+            return self.__to_user_schema(row)
+        return None
 
     async def assign_permission(self, user_id: UUID, permission_id: UUID) -> users_schemas.User:
         user_permission = users_models.UserPermissions(
@@ -274,6 +333,7 @@ class PostgresUserRepository(UserRepository):
             .where(users_models.UserPermissions.permission_id == permission_id)
         )
         await self.session.execute(stmt)
+        await self.session.commit()
 
         return cast(
             users_schemas.User,
@@ -287,6 +347,7 @@ class PostgresUserRepository(UserRepository):
             .where(users_models.UserRole.role_id == role_id)
         )
         await self.session.execute(stmt)
+        await self.session.commit()
 
         return cast(
             users_schemas.User,
@@ -303,92 +364,235 @@ class PostgresUserRepository(UserRepository):
 
         return cast(users_schemas.User, await self.get(user_id))
 
+    async def assign_permissions_to_users(
+        self, selection: users_schemas.UsersSelection, permission_ids: list[UUID]
+    ) -> users_schemas.BulkAssignmentResult:
+        user_ids = select_user_ids(selection).subquery()
+        permission = permissions_models.Permission
+        stmt = (
+            insert(users_models.UserPermissions)
+            .from_select(
+                ["id", "user_id", "permission_id", "created_at", "modified_at"],
+                select(func.gen_random_uuid(), user_ids.c.id, permission.id, func.now(), func.now())
+                .join(permission, true())
+                .where(permission.id.in_(permission_ids)),
+            )
+            .on_conflict_do_nothing()
+        )
+
+        return await self.__apply_bulk_assignment(selection, stmt)
+
+    async def revoke_permissions_from_users(
+        self, selection: users_schemas.UsersSelection, permission_ids: list[UUID]
+    ) -> users_schemas.BulkAssignmentResult:
+        stmt = delete(users_models.UserPermissions).where(
+            users_models.UserPermissions.user_id.in_(select_user_ids(selection)),
+            users_models.UserPermissions.permission_id.in_(permission_ids),
+        )
+
+        return await self.__apply_bulk_assignment(selection, stmt)
+
     async def delete_user(self, user_id: UUID) -> None:
         stmt = delete(users_models.User).where(users_models.User.id == user_id)
         await self.session.execute(stmt)
         await self.session.commit()
 
-    async def __get_permissions(
-        self, user_id: UUID
-    ) -> dict[str, list[str],] | None:
-        # Part 1: Direct permissions assigned to users
-        direct_permissions_subquery = (
+    async def __apply_bulk_assignment(
+        self, selection: users_schemas.UsersSelection, stmt: Executable
+    ) -> users_schemas.BulkAssignmentResult:
+        matched_users = await self.session.scalar(
+            select(func.count()).select_from(select_user_ids(selection).subquery())
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+
+        return users_schemas.BulkAssignmentResult(matched_users=matched_users, affected=result.rowcount)
+
+    @staticmethod
+    def __select_users() -> Select:
+        """Select users with their role name and effective permissions within a single statement.
+
+        Effective permissions are read from their materialized table by the user id,
+        aggregated into a JSON object of src to the list of permission types.
+        """
+        effective_permissions = users_models.UserEffectivePermission
+        permissions_by_src = (
             select(
-                users_models.User.username,
-                permissions_models.Permission.src,
-                func.array_agg(func.distinct(permissions_models.Permission.type)).label("types"),
-            )
-            .join(
-                users_models.UserPermissions,
-                users_models.User.id == users_models.UserPermissions.user_id,
-            )
-            .join(
-                permissions_models.Permission,
-                users_models.UserPermissions.permission_id == permissions_models.Permission.id,
-            )
-            .where(users_models.User.id == user_id)
-            .group_by(
-                users_models.User.username,
-                permissions_models.Permission.src,
+                effective_permissions.src,
+                func.array_agg(func.distinct(effective_permissions.type)).label("types"),
             )
-            .subquery()
+            .where(effective_permissions.user_id == users_models.User.id)
+            .group_by(effective_permissions.src)
+            .lateral("permissions_by_src")
+        )
+        role_name = (
+            select(role_models.Role.name)
+            .join(users_models.UserRole, users_models.UserRole.role_id == role_models.Role.id)
+            .where(users_models.UserRole.user_id == users_models.User.id)
+            .limit(1)
+            .scalar_subquery()
         )
 
-        # Part 2: Permissions assigned through roles
-        role_permissions_subquery = (
+        return (
             select(
+                users_models.User.id,
                 users_models.User.username,
-                permissions_models.Permission.src,
-                func.array_agg(func.distinct(permissions_models.Permission.type)).label("types"),
-            )
-            .join(
-                users_models.UserRole,
-                users_models.User.id == users_models.UserRole.user_id,
-            )
-            .join(
-                role_models.Role,
-                users_models.UserRole.role_id == role_models.Role.id,
-            )
-            .join(
-                role_models.RolePermissions,
-                role_models.Role.id == role_models.RolePermissions.role_id,
-            )
-            .join(
-                permissions_models.Permission,
-                role_models.RolePermissions.permission_id == permissions_models.Permission.id,
-            )
-            .where(users_models.User.id == user_id)
-            .group_by(
-                users_models.User.username,
-                permissions_models.Permission.src,
+                users_models.User.email,
+                users_models.User.first_name,
+                users_models.User.last_name,
+                role_name.label("role"),
+                func.json_object_agg(permissions_by_src.c.src, permissions_by_src.c.types, type_=JSON)
+                .filter(permissions_by_src.c.src.is_not(None))
+                .label("permissions"),
             )
-            .subquery()
+            .outerjoin(permissions_by_src, true())
+            .group_by(users_models.User.id)
         )
 
-        # Combining both queries
-        final_query = select(
-            direct_permissions_subquery.c.username,
-            direct_permissions_subquery.c.src,
-            direct_permissions_subquery.c.types,
-        ).union(
-            select(
-                role_permissions_subquery.c.username,
-                role_permissions_subquery.c.src,
-                role_permissions_subquery.c.types,
-            )
+    @staticmethod
+    async def __verify_password(user_id: UUID, password: str, hashed_password: str) -> bool:
+        is_password_ok = await verify_password(password, hashed_password)
+        if is_password_ok and password_rehasher.is_stale(hashed_password):
+            password_rehasher.schedule(user_id, password, hashed_password)
+        return is_password_ok
+
+    @staticmethod
+    def __to_user_schema(row: Row) -> users_schemas.User:
+        return users_schemas.User(
+            id=row.id,
+            username=row.username,
+            email=row.email,
+            first_name=row.first_name,
+            last_name=row.last_name,
+            role=row.role or ServiceInternalRoles.guest,
+            permissions=row.permissions or {},
         )
 
-        result = await self.session.execute(final_query)
-        rows = result.fetchall()
 
-        return {row.src: row.types for row in rows}
+class CachedUserRepository(UserRepository):
+    """User repository reading users identities through the cache.
+
+    Every mutating method invalidates the cached identity of the user once done.
+    """
+
+    def __init__(self, repository: UserRepository, users_cache: UsersCache) -> None:
+        self.repository = repository
+        self.users_cache = users_cache
+
+    async def get(self, user_id: UUID) -> users_schemas.User | None:
+        users = await self.get_by_ids([user_id])
+        return users[0] if users else None
+
+    async def get_by_ids(self, ids: list[UUID]) -> list[users_schemas.User]:
+        if not self.users_cache.is_enabled or not ids:
+            return await self.repository.get_by_ids(ids)
+
+        users_by_id, generation = await self.users_cache.get_many(ids)
+        if missing_ids := [user_id for user_id in ids if user_id not in users_by_id]:
+            loaded_users = await self.repository.get_by_ids(missing_ids)
+            await self.users_cache.set_many(loaded_users, generation)
+            users_by_id.update((user.id, user) for user in loaded_users)
+
+        return [users_by_id[user_id] for user_id in ids if user_id in users_by_id]
+
+    async def filter_by(self, **kwargs: Any) -> list[users_schemas.User]:
+        if not self.users_cache.is_enabled or kwargs.keys() != {"username"}:
+            return await self.repository.filter_by(**kwargs)
+
+        username = kwargs["username"]
+        user_id, generation = await self.users_cache.get_user_id(username)
+        # the user might have been renamed since, so the username is checked against the identity
+        if user_id is not None and (user := await self.get(user_id)) and user.username == username:
+            return [user]
+
+        users = await self.repository.filter_by(**kwargs)
+        await self.users_cache.set_many(users, generation)
+        return users
+
+    async def update(
+        self,
+        user_id: UUID,
+        username: str | None = None,
+        first_name: str | None = None,
+        last_name: str | None = None,
+    ) -> users_schemas.User:
+        user = await self.repository.update(user_id, username, first_name, last_name)
+        await self.users_cache.invalidate(user_id)
+        return user
+
+    async def create(
+        self, username: str, first_name: str, last_name: str, password: str, email: str | None = None
+    ) -> users_schemas.User:
+        return await self.repository.create(username, first_name, last_name, password, email)
+
+    async def change_password(self, user_id: UUID, new_password: str) -> users_schemas.User:
+        user = await self.repository.change_password(user_id, new_password)
+        await self.users_cache.invalidate(user_id)
+        return user
+
+    async def check_password(self, user_id: UUID, password: str) -> bool:
+        return await self.repository.check_password(user_id, password)
+
+    async def authenticate(self, username: str, password: str) -> users_schemas.User | None:
+        # password hashes are never cached
+        return await self.repository.authenticate(username, password)
+
+    async def assign_role(self, user_id: UUID, role_id: UUID) -> users_schemas.User:
+        user = await self.repository.assign_role(user_id, role_id)
+        await self.users_cache.invalidate(user_id)
+        return user
+
+    async def assign_permission(self, user_id: UUID, permission_id: UUID) -> users_schemas.User:
+        user = await self.repository.assign_permission(user_id, permission_id)
+        await self.users_cache.invalidate(user_id)
+        return user
+
+    async def assign_bulk_permissions(self, user_id: UUID, permission_ids: list[UUID]) -> users_schemas.User:
+        user = await self.repository.assign_bulk_permissions(user_id, permission_ids)
+        await self.users_cache.invalidate(user_id)
+        return user
+
+    async def revoke_permission(self, user_id: UUID, permission_id: UUID) -> users_schemas.User:
+        user = await self.repository.revoke_permission(user_id, permission_id)
+        await self.users_cache.invalidate(user_id)
+        return user
+
+    async def revoke_role(self, user_id: UUID, role_id: UUID) -> users_schemas.User:
+        user = await self.repository.revoke_role(user_id, role_id)
+        await self.users_cache.invalidate(user_id)
+        return user
+
+    async def assign_permissions_to_users(
+        self, selection: users_schemas.UsersSelection, permission_ids: list[UUID]
+    ) -> users_schemas.BulkAssignmentResult:
+        result = await self.repository.assign_permissions_to_users(selection, permission_ids)
+        if result.affected:
+            await self.users_cache.invalidate_all()
+        return result
+
+    async def revoke_permissions_from_users(
+        self, selection: users_schemas.UsersSelection, permission_ids: list[UUID]
+    ) -> users_schemas.BulkAssignmentResult:
+        result = await self.repository.revoke_permissions_from_users(selection, permission_ids)
+        if result.affected:
+            await self.users_cache.invalidate_all()
+        return result
+
+    async def delete_user(self, user_id: UUID) -> None:
+        await self.repository.delete_user(user_id)
+        await self.users_cache.invalidate(user_id)
 
 
-async def get_user_repository(db_session: Annotated[AsyncSession, Depends(get_db)]) -> UserRepository:
-    return PostgresUserRepository(db_session)
+async def get_user_repository(
+    db_session: Annotated[AsyncSession, Depends(get_db)],
+    users_cache: Annotated[UsersCache, Depends(get_users_cache)],
+) -> UserRepository:
+    return CachedUserRepository(PostgresUserRepository(db_session), users_cache)
 
 
 async def get_user_sign_in_history_repository(
     db_session: Annotated[AsyncSession, Depends(get_db)]
 ) -> UserSignInHistoryRepository:
-    return PostgresUserSigninHistoryRepository(db_session)
+    return BufferedUserSigninHistoryRepository(
+        PostgresUserSigninHistoryRepository(db_session), signin_history_writer
+    )
@@ -1,9 +1,14 @@
+import base64
+from datetime import datetime
 from ipaddress import IPv4Address
 from uuid import UUID
 
-from pydantic import EmailStr
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 from src.common import schemas as common_schemas
+from src.users.settings import get_users_settings
+
+users_settings = get_users_settings()
 
 
 class User(common_schemas.UUIDSchemaMixin):
@@ -22,3 +27,58 @@ class UserLoginRecord(common_schemas.UUIDSchemaMixin, common_schemas.TimestampSc
 
     class Config:
         from_attributes = True
+
+
+class SigninHistoryCursor(BaseModel):
+    """Position of the last record of a signin history page, records are ordered from the newest."""
+
+    created_at: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> "SigninHistoryCursor":
+        """Decode the cursor, raises ValueError if it is malformed."""
+        return cls.model_validate_json(base64.urlsafe_b64decode(cursor.encode()))
+
+
+class UserLoginRecordsPage(BaseModel):
+    items: list[UserLoginRecord]
+    # cursor of the next page, None for the last one
+    next_cursor: str | None = None
+
+
+class UsersFilter(BaseModel):
+    role_id: UUID | None = None
+    membership: bool | None = None
+    # a filter without criteria selects all the users only when asked explicitly
+    all: bool = False
+
+    @model_validator(mode="after")
+    def check_criteria(self) -> "UsersFilter":
+        if not self.all and self.role_id is None and self.membership is None:
+            raise ValueError("filter has no criteria, set all to select all the users")
+        return self
+
+
+class UsersSelection(BaseModel):
+    """Users selected either by their ids or by the filter."""
+
+    user_ids: list[UUID] | None = Field(
+        default=None, min_length=1, max_length=users_settings.bulk_selection_max_user_ids
+    )
+    filter: UsersFilter | None = None
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "UsersSelection":
+        if (self.user_ids is None) == (self.filter is None):
+            raise ValueError("either user_ids or filter has to be set")
+        return self
+
+
+class BulkAssignmentResult(BaseModel):
+    matched_users: int
+    # assignments created or removed, already existing or missing ones are not counted
+    affected: int
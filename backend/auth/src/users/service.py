@@ -4,7 +4,6 @@ from abc import ABC, abstractmethod
 from uuid import UUID
 
 import sqlalchemy
-from fastapi_pagination import Page
 
 from src.auth import dependencies as auth_depends
 from src.auth.exceptions import UserInvalidCredentialsError, UserUsernameExistsError
@@ -14,7 +13,12 @@ from src.auth.jwt import (
 from src.auth.jwt.backend import JWTAuthorizationBackend
 from src.role.models import RolePermissions  # noqa401, noqa403
 from src.users import schemas as users_schemas
-from src.users.exceptions import UserDoesNotExistError, UserPermissionError, UserUpdateError
+from src.users.exceptions import (
+    SigninHistoryCursorError,
+    UserDoesNotExistError,
+    UserPermissionError,
+    UserUpdateError,
+)
 from src.users.repositories import UserRepository, UserSignInHistoryRepository
 
 logger = logging.getLogger(__name__)
@@ -35,6 +39,14 @@ class IUserService(ABC):
     async def signout(self, decoded_jwt: jwt_schemas.JWTDecoded) -> None:
         ...
 
+    @abstractmethod
+    async def signout_everywhere(self, decoded_jwt: jwt_schemas.JWTDecoded) -> None:
+        ...
+
+    @abstractmethod
+    async def revoke_user_tokens(self, user_id: UUID) -> None:
+        ...
+
     @abstractmethod
     async def get_user_by_id(self, user_id: UUID) -> users_schemas.User:
         ...
@@ -44,7 +56,9 @@ class IUserService(ABC):
         ...
 
     @abstractmethod
-    async def get_user_history(self, user_id: UUID) -> Page[users_schemas.UserLoginRecord]:
+    async def get_user_history(
+        self, user_id: UUID, size: int, cursor: str | None = None
+    ) -> users_schemas.UserLoginRecordsPage:
         ...
 
     @abstractmethod
@@ -71,6 +85,18 @@ class IUserService(ABC):
     async def revoke_user_permission(self, user_id: UUID, permission_id: UUID) -> users_schemas.User:
         ...
 
+    @abstractmethod
+    async def assign_users_permissions(
+        self, selection: users_schemas.UsersSelection, permission_ids: list[UUID]
+    ) -> users_schemas.BulkAssignmentResult:
+        ...
+
+    @abstractmethod
+    async def revoke_users_permissions(
+        self, selection: users_schemas.UsersSelection, permission_ids: list[UUID]
+    ) -> users_schemas.BulkAssignmentResult:
+        ...
+
     @abstractmethod
     async def assign_user_role(self, user_id: UUID, role_id: UUID) -> users_schemas.User:
         ...
@@ -130,32 +156,42 @@ class UserService(IUserService):
         verify_password: bool = True,
     ) -> jwt_schemas.JWTCredentials:
         """Authenticate user and save user's signin record."""
-        if user_db := await self.get_by_username(user.username):
-            is_password_ok = True
-            if verify_password:
-                is_password_ok = await self.user_repository.check_password(
-                    user_id=user_db.id, password=user.password
-                )
-            if is_password_ok:
-                jwt_credentials = await self.jwt_auth_backend.generate_jwt_credentials(
-                    jwt_schemas.JWTUserIdentity.from_user(user_db)
-                )
-                logger.debug("User '%s' has signed in", user_db.username)
-
-                sign_in_record = await self.log_repository.create_record(
-                    user_id=user_db.id,
-                    user_agent=fingerprint.user_agent,
-                    ip_address=str(fingerprint.ip_address),
-                )
-                logger.debug("User signin has been saved: %s", str(sign_in_record.model_dump()))
-
-                return jwt_credentials
-        raise UserInvalidCredentialsError
+        if verify_password:
+            user_db = await self.user_repository.authenticate(user.username, user.password)
+        else:
+            user_db = await self.get_by_username(user.username)
+        if user_db is None:
+            raise UserInvalidCredentialsError
+
+        jwt_credentials = await self.jwt_auth_backend.generate_jwt_credentials(
+            jwt_schemas.JWTUserIdentity.from_user(user_db)
+        )
+        logger.debug("User '%s' has signed in", user_db.username)
+
+        sign_in_record = await self.log_repository.create_record(
+            user_id=user_db.id,
+            user_agent=fingerprint.user_agent,
+            ip_address=str(fingerprint.ip_address),
+        )
+        logger.debug("User signin has been saved: %s", str(sign_in_record.model_dump()))
+
+        return jwt_credentials
 
     async def signout(self, decoded_jwt: jwt_schemas.JWTDecoded) -> None:
         """Sign out user by revoking user's jwt credentials."""
         await self.jwt_auth_backend.revoke_jwt_credentials(decoded_token=decoded_jwt)
 
+    async def signout_everywhere(self, decoded_jwt: jwt_schemas.JWTDecoded) -> None:
+        """Sign out user from all the sessions by revoking all user's jwt credentials."""
+        await self.jwt_auth_backend.revoke_user_jwt_credentials(user_id=decoded_jwt.user.id)
+
+    async def revoke_user_tokens(self, user_id: UUID) -> None:
+        """Revoke all user's jwt credentials, e.g. to block the user."""
+        if not await self.user_repository.get(user_id):
+            raise UserDoesNotExistError(resource_id=user_id)
+
+        await self.jwt_auth_backend.revoke_user_jwt_credentials(user_id=str(user_id))
+
     async def get_user_by_id(self, user_id: UUID) -> users_schemas.User:
         if user := await self.user_repository.get(user_id):
             return user
@@ -164,10 +200,17 @@ class UserService(IUserService):
     async def get_users_by_ids(self, users_ids: list[UUID]) -> list[users_schemas.User]:
         return await self.user_repository.get_by_ids(ids=users_ids)
 
-    async def get_user_history(self, user_id: UUID) -> Page[users_schemas.UserLoginRecord]:
+    async def get_user_history(
+        self, user_id: UUID, size: int, cursor: str | None = None
+    ) -> users_schemas.UserLoginRecordsPage:
+        try:
+            decoded_cursor = users_schemas.SigninHistoryCursor.decode(cursor) if cursor else None
+        except ValueError:
+            raise SigninHistoryCursorError
+
         if not await self.user_repository.get(user_id):
             raise UserDoesNotExistError(resource_id=user_id)
-        return await self.log_repository.get_user_signin_history(user_id)
+        return await self.log_repository.get_user_signin_history(user_id, size, decoded_cursor)
 
     async def create_user(
         self, username: str, first_name: str, last_name: str, password: str, email: str | None = None
@@ -225,6 +268,21 @@ class UserService(IUserService):
         except sqlalchemy.exc.IntegrityError:
             raise UserPermissionError
 
+    async def assign_users_permissions(
+        self, selection: users_schemas.UsersSelection, permission_ids: list[UUID]
+    ) -> users_schemas.BulkAssignmentResult:
+        """Assign permissions to all the selected users at once, skipping the ones they already have."""
+        try:
+            return await self.user_repository.assign_permissions_to_users(selection, permission_ids)
+        except sqlalchemy.exc.IntegrityError:
+            raise UserPermissionError
+
+    async def revoke_users_permissions(
+        self, selection: users_schemas.UsersSelection, permission_ids: list[UUID]
+    ) -> users_schemas.BulkAssignmentResult:
+        """Revoke permissions from all the selected users at once."""
+        return await self.user_repository.revoke_permissions_from_users(selection, permission_ids)
+
     async def assign_user_role(self, user_id: UUID, role_id: UUID) -> users_schemas.User:
         if not await self.user_repository.get(user_id):
             raise UserDoesNotExistError(resource_id=user_id)
@@ -265,3 +323,4 @@ class UserService(IUserService):
 
     async def delete_user(self, user_id: UUID) -> None:
         await self.user_repository.delete_user(user_id)
+        await self.jwt_auth_backend.revoke_user_jwt_credentials(user_id=str(user_id))
@@ -22,6 +22,9 @@ class UserSettings(BaseSettings):
     password_min_length: int = Field(env="USER_PASSWORD_MIN_LENGTH", default=8)
     password_max_length: int = Field(env="USER_PASSWORD_MAX_LENGTH", default=64)
 
+    # users selected by their ids for a bulk assignment at once
+    bulk_selection_max_user_ids: int = Field(env="USER_BULK_SELECTION_MAX_USER_IDS", default=1000)
+
 
 @lru_cache(maxsize=1)
 def get_users_settings() -> UserSettings:
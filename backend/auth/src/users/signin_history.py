@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, Callable
+
+from opentelemetry import metrics
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.settings.app import get_app_settings
+from src.users import models as users_models
+
+logger = logging.getLogger(__name__)
+
+settings = get_app_settings()
+
+
+class SigninHistoryWriter:
+    """Background writer of signin records.
+
+    Records are queued in memory and inserted by a single multi-row INSERT once `batch_size`
+    of them are collected or `flush_interval_sec` has passed since the first one,
+    so signin requests do not wait for the history to be committed.
+    """
+
+    def __init__(self, batch_size: int, flush_interval_sec: float, max_queue_size: int) -> None:
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self.max_queue_size = max_queue_size
+
+        self.overflowed = 0
+        self._batch: list[dict[str, Any]] = []
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._task: asyncio.Task | None = None
+        self._session_factory: Callable[[], AsyncSession] | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def queue_depth(self) -> int:
+        return (self._queue.qsize() if self._queue is not None else 0) + len(self._batch)
+
+    def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        self._session_factory = session_factory
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and flush the queued records."""
+        if self._task is None or self._queue is None:
+            return
+
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+        while self._batch or not self._queue.empty():
+            while len(self._batch) < self.batch_size and not self._queue.empty():
+                self._batch.append(self._queue.get_nowait())
+            await self._flush()
+
+    def put(self, record: dict[str, Any]) -> bool:
+        """Queue the record (values of `UserSigninHistory` columns).
+
+        Returns False if the writer is not running or its queue is full,
+        the record should be written right away then.
+        """
+        if not self.is_running or self._queue is None:
+            return False
+
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.overflowed += 1
+            return False
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch.append(await self._queue.get())  # type: ignore[union-attr]
+            flush_at = loop.time() + self.flush_interval_sec
+            while len(self._batch) < self.batch_size and (timeout := flush_at - loop.time()) > 0:
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))  # type: ignore
+                except TimeoutError:
+                    break
+            await self._flush()
+
+    async def _flush(self) -> None:
+        try:
+            async with self._session_factory() as session:  # type: ignore[misc]
+                await session.execute(insert(users_models.UserSigninHistory), self._batch)
+                await session.commit()
+        except asyncio.CancelledError:
+            # the batch is kept to be flushed on stop
+            raise
+        except Exception:
+            logger.exception("Error when writing %s signin records, they are lost", len(self._batch))
+        else:
+            logger.debug("%s signin records have been written", len(self._batch))
+        self._batch = []
+
+
+signin_history_writer = SigninHistoryWriter(
+    batch_size=settings.auth.signin_history_batch_size,
+    flush_interval_sec=settings.auth.signin_history_flush_interval_sec,
+    max_queue_size=settings.auth.signin_history_queue_size,
+)
+
+meter = metrics.get_meter(__name__)
+meter.create_observable_gauge(
+    "auth.signin_history.queue_depth",
+    callbacks=[lambda _: [metrics.Observation(signin_history_writer.queue_depth)]],
+    description="Number of signin records waiting to be written",
+)
+meter.create_observable_counter(
+    "auth.signin_history.overflowed",
+    callbacks=[lambda _: [metrics.Observation(signin_history_writer.overflowed)]],
+    description="Number of signin records written synchronously because the queue is full",
+)
@@ -1,9 +1,46 @@
+import statistics
+import time
+
 from passlib.hash import pbkdf2_sha256
 
 
-def hash_password(password: str) -> str:
-    return pbkdf2_sha256.hash(secret=password)
+def hash_password(password: str, rounds: int | None = None) -> str:
+    hasher = pbkdf2_sha256.using(rounds=rounds) if rounds else pbkdf2_sha256
+    return hasher.hash(secret=password)
+
+
+def hash_passwords(passwords: list[str], rounds: int | None = None) -> list[str]:
+    """Hash a chunk of passwords, so a worker process is called once per chunk."""
+    return [hash_password(password, rounds) for password in passwords]
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
     return pbkdf2_sha256.verify(secret=password, hash=hashed_password)
+
+
+def needs_rehash(hashed_password: str, rounds: int | None = None) -> bool:
+    """Check the password is hashed with other parameters than the current ones."""
+    if not pbkdf2_sha256.identify(hashed_password):
+        return True
+    return pbkdf2_sha256.from_string(hashed_password).rounds != (rounds or pbkdf2_sha256.default_rounds)
+
+
+def measure_hashing_duration(rounds: int, samples: int = 5) -> float:
+    """Get median time in seconds to hash a password with the given number of rounds."""
+    durations = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        hash_password("calibration-password", rounds=rounds)
+        durations.append(time.perf_counter() - started_at)
+    return statistics.median(durations)
+
+
+def calibrate_rounds(target_duration_sec: float, samples: int = 5, base_rounds: int = 10_000) -> int:
+    """Get number of pbkdf2 rounds to hash a password in about `target_duration_sec` on this machine.
+
+    The hashing time is linear in the number of rounds, so it is extrapolated from the base
+    measurement and rounded to thousands.
+    """
+    base_duration_sec = measure_hashing_duration(base_rounds, samples)
+    rounds = base_rounds * target_duration_sec / base_duration_sec
+    return max(int(round(rounds, -3)), 1_000)
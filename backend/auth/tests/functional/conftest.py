@@ -1,4 +1,8 @@
 import asyncio
+import importlib.util
+from pathlib import (
+    Path,
+)
 from typing import (
     Any,
     AsyncGenerator,
@@ -22,6 +26,7 @@ from redis.asyncio import (
 )
 from sqlalchemy import (
     Engine,
+    text,
 )
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
@@ -31,6 +36,12 @@ from sqlalchemy.orm import (
     sessionmaker,
 )
 
+from src.auth.jwt.storage import (
+    not_revoked_tokens,
+)
+from src.common.cache import (
+    RedisCache,
+)
 from src.common.database import (
     Base,
     get_db,
@@ -42,9 +53,17 @@ from src.main import (
 from src.settings.app import (
     get_app_settings,
 )
+from src.users.cache import (
+    UsersCache,
+)
 
 settings = get_app_settings()
 
+# triggers maintaining the effective permissions are only created by the migration
+EFFECTIVE_PERMISSIONS_MIGRATION = (
+    Path(__file__).parents[2] / "migrations" / "versions" / "5c20e2ed047c_user_effective_permissions.py"
+)
+
 GetRequestType = Callable[
     [
         str,
@@ -70,6 +89,13 @@ def event_loop():
     loop.close()
 
 
+def load_effective_permissions_ddl() -> tuple[str, ...]:
+    spec = importlib.util.spec_from_file_location("effective_permissions", EFFECTIVE_PERMISSIONS_MIGRATION)
+    migration = importlib.util.module_from_spec(spec)  # type: ignore
+    spec.loader.exec_module(migration)  # type: ignore
+    return migration.EFFECTIVE_PERMISSIONS_DDL
+
+
 @pytest_asyncio.fixture(scope="function")
 async def postgres_engine():
     engine = create_async_engine(
@@ -81,6 +107,8 @@ async def postgres_engine():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+        for ddl in load_effective_permissions_ddl():
+            await conn.execute(text(ddl))
 
     yield engine
 
@@ -137,6 +165,18 @@ async def redis_client():
     await client.close()
 
 
+@pytest_asyncio.fixture(
+    scope="function",
+    autouse=True,
+)
+async def invalidate_users_cache(
+    redis_client: Redis,
+):
+    # the database is recreated for every test, while users identities cached by the previous ones remain
+    await UsersCache(cache=RedisCache(redis_client=redis_client), ttl_sec=0).invalidate_all()
+    yield
+
+
 @pytest_asyncio.fixture(scope="function")
 async def flushable_redis_client(
     redis_client: Redis,
@@ -145,6 +185,8 @@ async def flushable_redis_client(
         is_flushed = await redis_client.flushdb(asynchronous=True)
         if not is_flushed:
             raise RuntimeError("Error during flush db command to Redis")
+        # jtis cached as not revoked might be revoked by the test right in Redis
+        not_revoked_tokens.clear()
 
     await flush()
     yield redis_client
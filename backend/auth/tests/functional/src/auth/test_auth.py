@@ -988,3 +988,67 @@ async def test_refresh_token_invalid_from_another_user(
 
     assert data is not None
     assert data == {"detail": "Invalid refresh token"}
+
+
+async def test_introspect_tokens(
+    db_session: AsyncSession,
+    flushable_redis_client: Redis,
+    client: AsyncClient,
+) -> None:
+    user = users_models.User(
+        id=UUID("5b90edb4-ac98-4053-ac8b-93203aa8a039"),
+        username="superuser",
+        password=pbkdf2_sha256.hash("Ab1234567!"),
+        first_name="adam",
+        last_name="smith",
+    )
+    db_session.add(user)
+    await db_session.commit()
+
+    response_signin = await client.post(
+        "/api/v1/auth/signin",
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        content="username=superuser&password=Ab1234567!",
+    )
+    access_token = response_signin.json()["access_token"]
+
+    tokens_to_verify = []
+    for access_jti, refresh_jti in (
+        ("fab03b90-2ec8-47d4-8b53-386070a09dbb", "c66cc7fb-160f-487b-9d19-090154b5a984"),
+        ("0c4a3bd4-1d6b-4bb4-a0cb-52ab1b7e2d31", "f1b4ac6e-8bc8-4a5c-a7f0-9bb0bd1d0c6a"),
+    ):
+        token_data = jwt_schemas.JWTIdentity(
+            user=jwt_schemas.JWTUserIdentity(
+                id="5b90edb4-ac98-4053-ac8b-93203aa8a039",
+                role="superadmin",
+                permissions={"users": ["READ"]},
+            ),
+            access_jti=access_jti,
+            refresh_jti=refresh_jti,
+        )
+        tokens_to_verify.append(
+            await create_token(
+                data_to_encode=token_data,
+                token_type="access",
+                secret_key=settings.auth.jwt_secret_key,
+                expires_delta=timedelta(days=1),
+                algorithm=settings.auth.jwt_encoding_algorithm,
+            )
+        )
+    tokens_to_verify.append("invalid.token.string")
+
+    # Revoke the second token only
+    await flushable_redis_client.set(name="f1b4ac6e-8bc8-4a5c-a7f0-9bb0bd1d0c6a", value="")
+
+    response = await client.post(
+        "/api/v1/auth/token-introspect",
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        },
+        content=orjson.dumps({"token_strings": tokens_to_verify}),
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    assert [token_info["status"] for token_info in response.json()] == ["valid", "invalid", "invalid"]
+    assert [token_info["provided_access_token"] for token_info in response.json()] == tokens_to_verify
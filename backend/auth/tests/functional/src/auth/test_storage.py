@@ -0,0 +1,143 @@
+import time
+import uuid
+
+import pytest
+from redis.asyncio import (
+    Redis,
+)
+
+from src.auth.jwt.backend import (
+    JWTAuthorizationBackend,
+    get_tokens_expiration,
+)
+from src.auth.jwt.schemas import (
+    JWTUserIdentity,
+)
+from src.auth.jwt.service import (
+    validate_jwt,
+)
+from src.auth.jwt.storage import (
+    JWTStorage,
+    NotRevokedTokensCache,
+    RevokedJtisBuckets,
+)
+from src.common.cache import (
+    RedisCache,
+)
+from src.settings.app import (
+    get_app_settings,
+)
+
+settings = get_app_settings()
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_revoke_tokens_within_single_batch(flushable_redis_client: Redis) -> None:
+    storage = JWTStorage(cache=RedisCache(redis_client=flushable_redis_client))
+    now = int(time.time())
+
+    assert await storage.revoke_tokens({"access-jti": now + 60, "refresh-jti": now + 120}) == [True, True]
+
+    assert 0 < await flushable_redis_client.ttl("access-jti") <= 60
+    assert 60 < await flushable_redis_client.ttl("refresh-jti") <= 120
+    assert await flushable_redis_client.zscore(settings.auth.revoked_tokens_key, "access-jti") is not None
+    assert await flushable_redis_client.zscore(settings.auth.revoked_tokens_key, "refresh-jti") is not None
+    assert await storage.is_any_token_revoked("active-jti", "refresh-jti")
+    assert not await storage.is_any_token_revoked("active-jti", "another-active-jti")
+
+
+async def test_not_revoked_tokens_are_cached_locally(flushable_redis_client: Redis) -> None:
+    storage = JWTStorage(
+        cache=RedisCache(redis_client=flushable_redis_client),
+        not_revoked_cache=NotRevokedTokensCache(ttl_sec=60, max_size=10),
+    )
+
+    assert not await storage.is_any_token_revoked("access-jti", "refresh-jti")
+
+    # revoked by another process: the cached result is used until it expires
+    await flushable_redis_client.set("access-jti", "")
+    assert not await storage.is_any_token_revoked("access-jti", "refresh-jti")
+
+    # revoked by this process: the cached result is dropped right away
+    await storage.revoke_tokens({"refresh-jti": int(time.time()) + 60})
+    assert await storage.is_any_token_revoked("access-jti", "refresh-jti")
+
+
+async def test_revoke_user_tokens_by_generation(flushable_redis_client: Redis) -> None:
+    storage = JWTStorage(
+        cache=RedisCache(redis_client=flushable_redis_client),
+        not_revoked_cache=NotRevokedTokensCache(ttl_sec=60, max_size=10),
+    )
+    assert await storage.get_tokens_generation("user") == 0
+    assert not await storage.is_any_token_revoked("access-jti", "refresh-jti", user_id="user", generation=0)
+
+    assert await storage.revoke_user_tokens("user") == 1
+
+    # tokens issued before are revoked despite being cached as not revoked
+    assert await storage.is_any_token_revoked("access-jti", "refresh-jti", user_id="user", generation=0)
+    assert not await storage.is_any_token_revoked("new-access-jti", user_id="user", generation=1)
+    are_revoked = await storage.are_tokens_revoked(
+        "access-jti",
+        "new-access-jti",
+        "another-access-jti",
+        generations=[("user", 0), ("user", 1), ("another-user", 0)],
+    )
+    assert are_revoked == [True, False, False]
+
+
+async def test_revoked_jtis_buckets(flushable_redis_client: Redis, monkeypatch: pytest.MonkeyPatch) -> None:
+    revoked_jtis = RevokedJtisBuckets(bucket_secs=60, max_token_expires_secs=120, key_prefix="revoked-jtis")
+    storage = JWTStorage(cache=RedisCache(redis_client=flushable_redis_client), revoked_jtis=revoked_jtis)
+    # the buckets of the jtis are computed at the same time
+    now = int(time.time())
+    monkeypatch.setattr(time, "time", lambda: now)
+
+    assert await storage.revoke_tokens({"access-jti": now + 60, "refresh-jti": now + 120}) == [True, True]
+
+    # jtis are kept in the buckets of their expiration, buckets expire at their end
+    access_bucket_key = revoked_jtis.get_bucket_key(revoked_jtis.get_bucket(now + 60))
+    refresh_bucket_key = revoked_jtis.get_bucket_key(revoked_jtis.get_bucket(now + 120))
+    assert await flushable_redis_client.sismember(access_bucket_key, "access-jti")
+    assert await flushable_redis_client.sismember(refresh_bucket_key, "refresh-jti")
+    assert 0 < await flushable_redis_client.ttl(access_bucket_key) <= 120
+    assert 60 < await flushable_redis_client.ttl(refresh_bucket_key) <= 180
+
+    # jtis without the expiration are looked up in every bucket that may hold a live token
+    assert await storage.are_tokens_revoked("access-jti", "refresh-jti", "active-jti") == [True, True, False]
+    are_revoked = await storage.are_tokens_revoked(
+        "access-jti", "refresh-jti", "active-jti", expires_at=[now + 60, now + 120, now + 60]
+    )
+    assert are_revoked == [True, True, False]
+    assert await storage.is_any_token_revoked("active-jti", "refresh-jti", expires_at=[now + 60, now + 120])
+
+
+async def test_revoke_by_access_token_revokes_refresh_token(
+    flushable_redis_client: Redis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # a bucket a second long, so that the pair is looked up exactly where it has been revoked
+    revoked_jtis = RevokedJtisBuckets(
+        bucket_secs=1,
+        max_token_expires_secs=settings.auth.refresh_token_expires_secs,
+        key_prefix="revoked-jtis",
+    )
+    storage = JWTStorage(cache=RedisCache(redis_client=flushable_redis_client), revoked_jtis=revoked_jtis)
+    backend = JWTAuthorizationBackend(jwt_storage=storage)
+    user_identity = JWTUserIdentity(id=str(uuid.uuid4()), permissions={}, role="user")
+
+    credentials = await backend.generate_jwt_credentials(user_identity)
+    access_token = await validate_jwt(credentials.access_token)
+    refresh_token = await validate_jwt(credentials.refresh_token)
+    assert get_tokens_expiration(access_token) == get_tokens_expiration(refresh_token)
+    assert await backend.verify_jwt_credentials_are_active(refresh_token)
+
+    # the tokens are revoked a second later than issued, the buckets are still the ones of the claims
+    now = int(time.time()) + 1
+    monkeypatch.setattr(time, "time", lambda: now)
+    await backend.revoke_jwt_credentials(access_token)
+
+    refresh_bucket_key = revoked_jtis.get_bucket_key(revoked_jtis.get_bucket(refresh_token.refresh_exp))
+    assert await flushable_redis_client.sismember(refresh_bucket_key, refresh_token.refresh_jti)
+    assert not await backend.verify_jwt_credentials_are_active(refresh_token)
+    are_active = await backend.verify_many_jwt_credentials_are_active([access_token, refresh_token])
+    assert are_active == [False, False]
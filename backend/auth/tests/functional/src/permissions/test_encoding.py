@@ -0,0 +1,55 @@
+import pytest
+
+from src.permissions.encoding import (
+    EncodedPermissions,
+    PermissionChecker,
+)
+from src.permissions.enums import (
+    ServiceInternalActions,
+    ServiceInternalSrc,
+)
+
+
+@pytest.mark.parametrize(
+    "permissions",
+    [
+        {},
+        {"users": ["READ"]},
+        {"users": ["CREATE", "READ"], "books": ["DELETE"], "books_authors": ["UPDATE"]},
+        {"users": ["BLOCKED"], "custom_src": ["READ", "DELETE"]},
+    ],
+)
+def test_encoded_permissions_round_trip(permissions: dict[str, list[str]]) -> None:
+    encoded_permissions = EncodedPermissions.model_validate(permissions)
+    claim = encoded_permissions.model_dump()
+
+    assert set(claim) <= {"v", "m", "x"}
+    assert EncodedPermissions.model_validate(claim) == encoded_permissions
+    assert {src: sorted(perms) for src, perms in encoded_permissions.decode().items()} == {
+        src: sorted(perms) for src, perms in permissions.items()
+    }
+
+
+@pytest.mark.parametrize(
+    "permissions, src, action, is_granted, is_blocked",
+    [
+        ({"users": ["READ"]}, ServiceInternalSrc.users, ServiceInternalActions.READ, True, False),
+        ({"users": ["READ"]}, ServiceInternalSrc.users, ServiceInternalActions.DELETE, False, False),
+        ({"users": ["READ"]}, ServiceInternalSrc.roles, ServiceInternalActions.READ, False, False),
+        ({"roles": ["READ", "BLOCKED"]}, ServiceInternalSrc.roles, ServiceInternalActions.READ, True, True),
+        ({"custom_src": ["UPDATE"]}, "custom_src", ServiceInternalActions.UPDATE, True, False),
+        ({"custom_src": ["UPDATE"]}, "custom_src", ServiceInternalActions.READ, False, False),
+    ],
+)
+def test_permission_checker(
+    permissions: dict[str, list[str]],
+    src: str,
+    action: str,
+    is_granted: bool,
+    is_blocked: bool,
+) -> None:
+    permission_checker = PermissionChecker(src, action)
+    encoded_permissions = EncodedPermissions.model_validate(permissions)
+
+    assert permission_checker.is_granted(encoded_permissions) is is_granted
+    assert permission_checker.is_blocked(encoded_permissions) is is_blocked
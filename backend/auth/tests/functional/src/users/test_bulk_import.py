@@ -0,0 +1,152 @@
+import io
+from pathlib import (
+    Path,
+)
+
+import orjson
+import pytest
+import pytest_asyncio
+from passlib.hash import (
+    pbkdf2_sha256,
+)
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+)
+
+from src.cli.import_users import (
+    ImportCheckpoint,
+    ImportFormat,
+    read_rows,
+    validate_rows,
+)
+from src.permissions import (
+    models as permissions_models,
+)
+from src.role import (
+    models as role_models,
+)
+from src.users import (
+    models as users_models,
+)
+from src.users.bulk_import import (
+    ImportedBatch,
+    ImportedUser,
+    UsersImporter,
+)
+from src.users.repositories import (
+    PostgresUserRepository,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture(scope="function")
+async def existing_user(db_session: AsyncSession) -> users_models.User:
+    user = users_models.User(
+        username="user0",
+        password=pbkdf2_sha256.hash("Ab1234567!"),
+        first_name="adam",
+        last_name="smith",
+    )
+    db_session.add_all(
+        [
+            user,
+            role_models.Role(name="reader"),
+            permissions_models.Permission(src="books", type=permissions_models.PermissionType.READ),
+        ]
+    )
+    await db_session.commit()
+    return user
+
+
+async def test_import_batch(db_session: AsyncSession, existing_user: users_models.User) -> None:
+    users = [
+        ImportedUser.model_validate(row)
+        for row in (
+            # skipped, so its unknown role and permission are not counted
+            {
+                "username": "user0",
+                "password": "Ab1234567!",
+                "first_name": "adam",
+                "last_name": "smith",
+                "role": "writer",
+                "permissions": "users:read",
+            },
+            {
+                "username": "user1",
+                "password": "Ab1234567!",
+                "first_name": "john",
+                "last_name": "doe",
+                "email": "",
+                "role": "reader",
+                "permissions": "books:read users:read",
+            },
+            {
+                "username": "user2",
+                "password": "Ab1234567!",
+                "first_name": "jane",
+                "last_name": "doe",
+                "role": "writer",
+            },
+        )
+    ]
+    hashed_passwords = [pbkdf2_sha256.hash(user.password) for user in users]
+
+    result = await UsersImporter(db_session).import_batch(users, hashed_passwords)
+
+    assert result == ImportedBatch(imported=2, skipped=1, unknown_roles=1, unknown_permissions=1)
+
+    repository = PostgresUserRepository(db_session)
+    imported_users = {user.username: user for user in await repository.filter_by(last_name="doe")}
+    assert imported_users["user1"].role == "reader"
+    assert imported_users["user1"].permissions == {"books": ["READ"]}
+    assert imported_users["user2"].role == "guest"
+    assert await repository.authenticate("user1", "Ab1234567!") is not None
+
+
+@pytest.mark.parametrize(
+    ("import_format", "content", "rejected_lines"),
+    (
+        (
+            ImportFormat.csv,
+            "username,password,first_name,last_name\n"
+            "user1,Ab1234567!,john,doe\n"
+            "user2,short,jane,doe,extra cell\n",
+            [3],
+        ),
+        (
+            ImportFormat.ndjson,
+            '{"username": "user1", "password": "Ab1234567!", "first_name": "john", "last_name": "doe"}\n'
+            "\n"
+            '{"username": "user2", "password": "Ab1234567!"\n'
+            '["user3", "Ab1234567!"]\n',
+            [3, 4],
+        ),
+    ),
+)
+async def test_validate_rows_rejects_malformed_rows(
+    tmp_path: Path, import_format: ImportFormat, content: str, rejected_lines: list[int]
+) -> None:
+    path = tmp_path / f"users.{import_format}"
+    path.write_text(content)
+    rejects_file = io.BytesIO()
+
+    users, rejected = validate_rows(list(read_rows(path, import_format)), rejects_file)
+
+    assert [user.username for user in users] == ["user1"]
+    rejects = [orjson.loads(line) for line in rejects_file.getvalue().splitlines()]
+    assert rejected == len(rejects)
+    assert [reject["line"] for reject in rejects] == rejected_lines
+    assert all(reject["errors"] for reject in rejects)
+    assert b"Ab1234567!" not in rejects_file.getvalue()
+
+
+async def test_checkpoint_keeps_size_of_rejects_file(tmp_path: Path) -> None:
+    checkpoint = ImportCheckpoint(tmp_path / "users.csv.checkpoint", batch_size=100)
+    assert checkpoint.load() == (0, 0)
+
+    checkpoint.save(3, rejects_size=512)
+    assert checkpoint.load() == (3, 512)
+
+    with pytest.raises(ValueError):
+        ImportCheckpoint(checkpoint.path, batch_size=10).load()
@@ -0,0 +1,166 @@
+from contextlib import (
+    contextmanager,
+)
+from typing import (
+    Iterator,
+)
+
+import pytest
+import pytest_asyncio
+from passlib.hash import (
+    pbkdf2_sha256,
+)
+from redis.asyncio import (
+    Redis,
+)
+from sqlalchemy import (
+    event,
+    select,
+)
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+)
+
+from src.common.cache import (
+    RedisCache,
+)
+from src.permissions import (
+    models as permissions_models,
+)
+from src.role import (
+    models as role_models,
+)
+from src.role.repository import (
+    PostgresRoleRepository,
+)
+from src.users import (
+    models as users_models,
+)
+from src.users import (
+    schemas as users_schemas,
+)
+from src.users.cache import (
+    UsersCache,
+    users_cache_stats,
+)
+from src.users.repositories import (
+    CachedUserRepository,
+    PostgresUserRepository,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+@contextmanager
+def count_queries(db_session: AsyncSession) -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def users_cache(flushable_redis_client: Redis) -> UsersCache:
+    return UsersCache(cache=RedisCache(redis_client=flushable_redis_client), ttl_sec=60)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def user(db_session: AsyncSession) -> users_models.User:
+    permission = permissions_models.Permission(src="users", type=permissions_models.PermissionType.READ)
+    role = role_models.Role(name="librarian")
+    user = users_models.User(
+        username="user0",
+        password=pbkdf2_sha256.hash("Ab1234567!"),
+        first_name="adam",
+        last_name="smith",
+    )
+    db_session.add_all([permission, role, user])
+    await db_session.commit()
+
+    db_session.add_all(
+        [
+            users_models.UserRole(user_id=user.id, role_id=role.id),
+            role_models.RolePermissions(role_id=role.id, permission_id=permission.id),
+        ]
+    )
+    await db_session.commit()
+    return user
+
+
+async def test_get_user_from_cache(
+    db_session: AsyncSession, users_cache: UsersCache, user: users_models.User
+) -> None:
+    repository = CachedUserRepository(PostgresUserRepository(db_session), users_cache)
+    cached_user = await repository.get(user.id)
+    hits = users_cache_stats.hits
+
+    with count_queries(db_session) as statements:
+        assert await repository.get(user.id) == cached_user
+        assert await repository.filter_by(username="user0") == [cached_user]
+
+    assert statements == []
+    assert users_cache_stats.hits == hits + 2
+    assert cached_user.role == "librarian"
+    assert cached_user.permissions == {"users": ["READ"]}
+
+
+async def test_user_change_invalidates_user(
+    db_session: AsyncSession, users_cache: UsersCache, user: users_models.User
+) -> None:
+    repository = CachedUserRepository(PostgresUserRepository(db_session), users_cache)
+    await repository.get(user.id)
+
+    await repository.update(user.id, username="user1")
+
+    assert (await repository.get(user.id)).username == "user1"
+    assert await repository.filter_by(username="user0") == []
+
+
+async def test_role_change_invalidates_all_users(
+    db_session: AsyncSession, users_cache: UsersCache, user: users_models.User
+) -> None:
+    repository = CachedUserRepository(PostgresUserRepository(db_session), users_cache)
+    role_repository = PostgresRoleRepository(db_session, users_cache=users_cache)
+    cached_user = await repository.get(user.id)
+    role = (await role_repository.all())[0]
+
+    await role_repository.update(role.id, name="reader")
+
+    assert cached_user.role == "librarian"
+    assert (await repository.get(user.id)).role == "reader"
+
+
+async def test_user_changes_are_committed_before_invalidation(
+    postgres_engine: AsyncEngine, db_session: AsyncSession, users_cache: UsersCache, user: users_models.User
+) -> None:
+    repository = CachedUserRepository(PostgresUserRepository(db_session), users_cache)
+    role_id = await db_session.scalar(select(role_models.Role.id))
+    permission = permissions_models.Permission(src="books", type=permissions_models.PermissionType.READ)
+    db_session.add(permission)
+    await db_session.commit()
+    await repository.assign_permission(user.id, permission.id)
+
+    async def reread() -> users_schemas.User:
+        # a session of its own sees the committed changes only
+        async with AsyncSession(postgres_engine) as session:
+            return await PostgresUserRepository(session).get(user.id)
+
+    await repository.update(user.id, username="user1")
+    assert (await reread()).username == "user1"
+    assert (await repository.get(user.id)).username == "user1"
+
+    await repository.revoke_permission(user.id, permission.id)
+    assert (await reread()).permissions == {"users": ["READ"]}
+    assert (await repository.get(user.id)).permissions == {"users": ["READ"]}
+
+    await repository.revoke_role(user.id, role_id)
+    assert (await reread()).permissions == {}
+    assert (await repository.get(user.id)).role != "librarian"
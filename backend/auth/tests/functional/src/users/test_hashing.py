@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from passlib.hash import (
+    pbkdf2_sha256,
+)
+
+from src.users import (
+    utils,
+)
+from src.users.exceptions import (
+    PasswordHashingOverloadedError,
+)
+from src.users.hashing import (
+    PasswordHashingPool,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_password_hashing_pool_hashes_and_verifies():
+    pool = PasswordHashingPool(max_workers=2, max_queue_size=2)
+    try:
+        hashed_password = await pool.run(utils.hash_password, "Ab1234567!")
+
+        assert pbkdf2_sha256.verify("Ab1234567!", hashed_password)
+        assert await pool.run(utils.verify_password, "Ab1234567!", hashed_password)
+        assert not await pool.run(utils.verify_password, "wrong password", hashed_password)
+    finally:
+        pool.shutdown()
+
+
+async def test_password_hashing_pool_rejects_requests_over_queue_size():
+    pool = PasswordHashingPool(max_workers=1, max_queue_size=1)
+    hashed_password = pbkdf2_sha256.hash("Ab1234567!")
+    try:
+        results = await asyncio.gather(
+            *(pool.run(utils.verify_password, "Ab1234567!", hashed_password) for _ in range(4)),
+            return_exceptions=True,
+        )
+
+        assert results.count(True) == 2
+        assert sum(isinstance(result, PasswordHashingOverloadedError) for result in results) == 2
+        assert pool.rejected == 2
+        assert pool.queue_depth == 0
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.parametrize(
+    "hashed_password, rounds, expected_needs_rehash",
+    [
+        (pbkdf2_sha256.using(rounds=1000).hash("Ab1234567!"), 1000, False),
+        (pbkdf2_sha256.using(rounds=1000).hash("Ab1234567!"), 2000, True),
+        (pbkdf2_sha256.using(rounds=1000).hash("Ab1234567!"), None, True),
+        (pbkdf2_sha256.hash("Ab1234567!"), None, False),
+        ("not a pbkdf2 hash", None, True),
+    ],
+)
+async def test_needs_rehash(hashed_password: str, rounds: int | None, expected_needs_rehash: bool):
+    assert utils.needs_rehash(hashed_password, rounds) is expected_needs_rehash
+
+
+async def test_calibrate_rounds():
+    rounds = utils.calibrate_rounds(target_duration_sec=0.01, samples=1, base_rounds=1000)
+
+    assert rounds >= 1000
+    assert rounds % 1000 == 0
+    assert not utils.needs_rehash(utils.hash_password("Ab1234567!", rounds=rounds), rounds)
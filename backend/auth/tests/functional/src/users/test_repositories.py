@@ -0,0 +1,289 @@
+from contextlib import (
+    contextmanager,
+)
+from typing import (
+    Iterator,
+)
+from uuid import (
+    UUID,
+    uuid4,
+)
+
+import pydantic
+import pytest
+import pytest_asyncio
+from passlib.hash import (
+    pbkdf2_sha256,
+)
+from sqlalchemy import (
+    delete,
+    event,
+    select,
+)
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+)
+
+from src.permissions import (
+    models as permissions_models,
+)
+from src.role import (
+    models as role_models,
+)
+from src.role.repository import (
+    PostgresRoleRepository,
+)
+from src.users import (
+    models as users_models,
+)
+from src.users import (
+    schemas as users_schemas,
+)
+from src.users.repositories import (
+    PostgresUserRepository,
+)
+from src.users.settings import (
+    get_users_settings,
+)
+
+users_settings = get_users_settings()
+
+pytestmark = pytest.mark.asyncio
+
+
+@contextmanager
+def count_queries(db_session: AsyncSession) -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def users(db_session: AsyncSession) -> list[users_models.User]:
+    permissions = [
+        permissions_models.Permission(src="users", type=permissions_models.PermissionType.READ),
+        permissions_models.Permission(src="users", type=permissions_models.PermissionType.UPDATE),
+        permissions_models.Permission(src="books", type=permissions_models.PermissionType.READ),
+    ]
+    role = role_models.Role(name="librarian")
+    users = [
+        users_models.User(
+            username=f"user{i}",
+            password=pbkdf2_sha256.hash(f"Ab1234567!{i}"),
+            first_name="adam",
+            last_name="smith",
+        )
+        for i in range(3)
+    ]
+    db_session.add_all([*permissions, role, *users])
+    await db_session.commit()
+
+    db_session.add_all(
+        [
+            # users READ directly and through the role, UPDATE through the role only
+            users_models.UserPermissions(user_id=users[0].id, permission_id=permissions[0].id),
+            users_models.UserPermissions(user_id=users[0].id, permission_id=permissions[2].id),
+            users_models.UserRole(user_id=users[0].id, role_id=role.id),
+            role_models.RolePermissions(role_id=role.id, permission_id=permissions[0].id),
+            role_models.RolePermissions(role_id=role.id, permission_id=permissions[1].id),
+            users_models.UserPermissions(user_id=users[1].id, permission_id=permissions[2].id),
+        ]
+    )
+    await db_session.commit()
+    return users
+
+
+async def test_get_user_within_single_query(db_session: AsyncSession, users: list[users_models.User]) -> None:
+    repository = PostgresUserRepository(db_session)
+
+    with count_queries(db_session) as statements:
+        user = await repository.get(users[0].id)
+
+    assert len(statements) == 1
+    assert user is not None
+    assert user.username == "user0"
+    assert user.role == "librarian"
+    assert user.permissions == {"users": ["READ", "UPDATE"], "books": ["READ"]}
+
+
+async def test_get_missing_user(db_session: AsyncSession, users: list[users_models.User]) -> None:
+    repository = PostgresUserRepository(db_session)
+
+    assert await repository.get(UUID("5b90edb4-ac98-4053-ac8b-93203aa8a039")) is None
+
+
+async def test_get_users_by_ids_within_single_query(
+    db_session: AsyncSession, users: list[users_models.User]
+) -> None:
+    repository = PostgresUserRepository(db_session)
+
+    with count_queries(db_session) as statements:
+        found_users = await repository.get_by_ids([user.id for user in users])
+
+    assert len(statements) == 1
+    assert {user.username: (user.role, user.permissions) for user in found_users} == {
+        "user0": ("librarian", {"users": ["READ", "UPDATE"], "books": ["READ"]}),
+        "user1": ("guest", {"books": ["READ"]}),
+        "user2": ("guest", {}),
+    }
+
+
+async def test_filter_users_within_single_query(
+    db_session: AsyncSession, users: list[users_models.User]
+) -> None:
+    repository = PostgresUserRepository(db_session)
+
+    with count_queries(db_session) as statements:
+        found_users = await repository.filter_by(first_name="adam", last_name="smith")
+
+    assert len(statements) == 1
+    assert len(found_users) == len(users)
+
+
+async def test_revoke_keeps_permissions_granted_otherwise(
+    db_session: AsyncSession, users: list[users_models.User]
+) -> None:
+    repository = PostgresUserRepository(db_session)
+    role = await db_session.scalar(select(role_models.Role).where(role_models.Role.name == "librarian"))
+    permission = await db_session.scalar(
+        select(permissions_models.Permission).where(permissions_models.Permission.src == "books")
+    )
+
+    user = await repository.revoke_role(users[0].id, role.id)
+    assert user.permissions == {"users": ["READ"], "books": ["READ"]}
+
+    user = await repository.revoke_permission(users[0].id, permission.id)
+    assert user.permissions == {"users": ["READ"]}
+
+    user = await repository.assign_role(users[0].id, role.id)
+    assert user.permissions == {"users": ["READ", "UPDATE"]}
+
+
+async def test_role_permissions_change_refreshes_role_members(
+    db_session: AsyncSession, users: list[users_models.User]
+) -> None:
+    repository = PostgresUserRepository(db_session)
+    role = await db_session.scalar(select(role_models.Role).where(role_models.Role.name == "librarian"))
+    await repository.assign_role(users[2].id, role.id)
+    permission = permissions_models.Permission(src="books", type=permissions_models.PermissionType.CREATE)
+    db_session.add(permission)
+    await db_session.commit()
+
+    db_session.add(role_models.RolePermissions(role_id=role.id, permission_id=permission.id))
+    await db_session.commit()
+    found_users = await repository.get_by_ids([users[0].id, users[2].id])
+
+    assert {user.username: user.permissions for user in found_users} == {
+        "user0": {"users": ["READ", "UPDATE"], "books": ["READ", "CREATE"]},
+        "user2": {"users": ["READ", "UPDATE"], "books": ["CREATE"]},
+    }
+
+    await db_session.execute(
+        delete(permissions_models.Permission).where(permissions_models.Permission.id == permission.id)
+    )
+    await db_session.commit()
+    found_users = await repository.get_by_ids([users[0].id, users[2].id])
+
+    assert {user.username: user.permissions for user in found_users} == {
+        "user0": {"users": ["READ", "UPDATE"], "books": ["READ"]},
+        "user2": {"users": ["READ", "UPDATE"]},
+    }
+
+
+async def test_authenticate_within_single_query(
+    db_session: AsyncSession, users: list[users_models.User]
+) -> None:
+    repository = PostgresUserRepository(db_session)
+
+    with count_queries(db_session) as statements:
+        user = await repository.authenticate("user0", "Ab1234567!0")
+
+    assert len(statements) == 1
+    assert user is not None
+    assert user.id == users[0].id
+    assert user.role == "librarian"
+    assert user.permissions == {"users": ["READ", "UPDATE"], "books": ["READ"]}
+
+
+async def test_authenticate_with_invalid_credentials(
+    db_session: AsyncSession, users: list[users_models.User]
+) -> None:
+    repository = PostgresUserRepository(db_session)
+
+    assert await repository.authenticate("user0", "Ab1234567!1") is None
+    assert await repository.authenticate("user3", "Ab1234567!3") is None
+
+
+async def test_assign_permissions_to_users_within_single_insert(
+    db_session: AsyncSession, users: list[users_models.User]
+) -> None:
+    repository = PostgresUserRepository(db_session)
+    permissions = list(await db_session.scalars(select(permissions_models.Permission)))
+    selection = users_schemas.UsersSelection(filter=users_schemas.UsersFilter(membership=False))
+
+    with count_queries(db_session) as statements:
+        result = await repository.assign_permissions_to_users(selection, [p.id for p in permissions])
+
+    assert len([statement for statement in statements if statement.startswith("INSERT")]) == 1
+    # user0 has 2 of the 3 permissions directly, user1 has 1
+    assert result == users_schemas.BulkAssignmentResult(matched_users=3, affected=6)
+
+    result = await repository.assign_permissions_to_users(selection, [p.id for p in permissions])
+    assert result == users_schemas.BulkAssignmentResult(matched_users=3, affected=0)
+
+    found_users = await repository.get_by_ids([user.id for user in users])
+    assert all(user.permissions == {"users": ["READ", "UPDATE"], "books": ["READ"]} for user in found_users)
+
+    result = await repository.revoke_permissions_from_users(
+        users_schemas.UsersSelection(user_ids=[users[1].id, users[2].id]), [p.id for p in permissions]
+    )
+    assert result == users_schemas.BulkAssignmentResult(matched_users=2, affected=6)
+
+    found_users = await repository.get_by_ids([users[1].id, users[2].id])
+    assert all(user.permissions == {} for user in found_users)
+
+
+async def test_assign_role_to_users(db_session: AsyncSession, users: list[users_models.User]) -> None:
+    repository = PostgresRoleRepository(db_session)
+    role = await db_session.scalar(select(role_models.Role).where(role_models.Role.name == "librarian"))
+
+    result = await repository.assign_users(
+        role.id, users_schemas.UsersSelection(user_ids=[user.id for user in users])
+    )
+    assert result == users_schemas.BulkAssignmentResult(matched_users=3, affected=2)
+
+    found_users = await PostgresUserRepository(db_session).get_by_ids([user.id for user in users])
+    assert all(user.role == "librarian" for user in found_users)
+
+    result = await repository.revoke_users(
+        role.id, users_schemas.UsersSelection(filter=users_schemas.UsersFilter(role_id=role.id))
+    )
+    assert result == users_schemas.BulkAssignmentResult(matched_users=3, affected=3)
+
+
+@pytest.mark.parametrize(
+    "selection",
+    (
+        {"filter": {}},
+        {"filter": {"all": False}},
+        {"user_ids": []},
+        {"user_ids": [str(uuid4()) for _ in range(users_settings.bulk_selection_max_user_ids + 1)]},
+    ),
+)
+async def test_users_selection_without_criteria_or_too_many_ids_is_rejected(selection: dict) -> None:
+    with pytest.raises(pydantic.ValidationError):
+        users_schemas.UsersSelection.model_validate(selection)
+
+
+async def test_users_selection_of_all_users_is_explicit() -> None:
+    selection = users_schemas.UsersSelection.model_validate({"filter": {"all": True}})
+
+    assert selection.filter == users_schemas.UsersFilter(all=True)
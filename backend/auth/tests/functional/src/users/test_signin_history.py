@@ -0,0 +1,155 @@
+import asyncio
+from datetime import (
+    date,
+    datetime,
+    timedelta,
+)
+from uuid import (
+    uuid4,
+)
+
+import pytest
+import pytest_asyncio
+from passlib.hash import (
+    pbkdf2_sha256,
+)
+from sqlalchemy import (
+    func,
+    select,
+)
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+)
+
+from src.users import (
+    models as users_models,
+)
+from src.users import (
+    schemas as users_schemas,
+)
+from src.users.partitions import (
+    create_signin_history_partitions,
+    drop_signin_history_partitions,
+    get_signin_history_partitions,
+)
+from src.users.repositories import (
+    BufferedUserSigninHistoryRepository,
+    PostgresUserSigninHistoryRepository,
+)
+from src.users.signin_history import (
+    SigninHistoryWriter,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture(scope="function")
+async def user(db_session: AsyncSession) -> users_models.User:
+    user = users_models.User(
+        username="user0",
+        password=pbkdf2_sha256.hash("Ab1234567!"),
+        first_name="adam",
+        last_name="smith",
+    )
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+async def count_records(db_session: AsyncSession) -> int:
+    return await db_session.scalar(select(func.count()).select_from(users_models.UserSigninHistory))
+
+
+async def test_records_are_written_by_batches(db_session: AsyncSession, user: users_models.User) -> None:
+    writer = SigninHistoryWriter(batch_size=2, flush_interval_sec=60, max_queue_size=10)
+    writer.start(async_sessionmaker(db_session.bind, expire_on_commit=False))
+    repository = BufferedUserSigninHistoryRepository(PostgresUserSigninHistoryRepository(db_session), writer)
+
+    for _ in range(3):
+        await repository.create_record(user_id=user.id, user_agent="pytest", ip_address="127.0.0.1")
+    await asyncio.sleep(0.5)
+    # the last record waits for the batch to be filled up or the flush interval
+    assert await count_records(db_session) == 2
+
+    await writer.stop()
+
+    assert await count_records(db_session) == 3
+    assert writer.queue_depth == 0
+
+
+async def test_record_is_written_right_away_on_overflow(
+    db_session: AsyncSession, user: users_models.User
+) -> None:
+    writer = SigninHistoryWriter(batch_size=10, flush_interval_sec=60, max_queue_size=1)
+    writer.start(async_sessionmaker(db_session.bind, expire_on_commit=False))
+    repository = BufferedUserSigninHistoryRepository(PostgresUserSigninHistoryRepository(db_session), writer)
+
+    assert writer.put({"id": uuid4(), "user_id": user.id, "user_agent": "pytest", "ip_address": "127.0.0.1"})
+    await repository.create_record(user_id=user.id, user_agent="pytest", ip_address="127.0.0.1")
+
+    assert writer.overflowed == 1
+    assert await count_records(db_session) == 1
+
+    await writer.stop()
+    assert await count_records(db_session) == 2
+
+
+async def test_record_is_written_right_away_by_stopped_writer(
+    db_session: AsyncSession, user: users_models.User
+) -> None:
+    writer = SigninHistoryWriter(batch_size=10, flush_interval_sec=60, max_queue_size=10)
+    repository = BufferedUserSigninHistoryRepository(PostgresUserSigninHistoryRepository(db_session), writer)
+
+    await repository.create_record(user_id=user.id, user_agent="pytest", ip_address="127.0.0.1")
+
+    assert await count_records(db_session) == 1
+
+
+async def test_history_is_paginated_by_cursor(db_session: AsyncSession, user: users_models.User) -> None:
+    created_at = datetime(2024, 1, 31, 23, 0)
+    db_session.add_all(
+        [
+            users_models.UserSigninHistory(
+                user_id=user.id,
+                user_agent=f"pytest{i}",
+                ip_address="127.0.0.1",
+                created_at=created_at + timedelta(hours=i),
+                modified_at=created_at,
+            )
+            for i in range(5)
+        ]
+    )
+    await db_session.commit()
+    repository = PostgresUserSigninHistoryRepository(db_session)
+
+    pages = [await repository.get_user_signin_history(user.id, size=2)]
+    while pages[-1].next_cursor is not None:
+        cursor = users_schemas.SigninHistoryCursor.decode(pages[-1].next_cursor)
+        pages.append(await repository.get_user_signin_history(user.id, size=2, cursor=cursor))
+
+    assert [[record.user_agent for record in page.items] for page in pages] == [
+        ["pytest4", "pytest3"],
+        ["pytest2", "pytest1"],
+        ["pytest0"],
+    ]
+
+
+async def test_partitions_are_created_and_dropped(db_session: AsyncSession) -> None:
+    created_partitions = await create_signin_history_partitions(
+        db_session, since=date(2000, 12, 15), months=3
+    )
+
+    assert created_partitions == [
+        "user_login_history_y2000m12",
+        "user_login_history_y2001m01",
+        "user_login_history_y2001m02",
+    ]
+    assert await create_signin_history_partitions(db_session, since=date(2000, 12, 1), months=1) == []
+
+    dropped_partitions = await drop_signin_history_partitions(db_session, before=date(2001, 2, 10))
+
+    assert dropped_partitions == ["user_login_history_y2000m12", "user_login_history_y2001m01"]
+    assert await get_signin_history_partitions(db_session) == {
+        "user_login_history_y2001m02": date(2001, 2, 1),
+    }
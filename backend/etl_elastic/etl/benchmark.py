@@ -0,0 +1,180 @@
+"""Peak memory of merging a full reindex of a synthetic catalog.
+
+The catalog is inserted within a transaction which is rolled back once merged,
+every cursor mode is measured in a separate process, since the peak RSS of a process never decreases.
+
+    python -m etl.benchmark --books 200000
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+from enum import (
+    StrEnum,
+)
+
+from etl.logic.postgresql.client import (
+    PostgresClient,
+)
+from etl.logic.postgresql.mergers import (
+    BooksMerger,
+)
+from etl.logic.storage.storage import (
+    Storage,
+)
+from etl.logic.transformer.transformers import (
+    BookTransformer,
+)
+from etl.settings.settings import (
+    get_app_settings,
+)
+from psycopg2._psycopg import (
+    connection as pg_connection,
+    cursor as pg_cursor,
+)
+from psycopg2.extras import (
+    DictCursor,
+)
+
+AUTHORS_PER_BOOK = 2
+BOOKS_PER_AUTHOR = 10
+CATEGORIES = 50
+DESCRIPTION_LENGTH = 500
+
+
+class CursorMode(StrEnum):
+    # the whole result is fetched by `execute`
+    client = "client"
+    # the result is fetched by `itersize` rows
+    server = "server"
+
+
+class ClientSideBooksMerger(BooksMerger):
+    """Books merger with the client-side cursor used before, it is not run by the ETL."""
+
+    def get_cursor(
+        self,
+        connection: pg_connection,
+    ) -> pg_cursor:
+        return connection.cursor(cursor_factory=DictCursor)
+
+
+def get_peak_rss_mb() -> float:
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def populate_catalog(
+    connection: pg_connection,
+    books: int,
+) -> list[str]:
+    authors = max(books * AUTHORS_PER_BOOK // BOOKS_PER_AUTHOR, 1)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TEMPORARY TABLE benchmark_ids ON COMMIT DROP AS
+            SELECT 'book' AS kind, n, gen_random_uuid() AS id FROM generate_series(1, %(books)s) AS n
+            UNION ALL
+            SELECT 'author', n, gen_random_uuid() FROM generate_series(1, %(authors)s) AS n
+            UNION ALL
+            SELECT 'category', n, gen_random_uuid() FROM generate_series(1, %(categories)s) AS n
+            ;
+            INSERT INTO public.authors (id, name, last_name, biography, created_at, modified_at)
+            SELECT id, 'Author', 'No. ' || n, repeat('b', %(length)s), now(), now()
+            FROM benchmark_ids WHERE kind = 'author'
+            ;
+            INSERT INTO public.categories (id, name, description, created_at, modified_at)
+            SELECT id, 'Category ' || n, repeat('c', %(length)s), now(), now()
+            FROM benchmark_ids WHERE kind = 'category'
+            ;
+            INSERT INTO public.books (id, title, description, language, isbn, created_at, modified_at)
+            SELECT id, 'Book ' || n, repeat('d', %(length)s), 'en', lpad(n::text, 13, '0'), now(), now()
+            FROM benchmark_ids WHERE kind = 'book'
+            ;
+            INSERT INTO public.books_authors (id, book_id, author_id, created_at, modified_at)
+            SELECT gen_random_uuid(), books.id, authors.id, now(), now()
+            FROM benchmark_ids AS books
+            CROSS JOIN generate_series(0, %(authors_per_book)s - 1) AS shift
+            JOIN benchmark_ids AS authors
+                ON authors.kind = 'author' AND authors.n = (books.n + shift) %% %(authors)s + 1
+            WHERE books.kind = 'book'
+            ;
+            INSERT INTO public.books_categories (id, book_id, category_id, created_at, modified_at)
+            SELECT gen_random_uuid(), books.id, categories.id, now(), now()
+            FROM benchmark_ids AS books
+            JOIN benchmark_ids AS categories
+                ON categories.kind = 'category' AND categories.n = books.n %% %(categories)s + 1
+            WHERE books.kind = 'book'
+            ;
+            SELECT id::text FROM benchmark_ids WHERE kind = 'book'
+            ;
+            """,
+            {
+                "books": books,
+                "authors": authors,
+                "categories": CATEGORIES,
+                "length": DESCRIPTION_LENGTH,
+                "authors_per_book": AUTHORS_PER_BOOK,
+            },
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def measure(
+    mode: CursorMode,
+    books: int,
+) -> None:
+    """Merge and transform every book of the catalog as a full reindex does and print the peak RSS growth."""
+    merger = ClientSideBooksMerger() if mode == CursorMode.client else BooksMerger()
+    transformer = BookTransformer()
+    storage = Storage()
+    merger.storage = storage
+    transformer.storage = storage
+
+    with PostgresClient(get_app_settings().db) as client:  # type: ignore
+        try:
+            book_ids = populate_catalog(client.connection, books)
+            storage.set_value(merger.input_topic, book_ids)
+            peak_rss_before_mb = get_peak_rss_mb()
+
+            started_at = time.perf_counter()
+            merged = 0
+            for _ in merger.merge(client.connection):
+                merged += len(storage.get(merger.output_topic)[0])
+                transformer.transform()
+                # documents are loaded by the next stage
+                storage.pop(transformer.output_topic)
+            duration_sec = time.perf_counter() - started_at
+        finally:
+            client.connection.rollback()
+
+    print(
+        f"{mode:>6}: merged {merged} books in {duration_sec:.1f}s, "
+        f"peak RSS grown by {get_peak_rss_mb() - peak_rss_before_mb:.1f} MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--mode", type=CursorMode, choices=list(CursorMode))
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        measure(args.mode, args.books)
+        return
+
+    print(f"Merging {args.books} books, itersize {BooksMerger.itersize}")
+    for mode in CursorMode:
+        subprocess.run(
+            [sys.executable, "-m", "etl.benchmark", "--books", str(args.books), "--mode", mode],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
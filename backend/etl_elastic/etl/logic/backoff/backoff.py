@@ -3,6 +3,10 @@ from functools import (
 )
 
 import backoff
+from asyncpg.exceptions import (
+    ConnectionDoesNotExistError as AsyncPostgresConnectionLostError,
+    PostgresConnectionError as AsyncPostgresConnectionError,
+)
 from elasticsearch.exceptions import (
     ConnectionError as ElasticConnectionError,
 )
@@ -33,6 +37,10 @@ etl_backoff = partial(
     (
         ElasticConnectionError,
         PostgresConnectionError,
+        AsyncPostgresConnectionError,
+        AsyncPostgresConnectionLostError,
+        # asyncpg raises OS errors of the socket when the database is unreachable
+        ConnectionRefusedError,
         RedisConnectionError,
         ValueError,
     ),
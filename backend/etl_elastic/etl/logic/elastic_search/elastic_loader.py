@@ -6,16 +6,26 @@ from abc import (
 from functools import (
     lru_cache,
 )
+from itertools import (
+    chain,
+)
 from typing import (
     Any,
+    Iterable,
+    Iterator,
     cast,
 )
 
 from elasticsearch import (
+    AsyncElasticsearch,
     Elasticsearch,
 )
 from elasticsearch.helpers import (
+    async_bulk,
+    async_streaming_bulk,
     bulk as es_bulk,
+    parallel_bulk,
+    streaming_bulk,
 )
 from etl.logic.backoff.backoff import (
     etl_backoff,
@@ -29,11 +39,15 @@ from etl.logic.transformer.dataclasses import (
 from etl.settings.settings import (
     ES_SCHEMAS_PATH,
     ESSettings,
+    LoaderMode,
+    get_app_settings,
 )
 from loguru import (
     logger,
 )
 
+system_settings = get_app_settings()
+
 
 class ElasticSearchLoaderInt(ABC):
     schema: str
@@ -42,6 +56,7 @@ class ElasticSearchLoaderInt(ABC):
     storage: Storage
 
     input_topic: str
+    deleted_input_topic: str | None
 
     @abstractmethod
     def load_schema(
@@ -54,22 +69,62 @@ class ElasticSearchLoaderInt(ABC):
     def load_bulk(
         self,
         client: Elasticsearch,
+        flush: bool = True,
     ) -> None:
         ...
 
+    @abstractmethod
+    def delete_bulk(
+        self,
+        client: Elasticsearch,
+    ) -> None:
+        ...
 
-class BasicElasticSearchLoader(ElasticSearchLoaderInt):
-    storage = Storage()
+    @abstractmethod
+    async def load_schema_async(
+        self,
+        client: AsyncElasticsearch,
+    ) -> None:
+        ...
 
-    def load_schema(
+    @abstractmethod
+    def take_ready(
         self,
-        client: Elasticsearch,
+        flush: bool = True,
+    ) -> list[ESContainer]:
+        ...
+
+    @abstractmethod
+    async def load_bulk_async(
+        self,
+        client: AsyncElasticsearch,
+        es_data: list[ESContainer],
     ) -> None:
-        index_schema: dict[
-            str,
-            Any,
-        ]
+        ...
+
+    @abstractmethod
+    async def delete_bulk_async(
+        self,
+        client: AsyncElasticsearch,
+    ) -> None:
+        ...
 
+
+class BasicElasticSearchLoader(ElasticSearchLoaderInt):
+    storage = Storage()
+    # ids of the documents to delete, only the replication producer knows about deleted rows
+    deleted_input_topic: str | None = None
+
+    mode = system_settings.loader_mode
+    chunk_size = system_settings.loader_chunk_size
+    max_chunk_bytes = system_settings.loader_max_chunk_bytes
+    thread_count = system_settings.loader_thread_count
+    # only the fields needed to report failed documents are sent back
+    filter_path = ["errors", "items.*._id", "items.*.status", "items.*.error"]
+
+    def read_schema(
+        self,
+    ) -> dict[str, Any]:
         logger.info("loading ES schema")
 
         path_to_schema = ES_SCHEMAS_PATH.joinpath(self.schema).absolute()
@@ -77,40 +132,194 @@ class BasicElasticSearchLoader(ElasticSearchLoaderInt):
             path_to_schema,
             "r",
         ) as file:
-            index_schema = json.load(file)
+            return json.load(file)
 
+    def load_schema(
+        self,
+        client: Elasticsearch,
+    ) -> None:
         client.options(ignore_status=400).indices.create(
             index=self.index,
-            **index_schema,
+            **self.read_schema(),
+        )
+
+    async def load_schema_async(
+        self,
+        client: AsyncElasticsearch,
+    ) -> None:
+        await client.options(ignore_status=400).indices.create(
+            index=self.index,
+            **self.read_schema(),
         )
 
     def load_bulk(
         self,
         client: Elasticsearch,
+        flush: bool = True,
     ) -> None:
         es_data: list[ESContainer] = self.storage.get(self.input_topic)
 
         if not es_data:
             return
 
-        data = es_data.pop()
-        es_bulk(
+        if self.mode == LoaderMode.bulk:
+            data = es_data.pop()
+            es_bulk(
+                client,
+                actions=data.to_actions(self.index),
+            )
+            logger.info("Successfully loaded bulk")
+            return
+
+        streams = self.thread_count if self.mode == LoaderMode.parallel else 1
+        if not (loaded_containers := self.count_ready(flush, streams)):
+            return
+
+        actions = chain.from_iterable(data.to_actions(self.index) for data in es_data[:loaded_containers])
+        (loaded, failed) = (0, 0)
+        for ok, item in self.stream_bulk(client, actions):
+            if ok:
+                loaded += 1
+                continue
+
+            failed += 1
+            self.log_failure(item)
+        # documents are removed once sent, a retried load sends the whole chunks again
+        del es_data[:loaded_containers]
+        logger.info(f"Successfully loaded {loaded} documents, {failed} have failed")
+
+    def count_ready(
+        self,
+        flush: bool,
+        streams: int,
+    ) -> int:
+        """Get the number of the containers to load.
+
+        Documents are collected until they fill a chunk per stream or the cycle is over.
+        """
+        es_data: list[ESContainer] = self.storage.get(self.input_topic)
+        if not flush and sum(len(data.bulk) for data in es_data) < self.chunk_size * streams:
+            return 0
+        return len(es_data)
+
+    def take_ready(
+        self,
+        flush: bool = True,
+    ) -> list[ESContainer]:
+        es_data: list[ESContainer] = self.storage.get(self.input_topic)
+        ready = es_data[: self.count_ready(flush, streams=1)]
+        del es_data[: len(ready)]
+        return ready
+
+    @staticmethod
+    def log_failure(
+        item: dict,
+    ) -> None:
+        ((op_type, result),) = item.items()
+        logger.error(f"Failed to {op_type} document `{result.get('_id')}`: {result.get('error')}")
+
+    def stream_bulk(
+        self,
+        client: Elasticsearch,
+        actions: Iterable[dict],
+    ) -> Iterator[tuple[bool, dict]]:
+        """Send the actions by chunks and get the result of every action, failed actions do not raise."""
+        options = {
+            "chunk_size": self.chunk_size,
+            "max_chunk_bytes": self.max_chunk_bytes,
+            "raise_on_error": False,
+            "filter_path": self.filter_path,
+        }
+        if self.mode == LoaderMode.parallel:
+            return parallel_bulk(client, actions, thread_count=self.thread_count, **options)
+        return streaming_bulk(client, actions, **options)
+
+    def delete_bulk(
+        self,
+        client: Elasticsearch,
+    ) -> None:
+        if self.deleted_input_topic is None:
+            return
+
+        if not (actions := self.get_delete_actions()):
+            return
+
+        # documents that have never been indexed are not found
+        (deleted, errors) = es_bulk(client, actions=actions, raise_on_error=False)
+        logger.info(f"Successfully deleted {deleted} documents, {len(errors)} have not been found")
+
+    def get_delete_actions(
+        self,
+    ) -> list[dict]:
+        if self.deleted_input_topic is None:
+            return []
+
+        deleted_ids: list[list[str]] = self.storage.get(self.deleted_input_topic)
+        return [
+            {"_op_type": "delete", "_index": self.index, "_id": doc_id} for doc_id in set(chain(*deleted_ids))
+        ]
+
+    async def load_bulk_async(
+        self,
+        client: AsyncElasticsearch,
+        es_data: list[ESContainer],
+    ) -> None:
+        actions = chain.from_iterable(data.to_actions(self.index) for data in es_data)
+        (loaded, failed) = (0, 0)
+        async for ok, item in async_streaming_bulk(
             client,
-            actions=data.to_actions(self.index),
-        )
-        logger.info("Successfully loaded bulk")
+            actions,
+            chunk_size=self.chunk_size,
+            max_chunk_bytes=self.max_chunk_bytes,
+            raise_on_error=False,
+            filter_path=self.filter_path,
+        ):
+            if ok:
+                loaded += 1
+                continue
+
+            failed += 1
+            self.log_failure(item)
+        logger.info(f"Successfully loaded {loaded} documents, {failed} have failed")
+
+    async def delete_bulk_async(
+        self,
+        client: AsyncElasticsearch,
+    ) -> None:
+        if not (actions := self.get_delete_actions()):
+            return
+
+        (deleted, errors) = await async_bulk(client, actions=actions, raise_on_error=False)
+        logger.info(f"Successfully deleted {deleted} documents, {len(errors)} have not been found")
 
 
 class ElasticSearchBooksLoader(BasicElasticSearchLoader):
     schema = "es_books_schema.json"
     index = "books"
     input_topic = "books_es_data"
+    deleted_input_topic = "deleted_book_ids"
 
 
 def get_es_client(
     es_settings: ESSettings,
 ) -> Elasticsearch:
-    return Elasticsearch(hosts=f"http://{es_settings.host}:{es_settings.port}")
+    return Elasticsearch(
+        hosts=f"http://{es_settings.host}:{es_settings.port}",
+        http_compress=es_settings.http_compress,
+        # connections are kept alive between the requests, one per loader thread
+        connections_per_node=max(system_settings.loader_thread_count, 1),
+    )
+
+
+def get_async_es_client(
+    es_settings: ESSettings,
+) -> AsyncElasticsearch:
+    return AsyncElasticsearch(
+        hosts=f"http://{es_settings.host}:{es_settings.port}",
+        http_compress=es_settings.http_compress,
+        # a kept-alive connection per bulk request in flight
+        connections_per_node=max(system_settings.async_bulk_concurrency, 1),
+    )
 
 
 @lru_cache
@@ -133,6 +342,40 @@ def load_es_schemas(
 @etl_backoff()
 def run_es_loaders(
     client: Elasticsearch,
+    flush: bool = True,
+) -> None:
+    for es_loader in get_es_loaders():
+        es_loader.load_bulk(client, flush)
+
+
+@etl_backoff()
+def run_es_deleters(
+    client: Elasticsearch,
+) -> None:
+    for es_loader in get_es_loaders():
+        es_loader.delete_bulk(client)
+
+
+@etl_backoff()
+async def load_es_schemas_async(
+    client: AsyncElasticsearch,
 ) -> None:
     for es_loader in get_es_loaders():
-        es_loader.load_bulk(client)
+        await es_loader.load_schema_async(client)
+
+
+@etl_backoff()
+async def run_es_deleters_async(
+    client: AsyncElasticsearch,
+) -> None:
+    for es_loader in get_es_loaders():
+        await es_loader.delete_bulk_async(client)
+
+
+@etl_backoff()
+async def run_es_loader_async(
+    es_loader: ElasticSearchLoaderInt,
+    client: AsyncElasticsearch,
+    es_data: list[ESContainer],
+) -> None:
+    await es_loader.load_bulk_async(client, es_data)
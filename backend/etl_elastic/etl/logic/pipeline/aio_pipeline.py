@@ -0,0 +1,266 @@
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Coroutine,
+    Iterable,
+)
+
+import asyncpg
+from elasticsearch import (
+    AsyncElasticsearch,
+)
+from etl.logic.elastic_search.elastic_loader import (
+    ElasticSearchLoaderInt,
+    run_es_deleters_async,
+    run_es_loader_async,
+)
+from etl.logic.pipeline.pipeline import (
+    BasePipeline,
+)
+from etl.logic.postgresql.mergers import (
+    MergerInt,
+)
+from etl.logic.postgresql.replication import (
+    ReplicationClient,
+    ReplicationProducer,
+)
+from etl.logic.postgresql.runner import (
+    run_enrichers_layer_async,
+    run_postgre_producers_async,
+)
+from etl.logic.state.state import (
+    StateInt,
+)
+from etl.logic.storage.storage import (
+    Storage,
+)
+from etl.logic.transformer.dataclasses import (
+    ESContainer,
+)
+from etl.logic.transformer.transformers import (
+    run_transformers,
+)
+
+
+class AsyncChannel:
+    """Bounded asyncio queue of `(topic, value)` messages from a stage to the next one."""
+
+    closed = object()
+
+    def __init__(
+        self,
+        maxsize: int,
+    ) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def put(
+        self,
+        topic: str,
+        value: Any,
+    ) -> None:
+        await self.queue.put((topic, value))
+
+    async def close(
+        self,
+    ) -> None:
+        await self.queue.put(self.closed)
+
+    async def __aiter__(
+        self,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        while (message := await self.queue.get()) is not self.closed:
+            yield message
+
+
+class AsyncPipeline(BasePipeline):
+    """Synchronization cycle as asyncio tasks connected by bounded channels.
+
+    Stages are the ones of the threaded pipeline, every merger reads its own connection of the pool
+    and up to `bulk_concurrency` bulk requests of `loader_chunk_size` documents are in flight at once.
+    Transformation runs on a worker thread, so that responses are handled while batches are transformed.
+    """
+
+    def __init__(
+        self,
+        state: StateInt,
+        pool: asyncpg.Pool,
+        es_client: AsyncElasticsearch,
+        queue_size: int,
+        bulk_concurrency: int,
+        replication: tuple[ReplicationProducer, ReplicationClient] | None = None,
+    ) -> None:
+        super().__init__(state, queue_size, replication)
+        self.pool = pool
+        self.es_client = es_client
+        self.bulk_concurrency = bulk_concurrency
+
+    async def run(
+        self,
+    ) -> None:
+        self.producers_storage.clean()
+        await asyncio.to_thread(self.state.publish_state)
+        self.state.update_state()
+
+        await self.run_stages()
+
+        await asyncio.to_thread(self.state.store_state)
+
+    async def run_stages(
+        self,
+    ) -> None:
+        channels = [AsyncChannel(self.queue_size) for _ in range(4)]
+        keepalive = asyncio.create_task(self.keep_replication_alive())
+        try:
+            # a failed stage cancels the others
+            async with asyncio.TaskGroup() as stages:
+                stages.create_task(self.run_stage(self.produce(channels[0]), channels[0]))
+                stages.create_task(self.run_stage(self.enrich(channels[0], channels[1]), channels[1]))
+                stages.create_task(self.run_stage(self.merge(channels[1], channels[2]), channels[2]))
+                stages.create_task(self.run_stage(self.transform(channels[2], channels[3]), channels[3]))
+                stages.create_task(self.run_stage(self.load(channels[3])))
+        except ExceptionGroup as errors:
+            raise errors.exceptions[0]
+        finally:
+            keepalive.cancel()
+
+    async def keep_replication_alive(
+        self,
+    ) -> None:
+        """Keep the replication connection alive while the changes are processed by the stages."""
+        if self.replication is None:
+            return
+
+        producer = self.replication[0]
+        while True:
+            await asyncio.sleep(producer.feedback_interval_sec)
+            await asyncio.to_thread(producer.keep_alive)
+
+    @staticmethod
+    async def run_stage(
+        stage: Coroutine[Any, Any, None],
+        outbox: AsyncChannel | None = None,
+    ) -> None:
+        await stage
+        if outbox is not None:
+            await outbox.close()
+
+    async def produce(
+        self,
+        outbox: AsyncChannel,
+    ) -> None:
+        if not await run_postgre_producers_async(self.pool, self.replication):
+            # nothing has changed, the database is not queried
+            return
+
+        await self.forward(self.producers_storage, self.produced_topics, outbox)
+
+    async def enrich(
+        self,
+        inbox: AsyncChannel,
+        outbox: AsyncChannel,
+    ) -> None:
+        self.enrichers_storage.clean()
+        async for topic, ids in inbox:
+            # mergers get the produced ids as they are
+            await outbox.put(topic, ids)
+            if topic in self.enriched_topics:
+                self.enrichers_storage.set_value(topic, ids)
+
+        if any(self.enrichers_storage.get(topic) for topic in self.enriched_topics):
+            await run_enrichers_layer_async(self.pool)
+            await self.forward(self.enrichers_storage, self.enricher_output_topics, outbox)
+
+    async def merge(
+        self,
+        inbox: AsyncChannel,
+        outbox: AsyncChannel,
+    ) -> None:
+        self.mergers_storage.clean()
+        async for topic, value in inbox:
+            if topic in self.merged_topics:
+                self.mergers_storage.set_value(topic, value)
+            else:
+                await outbox.put(topic, value)
+
+        async with asyncio.TaskGroup() as mergers:
+            for merger in self.mergers:
+                if self.mergers_storage.get(merger.input_topic):
+                    mergers.create_task(self.merge_table(merger, outbox))
+
+    async def merge_table(
+        self,
+        merger: MergerInt,
+        outbox: AsyncChannel,
+    ) -> None:
+        async with self.pool.acquire() as connection:
+            # a batch is read from the cursor only once the previous one is in the channel
+            async for _ in merger.merge_async(connection):
+                await self.forward(self.mergers_storage, [merger.output_topic], outbox)
+
+    async def transform(
+        self,
+        inbox: AsyncChannel,
+        outbox: AsyncChannel,
+    ) -> None:
+        self.transformers_storage.clean()
+        async for topic, value in inbox:
+            if topic not in self.transformed_topics:
+                await outbox.put(topic, value)
+                continue
+
+            self.transformers_storage.set_value(topic, value)
+            await asyncio.to_thread(run_transformers)
+            await self.forward(self.transformers_storage, self.transformer_output_topics, outbox)
+
+    async def load(
+        self,
+        inbox: AsyncChannel,
+    ) -> None:
+        self.loaders_storage.clean()
+        in_flight = asyncio.Semaphore(self.bulk_concurrency)
+        async with asyncio.TaskGroup() as requests:
+            async for topic, value in inbox:
+                if topic not in self.loaded_topics:
+                    continue
+
+                self.loaders_storage.set_value(topic, value)
+                if topic not in self.deleted_topics:
+                    await self.send_ready(requests, in_flight, flush=False)
+
+            await self.send_ready(requests, in_flight)
+
+        await run_es_deleters_async(self.es_client)
+
+    async def send_ready(
+        self,
+        requests: asyncio.TaskGroup,
+        in_flight: asyncio.Semaphore,
+        flush: bool = True,
+    ) -> None:
+        """Send the documents filling a chunk, waiting while `bulk_concurrency` requests are in flight."""
+        for loader in self.loaders:
+            if es_data := loader.take_ready(flush):
+                await in_flight.acquire()
+                requests.create_task(self.send(loader, es_data, in_flight))
+
+    async def send(
+        self,
+        loader: ElasticSearchLoaderInt,
+        es_data: list[ESContainer],
+        in_flight: asyncio.Semaphore,
+    ) -> None:
+        try:
+            await run_es_loader_async(loader, self.es_client, es_data)
+        finally:
+            in_flight.release()
+
+    @staticmethod
+    async def forward(
+        storage: Storage,
+        topics: Iterable[str],
+        outbox: AsyncChannel,
+    ) -> None:
+        for topic in topics:
+            for value in storage.pop(topic):
+                await outbox.put(topic, value)
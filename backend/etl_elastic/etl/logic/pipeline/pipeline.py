@@ -0,0 +1,357 @@
+from queue import (
+    Empty,
+    Full,
+    Queue,
+)
+from threading import (
+    Event,
+    Thread,
+)
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+)
+
+from elasticsearch import (
+    Elasticsearch,
+)
+from etl.logic.elastic_search.elastic_loader import (
+    get_es_loaders,
+    run_es_deleters,
+    run_es_loaders,
+)
+from etl.logic.postgresql.client import (
+    PostgresClient,
+)
+from etl.logic.postgresql.enrichers import (
+    get_enrichers,
+)
+from etl.logic.postgresql.mergers import (
+    get_mergers,
+)
+from etl.logic.postgresql.producers import (
+    get_producers,
+)
+from etl.logic.postgresql.replication import (
+    ReplicationClient,
+    ReplicationProducer,
+)
+from etl.logic.postgresql.runner import (
+    run_enrichers_layer,
+    run_mergers_layer,
+    run_postgre_producers,
+)
+from etl.logic.state.state import (
+    StateInt,
+)
+from etl.logic.storage.storage import (
+    Storage,
+)
+from etl.logic.transformer.transformers import (
+    get_transformers,
+    run_transformers,
+)
+from etl.settings.settings import (
+    PGSettings,
+)
+from loguru import (
+    logger,
+)
+
+# how often a stage blocked on a channel checks whether the pipeline has been aborted
+ABORT_CHECK_SEC = 0.5
+
+
+class PipelineAborted(Exception):
+    """Another stage of the pipeline has failed."""
+
+
+class Channel:
+    """Bounded queue of `(topic, value)` messages from a stage to the next one.
+
+    A put blocks while the channel is full, so a stage never runs ahead of the next one
+    by more than `maxsize` messages.
+    """
+
+    closed = object()
+
+    def __init__(
+        self,
+        maxsize: int,
+        aborted: Event,
+    ) -> None:
+        self.queue: Queue = Queue(maxsize=maxsize)
+        self.aborted = aborted
+
+    def put(
+        self,
+        topic: str,
+        value: Any,
+    ) -> None:
+        self.__put((topic, value))
+
+    def close(
+        self,
+    ) -> None:
+        self.__put(self.closed)
+
+    def __iter__(
+        self,
+    ) -> Iterator[tuple[str, Any]]:
+        while True:
+            try:
+                message = self.queue.get(timeout=ABORT_CHECK_SEC)
+            except Empty:
+                if self.aborted.is_set():
+                    raise PipelineAborted
+                continue
+
+            if message is self.closed:
+                return
+            yield message
+
+    def __put(
+        self,
+        message: Any,
+    ) -> None:
+        while True:
+            try:
+                self.queue.put(message, timeout=ABORT_CHECK_SEC)
+                return
+            except Full:
+                if self.aborted.is_set():
+                    raise PipelineAborted
+
+
+class BasePipeline:
+    """Storages of the stages and the topics they pass to each other.
+
+    Every stage has a storage of its own, topics no stage of the pipeline consumes are dropped.
+    Ids are small, so mergers wait for all ids of the cycle and merge every book once.
+    """
+
+    def __init__(
+        self,
+        state: StateInt,
+        queue_size: int,
+        replication: tuple[ReplicationProducer, ReplicationClient] | None = None,
+    ) -> None:
+        self.state = state
+        self.queue_size = queue_size
+        self.replication = replication
+
+        producers = [*get_producers(), *([replication[0]] if replication is not None else [])]
+        enrichers = get_enrichers()
+        mergers = get_mergers()
+        transformers = get_transformers()
+        loaders = get_es_loaders()
+        self.mergers = mergers
+        self.loaders = loaders
+
+        # producers read the state and write the replication LSN for it
+        self.producers_storage = state.storage
+        self.enrichers_storage = Storage()
+        self.mergers_storage = Storage()
+        self.transformers_storage = Storage()
+        self.loaders_storage = Storage()
+        for components, storage in (
+            (producers, self.producers_storage),
+            (enrichers, self.enrichers_storage),
+            (mergers, self.mergers_storage),
+            (transformers, self.transformers_storage),
+            (loaders, self.loaders_storage),
+        ):
+            for component in components:
+                component.storage = storage
+
+        self.enriched_topics = {enricher.input_topic for enricher in enrichers}
+        self.enricher_output_topics = {enricher.output_topic for enricher in enrichers}
+        self.merged_topics = {merger.input_topic for merger in mergers}
+        self.merger_output_topics = {merger.output_topic for merger in mergers}
+        self.transformed_topics = {transformer.input_topic for transformer in transformers}
+        self.transformer_output_topics = {transformer.output_topic for transformer in transformers}
+        self.deleted_topics = {
+            loader.deleted_input_topic for loader in loaders if loader.deleted_input_topic is not None
+        }
+        self.loaded_topics = {loader.input_topic for loader in loaders} | self.deleted_topics
+        self.produced_topics = self.enriched_topics | self.merged_topics | self.deleted_topics
+
+
+class Pipeline(BasePipeline):
+    """Synchronization cycle as stages connected by bounded channels, every stage on a thread of its own.
+
+    Producers -> enrichers -> mergers -> transformers -> loaders: merged batches are transformed
+    and loaded while the next ones are read from Postgres, and a slow stage blocks the previous ones,
+    so at most `queue_size` messages are kept between two stages.
+    """
+
+    def __init__(
+        self,
+        state: StateInt,
+        pg_settings: PGSettings,
+        es_client: Elasticsearch,
+        queue_size: int,
+        replication: tuple[ReplicationProducer, ReplicationClient] | None = None,
+    ) -> None:
+        super().__init__(state, queue_size, replication)
+        self.pg_settings = pg_settings
+        self.es_client = es_client
+
+    def run(
+        self,
+    ) -> None:
+        self.producers_storage.clean()
+        self.state.publish_state()
+        self.state.update_state()
+
+        self.run_stages()
+
+        self.state.store_state()
+
+    def run_stages(
+        self,
+    ) -> None:
+        aborted = Event()
+        errors: list[BaseException] = []
+        channels = [Channel(self.queue_size, aborted) for _ in range(4)]
+        stages: list[tuple[Callable[..., None], Channel | None, Channel | None]] = [
+            (self.produce, None, channels[0]),
+            (self.enrich, channels[0], channels[1]),
+            (self.merge, channels[1], channels[2]),
+            (self.transform, channels[2], channels[3]),
+            (self.load, channels[3], None),
+        ]
+
+        def run_stage(
+            stage: Callable[..., None],
+            inbox: Channel | None,
+            outbox: Channel | None,
+        ) -> None:
+            try:
+                stage(*(channel for channel in (inbox, outbox) if channel is not None))
+                if outbox is not None:
+                    outbox.close()
+            except PipelineAborted:
+                pass
+            except BaseException as err:
+                logger.exception(f"`{stage.__name__}` stage has failed")
+                errors.append(err)
+                aborted.set()
+
+        threads = [
+            Thread(target=run_stage, args=stage, name=f"etl-{stage[0].__name__}", daemon=True)
+            for stage in stages
+        ]
+        finished = Event()
+        keepalive = Thread(
+            target=self.keep_replication_alive, args=(finished,), name="etl-keepalive", daemon=True
+        )
+        for thread in [*threads, keepalive]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        finished.set()
+        keepalive.join()
+
+        if errors:
+            raise errors[0]
+
+    def keep_replication_alive(
+        self,
+        finished: Event,
+    ) -> None:
+        """Keep the replication connection alive while the changes are processed by the stages."""
+        if self.replication is None:
+            return
+
+        producer = self.replication[0]
+        while not finished.wait(producer.feedback_interval_sec):
+            producer.keep_alive()
+
+    def produce(
+        self,
+        outbox: Channel,
+    ) -> None:
+        if not run_postgre_producers(PostgresClient(self.pg_settings), self.replication):
+            # nothing has changed, the database is not queried
+            return
+
+        self.forward(self.producers_storage, self.produced_topics, outbox)
+
+    def enrich(
+        self,
+        inbox: Channel,
+        outbox: Channel,
+    ) -> None:
+        self.enrichers_storage.clean()
+        for topic, ids in inbox:
+            # mergers get the produced ids as they are
+            outbox.put(topic, ids)
+            if topic in self.enriched_topics:
+                self.enrichers_storage.set_value(topic, ids)
+
+        if any(self.enrichers_storage.get(topic) for topic in self.enriched_topics):
+            run_enrichers_layer(PostgresClient(self.pg_settings))
+            self.forward(self.enrichers_storage, self.enricher_output_topics, outbox)
+
+    def merge(
+        self,
+        inbox: Channel,
+        outbox: Channel,
+    ) -> None:
+        self.mergers_storage.clean()
+        for topic, value in inbox:
+            if topic in self.merged_topics:
+                self.mergers_storage.set_value(topic, value)
+            else:
+                outbox.put(topic, value)
+
+        if not any(self.mergers_storage.get(topic) for topic in self.merged_topics):
+            return
+
+        # a batch is read from the cursor only once the previous one is in the channel
+        for _ in run_mergers_layer(PostgresClient(self.pg_settings)):
+            self.forward(self.mergers_storage, self.merger_output_topics, outbox)
+
+    def transform(
+        self,
+        inbox: Channel,
+        outbox: Channel,
+    ) -> None:
+        self.transformers_storage.clean()
+        for topic, value in inbox:
+            if topic not in self.transformed_topics:
+                outbox.put(topic, value)
+                continue
+
+            self.transformers_storage.set_value(topic, value)
+            run_transformers()
+            self.forward(self.transformers_storage, self.transformer_output_topics, outbox)
+
+    def load(
+        self,
+        inbox: Channel,
+    ) -> None:
+        self.loaders_storage.clean()
+        for topic, value in inbox:
+            if topic not in self.loaded_topics:
+                continue
+
+            self.loaders_storage.set_value(topic, value)
+            if topic not in self.deleted_topics:
+                run_es_loaders(self.es_client, flush=False)
+
+        run_es_loaders(self.es_client)
+        run_es_deleters(self.es_client)
+
+    @staticmethod
+    def forward(
+        storage: Storage,
+        topics: Iterable[str],
+        outbox: Channel,
+    ) -> None:
+        for topic in topics:
+            for value in storage.pop(topic):
+                outbox.put(topic, value)
@@ -1,7 +1,12 @@
+import json
+import re
 from abc import (
     ABC,
     abstractmethod,
 )
+from itertools import (
+    count,
+)
 from types import (
     TracebackType,
 )
@@ -9,6 +14,7 @@ from typing import (
     Type,
 )
 
+import asyncpg
 import psycopg2
 from etl.settings.settings import (
     PGSettings,
@@ -94,3 +100,40 @@ class PostgresClient(PostgresClientInt):
         traceback: TracebackType | None,
     ) -> None:
         self.disconnect()
+
+
+async def init_async_connection(
+    connection: asyncpg.Connection,
+) -> None:
+    # psycopg2 decodes json columns, asyncpg returns them as strings by default
+    for json_type in ("json", "jsonb"):
+        await connection.set_type_codec(
+            json_type,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog",
+        )
+
+
+def create_pg_pool(
+    settings: PGSettings,
+    max_size: int,
+) -> asyncpg.Pool:
+    return asyncpg.create_pool(
+        host=settings.host,
+        port=settings.port,
+        user=settings.user,
+        password=settings.password,
+        database=settings.dbname,
+        min_size=1,
+        max_size=max_size,
+        init=init_async_connection,
+    )
+
+
+def to_asyncpg_query(
+    query: str,
+) -> str:
+    """Replace `%s` placeholders of psycopg2 with the numbered ones of asyncpg, so queries are shared."""
+    number = count(1)
+    return re.sub("%s", lambda _: f"${next(number)}", query)
@@ -15,6 +15,10 @@ from uuid import (
     UUID,
 )
 
+import asyncpg
+from etl.logic.postgresql.client import (
+    to_asyncpg_query,
+)
 from etl.logic.storage.storage import (
     Storage,
 )
@@ -27,6 +31,10 @@ from psycopg2._psycopg import (
 
 
 class EnricherInt(ABC):
+    input_topic: str
+    output_topic: str
+    storage: Storage
+
     @abstractmethod
     def enrich(
         self,
@@ -34,6 +42,13 @@ class EnricherInt(ABC):
     ) -> None:
         ...
 
+    @abstractmethod
+    async def enrich_async(
+        self,
+        connection: asyncpg.Connection,
+    ) -> None:
+        ...
+
 
 class BaseEnricher(EnricherInt):
     input_topic: str
@@ -53,7 +68,7 @@ class BaseEnricher(EnricherInt):
         FROM public.books AS b
         LEFT JOIN {self.join_table_name} ON
         {self.join_table_name}.{self.join_on_field} = b.id
-        WHERE {self.join_table_name}.{self.id_field} IN %s
+        WHERE {self.join_table_name}.{self.id_field} = ANY(%s::uuid[])
         ORDER BY b.modified_at;
         """
         return query
@@ -68,7 +83,7 @@ class BaseEnricher(EnricherInt):
         if not producer_ids:
             return
 
-        flat_ids = tuple(chain(*producer_ids))
+        flat_ids = list(chain(*producer_ids))
         query = self.get_query()
         with connection.cursor() as cursor:
             cursor.execute(
@@ -82,6 +97,20 @@ class BaseEnricher(EnricherInt):
             enriched_ids,
         )
 
+    async def enrich_async(
+        self,
+        connection: asyncpg.Connection,
+    ) -> None:
+        producer_ids: list[list[UUID]] = self.storage.get(self.input_topic)
+        if not producer_ids:
+            return
+
+        response = await connection.fetch(to_asyncpg_query(self.get_query()), list(chain(*producer_ids)))
+        self.storage.set_value(
+            self.output_topic,
+            [res[0] for res in response],
+        )
+
 
 class AuthorBookEnricher(BaseEnricher):
     input_topic = "author_ids"
@@ -115,3 +144,10 @@ def run_enrichers(
 ) -> None:
     for enricher in get_enrichers():
         enricher.enrich(connection)
+
+
+async def run_enrichers_async(
+    connection: asyncpg.Connection,
+) -> None:
+    for enricher in get_enrichers():
+        await enricher.enrich_async(connection)
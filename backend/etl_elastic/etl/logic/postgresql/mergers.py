@@ -7,9 +7,11 @@ from functools import (
 )
 from itertools import (
     chain,
+    islice,
     zip_longest,
 )
 from typing import (
+    AsyncIterator,
     Iterator,
     cast,
 )
@@ -18,18 +20,32 @@ from psycopg2.extras import (
     DictCursor,
 )
 
+import asyncpg
+from etl.logic.postgresql.client import (
+    to_asyncpg_query,
+)
 from etl.logic.storage.storage import (
     Storage,
 )
+from etl.settings.settings import (
+    get_app_settings,
+)
 from loguru import (
     logger,
 )
 from psycopg2._psycopg import (
     connection as pg_connection,
+    cursor as pg_cursor,
 )
 
+system_settings = get_app_settings()
+
 
 class MergerInt(ABC):
+    input_topic: str
+    output_topic: str
+    storage: Storage
+
     @abstractmethod
     def merge(
         self,
@@ -37,6 +53,13 @@ class MergerInt(ABC):
     ) -> Iterator[None]:
         ...
 
+    @abstractmethod
+    def merge_async(
+        self,
+        connection: asyncpg.Connection,
+    ) -> AsyncIterator[None]:
+        ...
+
 
 class BaseMerger(MergerInt):
     input_topic: str
@@ -44,12 +67,26 @@ class BaseMerger(MergerInt):
     table: str
     storage = Storage()
     batch_size = 50
+    # rows fetched from the server-side cursor per round trip
+    itersize = system_settings.merger_itersize
 
     def get_query(
         self,
     ) -> str:
         raise NotImplementedError
 
+    def get_cursor(
+        self,
+        connection: pg_connection,
+    ) -> pg_cursor:
+        """Get a named (server-side) cursor, so that rows are streamed instead of being fetched at once."""
+        cursor = connection.cursor(
+            name=f"{self.output_topic}_cursor",
+            cursor_factory=DictCursor,
+        )
+        cursor.itersize = self.itersize
+        return cursor
+
     def merge(
         self,
         connection: pg_connection,
@@ -60,13 +97,15 @@ class BaseMerger(MergerInt):
         if not item_ids:
             return iter([])
 
-        unique_ids = tuple(set(chain(*item_ids)))
-        with connection.cursor(cursor_factory=DictCursor) as cursor:
+        unique_ids = list(set(chain(*item_ids)))
+        with self.get_cursor(connection) as cursor:
             cursor.execute(
                 query,
                 vars=(unique_ids,),
             )
-            while item_data := cursor.fetchmany(size=self.batch_size):
+            # iterating a named cursor fetches `itersize` rows at a time, unlike `fetchmany`
+            rows = iter(cursor)
+            while item_data := list(islice(rows, self.batch_size)):
                 logger.debug(f"Retrieved {len(item_data)} rows from `{self.table}` table")
                 self.storage.set_value(
                     self.output_topic,
@@ -74,6 +113,41 @@ class BaseMerger(MergerInt):
                 )
                 yield None
 
+    async def merge_async(
+        self,
+        connection: asyncpg.Connection,
+    ) -> AsyncIterator[None]:
+        item_ids = self.storage.get(self.input_topic)
+        if not item_ids:
+            return
+
+        unique_ids = list(set(chain(*item_ids)))
+        # asyncpg cursors are server-side and live within a transaction
+        async with connection.transaction():
+            item_data = []
+            async for row in connection.cursor(
+                to_asyncpg_query(self.get_query()),
+                unique_ids,
+                prefetch=self.itersize,
+            ):
+                item_data.append(row)
+                if len(item_data) < self.batch_size:
+                    continue
+
+                self.storage.set_value(
+                    self.output_topic,
+                    item_data,
+                )
+                item_data = []
+                yield None
+
+        if item_data:
+            self.storage.set_value(
+                self.output_topic,
+                item_data,
+            )
+            yield None
+
 
 class BooksMerger(BaseMerger):
     input_topic = "book_ids"
@@ -112,7 +186,7 @@ class BooksMerger(BaseMerger):
     LEFT JOIN public.authors a ON a.id = ba.author_id
     LEFT JOIN public.books_categories bc ON bc.book_id = b.id
     LEFT JOIN public.categories c ON c.id = bc.category_id
-    WHERE b.id IN %s
+    WHERE b.id = ANY(%s::uuid[])
     GROUP BY b.id
     ORDER BY b.modified_at
     ;
@@ -132,7 +206,7 @@ class AuthorsMerger(BaseMerger):
         query = f"""
         SELECT id, name, last_name, biography, created_at, modified_at
         FROM {self.table}
-        WHERE id IN %s 
+        WHERE id = ANY(%s::uuid[]) 
         ORDER BY modified_at
         ;
         """
@@ -151,7 +225,7 @@ class CategoriesMerger(BaseMerger):
         query = f"""
         SELECT id, name, description, created_at, modified_at
         FROM {self.table}
-        WHERE id IN %s
+        WHERE id = ANY(%s::uuid[])
         ORDER BY modified_at
         ;
         """
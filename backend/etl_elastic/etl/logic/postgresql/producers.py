@@ -9,6 +9,10 @@ from typing import (
     cast,
 )
 
+import asyncpg
+from etl.logic.postgresql.client import (
+    to_asyncpg_query,
+)
 from etl.logic.storage.storage import (
     Storage,
 )
@@ -21,6 +25,8 @@ from psycopg2._psycopg import (
 
 
 class ProducerInt(ABC):
+    storage: Storage
+
     @abstractmethod
     def produce(
         self,
@@ -72,6 +78,20 @@ class BaseProducer(ProducerInt):
                 producer_ids,
             )
 
+    async def produce_async(
+        self,
+        connection: asyncpg.Connection,
+    ) -> None:
+        last_checkup = self.storage.get(self.input_topic)[0]
+
+        response = await connection.fetch(to_asyncpg_query(self.get_query()), last_checkup)
+        logger.debug(f"Retrieved {len(response)} ids from `{self.table}` table")
+        if producer_ids := [res[0] for res in response]:
+            self.storage.set_value(
+                self.output_topic,
+                producer_ids,
+            )
+
 
 class BookProducer(BaseProducer):
     table = "public.books"
@@ -102,3 +122,10 @@ def run_producers(
 ) -> None:
     for producer in get_producers():
         producer.produce(connection)
+
+
+async def run_producers_async(
+    connection: asyncpg.Connection,
+) -> None:
+    for producer in get_producers():
+        await cast(BaseProducer, producer).produce_async(connection)
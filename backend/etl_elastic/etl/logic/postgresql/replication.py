@@ -0,0 +1,268 @@
+import re
+import select
+import time
+from collections import (
+    defaultdict,
+)
+from threading import (
+    Lock,
+)
+from typing import (
+    NamedTuple,
+)
+
+import psycopg2
+from etl.logic.backoff.backoff import (
+    etl_backoff,
+)
+from etl.logic.postgresql.client import (
+    PostgresClient,
+)
+from etl.logic.postgresql.producers import (
+    ProducerInt,
+)
+from etl.logic.storage.storage import (
+    Storage,
+)
+from etl.settings.settings import (
+    PGSettings,
+)
+from loguru import (
+    logger,
+)
+from psycopg2._psycopg import (
+    connection as pg_connection,
+)
+from psycopg2.errors import (
+    DuplicateObject,
+)
+from psycopg2.extras import (
+    LogicalReplicationConnection,
+    ReplicationCursor,
+    ReplicationMessage,
+)
+
+# `table public.books: UPDATE: id[uuid]:'...' title[character varying]:'...'` lines of test_decoding
+CHANGE_PATTERN = re.compile(r"^table (?P<table>[^:]+): (?P<action>INSERT|UPDATE|DELETE): (?P<columns>.*)$")
+COLUMN_PATTERN = re.compile(r"(?P<name>\w+)\[[^\]]+\]:(?P<value>'(?:[^']|'')*'|\S+)")
+
+
+class ChangeTopic(NamedTuple):
+    topic: str
+    id_column: str
+
+
+class ReplicationClient(PostgresClient):
+    """Client with a logical replication connection kept open between the synchronization cycles."""
+
+    def __init__(
+        self,
+        settings: PGSettings,
+    ) -> None:
+        super().__init__(settings)
+        self.connection = None  # type: ignore
+
+    def connect(
+        self,
+    ) -> None:
+        self.connection = psycopg2.connect(
+            **self.settings.dict(),
+            connection_factory=LogicalReplicationConnection,
+        )
+        logger.info("succesfully connected to the Postgres DBMS for replication")
+
+    def ensure_connected(
+        self,
+    ) -> pg_connection:
+        if self.connection is None or self.connection.closed:
+            self.connect()
+        return self.connection
+
+
+class ReplicationProducer(ProducerInt):
+    """Producer of the changed ids decoded from a logical replication slot.
+
+    Unlike polling, changes are pushed by Postgres as soon as they are committed,
+    deletes included, and an idle database is not queried at all.
+    Changes are decoded by the `test_decoding` plugin, the slot is created on the first run.
+
+    Postgres drops a replication connection silent for `wal_sender_timeout`, so feedback is sent
+    every `feedback_interval_sec` while the slot is read and, by `keep_alive`, while the changes are loaded.
+    """
+
+    topics_by_table = {
+        "public.books": ChangeTopic("book_ids", "id"),
+        "public.authors": ChangeTopic("author_ids", "id"),
+        "public.categories": ChangeTopic("category_ids", "id"),
+        "public.books_authors": ChangeTopic("book_ids", "book_id"),
+        "public.books_categories": ChangeTopic("book_ids", "book_id"),
+    }
+    # deleted rows of these tables are removed from the index
+    deleted_topics_by_table = {
+        "public.books": "deleted_book_ids",
+    }
+
+    output_plugin = "test_decoding"
+    # changes read per cycle at most, the rest is read by the next cycles
+    batch_size = 10_000
+    storage = Storage()
+    input_topic = "replication_checkpoint"
+    lsn_topic = "replication_lsn"
+
+    def __init__(
+        self,
+        slot_name: str,
+        wait_sec: float,
+        feedback_interval_sec: float = 10,
+    ) -> None:
+        self.slot_name = slot_name
+        self.wait_sec = wait_sec
+        self.feedback_interval_sec = feedback_interval_sec
+        self.cursor: ReplicationCursor | None = None
+        self.last_feedback_at = 0.0
+        # the cursor is read by the producing stage and kept alive by another thread
+        self.lock = Lock()
+
+    def produce(
+        self,
+        connection: pg_connection,
+    ) -> None:
+        with self.lock:
+            self.read_changes(connection)
+
+    def read_changes(
+        self,
+        connection: pg_connection,
+    ) -> None:
+        checkpoint_lsn = self.storage.get(self.input_topic)[0]
+        if self.cursor is None or self.cursor.connection is not connection:
+            self.start_replication(connection, checkpoint_lsn)
+        else:
+            # changes up to the checkpoint are loaded, so the slot may release their WAL
+            self.send_feedback(flush_lsn=checkpoint_lsn)
+
+        ids_by_topic: dict[str, set[str]] = defaultdict(set)
+        last_lsn = None
+        message = self.wait_message()
+        messages_count = 0
+        while message is not None:
+            last_lsn = message.data_start
+            self.apply_change(message.payload, ids_by_topic)
+
+            messages_count += 1
+            if messages_count == self.batch_size:
+                break
+            if self.is_feedback_due():
+                self.send_feedback()
+            message = self.cursor.read_message()
+
+        for topic, ids in ids_by_topic.items():
+            logger.debug(f"Retrieved {len(ids)} ids of `{topic}` from the replication slot")
+            self.storage.set_value(
+                topic,
+                list(ids),
+            )
+        if last_lsn is not None:
+            self.storage.set_value(
+                self.lsn_topic,
+                last_lsn,
+            )
+
+    def is_feedback_due(
+        self,
+    ) -> bool:
+        return time.monotonic() - self.last_feedback_at >= self.feedback_interval_sec
+
+    def send_feedback(
+        self,
+        flush_lsn: int = 0,
+    ) -> None:
+        """Send the positions of the slot, zero keeps the position sent before."""
+        self.cursor.send_feedback(flush_lsn=flush_lsn)
+        self.last_feedback_at = time.monotonic()
+
+    def keep_alive(
+        self,
+    ) -> None:
+        """Send feedback if it is due, unless the slot is being read, which sends feedback itself."""
+        if self.cursor is None or not self.lock.acquire(blocking=False):
+            return
+
+        try:
+            if self.is_feedback_due():
+                self.send_feedback()
+        except psycopg2.Error as err:
+            # the connection is reestablished by the next cycle
+            logger.warning(f"Replication feedback has not been sent: {err}")
+        finally:
+            self.lock.release()
+
+    def start_replication(
+        self,
+        connection: pg_connection,
+        start_lsn: int,
+    ) -> None:
+        self.cursor = connection.cursor()
+        try:
+            self.cursor.create_replication_slot(self.slot_name, output_plugin=self.output_plugin)
+            logger.info(f"Replication slot `{self.slot_name}` has been created")
+        except DuplicateObject:
+            pass
+
+        self.cursor.start_replication(
+            slot_name=self.slot_name,
+            decode=True,
+            start_lsn=start_lsn,
+            options={"include-xids": "0", "skip-empty-xacts": "1"},
+        )
+        self.last_feedback_at = time.monotonic()
+        logger.info(f"Replication from `{self.slot_name}` slot has been started at LSN {start_lsn}")
+
+    def wait_message(
+        self,
+    ) -> ReplicationMessage | None:
+        """Read a pending message, waiting for one for up to `wait_sec`."""
+        message = self.cursor.read_message()
+        if message is None:
+            select.select([self.cursor], [], [], self.wait_sec)
+            message = self.cursor.read_message()
+        return message
+
+    def apply_change(
+        self,
+        payload: str,
+        ids_by_topic: dict[str, set[str]],
+    ) -> None:
+        if not (change := CHANGE_PATTERN.match(payload)):
+            # BEGIN and COMMIT
+            return
+
+        table = change["table"]
+        if (change_topic := self.topics_by_table.get(table)) is None:
+            return
+
+        # updates changing the key have both the old key and the new tuple
+        ids = [
+            column["value"].strip("'")
+            for column in COLUMN_PATTERN.finditer(change["columns"])
+            if column["name"] == change_topic.id_column
+        ]
+        if change["action"] == "DELETE" and (deleted_topic := self.deleted_topics_by_table.get(table)):
+            ids_by_topic[deleted_topic].update(ids)
+        else:
+            ids_by_topic[change_topic.topic].update(ids)
+
+
+@etl_backoff()
+def run_replication_producer(
+    producer: ReplicationProducer,
+    replication_client: ReplicationClient,
+) -> bool:
+    """Produce ids changed since the last cycle and get whether there are any."""
+    try:
+        producer.produce(replication_client.ensure_connected())
+    except psycopg2.OperationalError:
+        replication_client.disconnect()
+        raise
+
+    return bool(producer.storage.get(producer.lsn_topic))
@@ -1,7 +1,9 @@
+import asyncio
 from typing import (
     Iterator,
 )
 
+import asyncpg
 from etl.logic.backoff.backoff import (
     etl_backoff,
 )
@@ -11,33 +13,81 @@ from .client import (
 )
 from .enrichers import (
     run_enrichers,
+    run_enrichers_async,
 )
 from .mergers import (
     run_mergers,
 )
 from .producers import (
     run_producers,
+    run_producers_async,
+)
+from .replication import (
+    ReplicationClient,
+    ReplicationProducer,
+    run_replication_producer,
 )
 
 
 @etl_backoff()
-def run_functions(
+def run_producers_layer(
     pg_client: PostgresClient,
 ) -> None:
     with pg_client as client:
         run_producers(client.connection)
+
+
+def run_postgre_producers(
+    pg_client: PostgresClient,
+    replication: tuple[ReplicationProducer, ReplicationClient] | None = None,
+) -> bool:
+    """Produce ids changed since the last cycle and get whether there may be any."""
+    if replication is not None:
+        return run_replication_producer(*replication)
+
+    run_producers_layer(pg_client)
+    return True
+
+
+@etl_backoff()
+def run_enrichers_layer(
+    pg_client: PostgresClient,
+) -> None:
+    with pg_client as client:
         run_enrichers(client.connection)
 
 
-def run_generators(
+def run_mergers_layer(
     pg_client: PostgresClient,
 ) -> Iterator[None]:
     with pg_client as client:
         yield from run_mergers(client.connection)
 
 
-def run_postgre_layers(
-    pg_client: PostgresClient,
-) -> Iterator[None]:
-    run_functions(pg_client)
-    yield from run_generators(pg_client)
+@etl_backoff()
+async def run_producers_layer_async(
+    pool: asyncpg.Pool,
+) -> None:
+    async with pool.acquire() as connection:
+        await run_producers_async(connection)
+
+
+async def run_postgre_producers_async(
+    pool: asyncpg.Pool,
+    replication: tuple[ReplicationProducer, ReplicationClient] | None = None,
+) -> bool:
+    """Produce ids changed since the last cycle and get whether there may be any."""
+    if replication is not None:
+        # asyncpg has no replication protocol, so the slot is read by psycopg2 on a worker thread
+        return await asyncio.to_thread(run_replication_producer, *replication)
+
+    await run_producers_layer_async(pool)
+    return True
+
+
+@etl_backoff()
+async def run_enrichers_layer_async(
+    pool: asyncpg.Pool,
+) -> None:
+    async with pool.acquire() as connection:
+        await run_enrichers_async(connection)
@@ -128,3 +128,58 @@ class RedisState(StateInt):
             self.redis_key,
             str(self.state.last_checkup),
         )
+
+
+class ReplicationState(StateInt):
+    """LSN of the replication slot up to which the changes have been loaded."""
+
+    state_name = "etl_replication_lsn"
+
+    input_topic = "replication_lsn"
+    output_topic = "replication_checkpoint"
+    storage = Storage()
+
+    def __init__(
+        self,
+        settings: RedisSettings,
+    ) -> None:
+        self.lsn = 0
+
+        self.redis = Redis(
+            host=settings.host,
+            port=settings.port,
+        )
+        self.redis_key = f"{settings.prefix}_{self.state_name}"
+
+    @etl_backoff()
+    def publish_state(
+        self,
+    ) -> None:
+        logger.info("Reading the replication state")
+
+        lsn = self.redis.get(self.redis_key)
+        self.lsn = int(lsn) if lsn is not None else 0
+
+        self.storage.set_value(
+            self.output_topic,
+            self.lsn,
+        )
+
+    def update_state(
+        self,
+    ) -> None:
+        """The LSN is known only once the changes are read, so it is taken when the state is stored."""
+
+    @etl_backoff()
+    def store_state(
+        self,
+    ) -> None:
+        if lsns := self.storage.get(self.input_topic):
+            self.lsn = max(lsns)
+
+        logger.info("Storing the replication state")
+
+        self.redis.set(
+            self.redis_key,
+            str(self.lsn),
+        )
@@ -7,28 +7,36 @@ from typing import (
 
 
 class Storage:
-    storage: dict[
-        str,
-        list,
-    ] = defaultdict(list)
+    """Topics of a pipeline stage, every stage has a storage of its own."""
+
+    def __init__(
+        self,
+    ) -> None:
+        self.storage: dict[
+            str,
+            list,
+        ] = defaultdict(list)
 
-    @classmethod
     def get(
-        cls,
+        self,
         key: str,
     ) -> list:
-        return cls.storage[key]
+        return self.storage[key]
 
-    @classmethod
     def set_value(
-        cls,
+        self,
         key: str,
         value: Any,
     ) -> None:
-        cls.storage[key].append(value)
+        self.storage[key].append(value)
+
+    def pop(
+        self,
+        key: str,
+    ) -> list:
+        return self.storage.pop(key, [])
 
-    @classmethod
     def clean(
-        cls,
+        self,
     ) -> None:
-        cls.storage = defaultdict(list)
+        self.storage = defaultdict(list)
@@ -51,7 +51,8 @@ class BaseTransformer(TransformerInt):
         if not sql_data:
             return
 
-        sql_data = [self.row(**item) for item in sql_data[0]]
+        # batches are consumed, so that the merged rows are not kept until the end of the cycle
+        sql_data = [self.row(**item) for item in sql_data.pop(0)]
         es_data = self.dataclass(batch=sql_data)
         self.storage.set_value(
             self.output_topic,
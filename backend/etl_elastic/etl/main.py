@@ -1,3 +1,4 @@
+import asyncio
 from time import (
     sleep,
 )
@@ -7,30 +8,71 @@ from loguru import (
 )
 
 from etl.logic.elastic_search.elastic_loader import (
+    get_async_es_client,
     get_es_client,
     load_es_schemas,
-    run_es_loaders,
+    load_es_schemas_async,
+)
+from etl.logic.pipeline.aio_pipeline import (
+    AsyncPipeline,
+)
+from etl.logic.pipeline.pipeline import (
+    Pipeline,
 )
 from etl.logic.postgresql.client import (
-    PostgresClient,
+    create_pg_pool,
 )
-from etl.logic.postgresql.runner import (
-    run_postgre_layers,
+from etl.logic.postgresql.mergers import (
+    get_mergers,
+)
+from etl.logic.postgresql.replication import (
+    ReplicationClient,
+    ReplicationProducer,
 )
 from etl.logic.state.state import (
     RedisState,
-)
-from etl.logic.storage.storage import (
-    Storage,
-)
-from etl.logic.transformer.transformers import (
-    run_transformers,
+    ReplicationState,
+    StateInt,
 )
 from etl.settings.settings import (
+    EngineMode,
+    ProducerMode,
+    SystemSettings,
     get_app_settings,
 )
 
 
+async def main_async(
+    system_settings: SystemSettings,
+    state: StateInt,
+    replication: tuple[ReplicationProducer, ReplicationClient] | None,
+) -> None:
+    es_client = get_async_es_client(system_settings.es)
+    # producers and enrichers take a connection at a time, every merger one of its own
+    pool_size = len(get_mergers()) + 1
+    try:
+        async with create_pg_pool(system_settings.db, max_size=pool_size) as pool:
+            pipeline = AsyncPipeline(
+                state=state,
+                pool=pool,
+                es_client=es_client,
+                queue_size=system_settings.pipeline_queue_size,
+                bulk_concurrency=system_settings.async_bulk_concurrency,
+                replication=replication,
+            )
+
+            await load_es_schemas_async(es_client)
+            while True:
+                logger.info("Runnig the synchronization process")
+                await pipeline.run()
+
+                if replication is None:
+                    logger.info("Going to sleep")
+                    await asyncio.sleep(system_settings.synhronization_time_sec)
+    finally:
+        await es_client.close()
+
+
 def main() -> None:
     logger.info("ETL has been started")
     system_settings = get_app_settings()
@@ -38,27 +80,42 @@ def main() -> None:
     es_settings = system_settings.es  # type: ignore
     redis_settings = system_settings.redis  # type: ignore
 
-    state = RedisState(settings=redis_settings)
-    pg_client = PostgresClient(pg_settings)
+    state: StateInt
+    replication = None
+    if system_settings.producer_mode == ProducerMode.replication:
+        state = ReplicationState(settings=redis_settings)
+        replication = (
+            ReplicationProducer(
+                slot_name=system_settings.replication_slot_name,
+                wait_sec=system_settings.replication_wait_sec,
+                feedback_interval_sec=system_settings.replication_feedback_interval_sec,
+            ),
+            ReplicationClient(pg_settings),
+        )
+    else:
+        state = RedisState(settings=redis_settings)
+
+    if system_settings.engine_mode == EngineMode.asyncio:
+        asyncio.run(main_async(system_settings, state, replication))
+        return
+
     es_client = get_es_client(es_settings)
-    storage = Storage()
+    pipeline = Pipeline(
+        state=state,
+        pg_settings=pg_settings,
+        es_client=es_client,
+        queue_size=system_settings.pipeline_queue_size,
+        replication=replication,
+    )
 
     load_es_schemas(es_client)
     while True:
         logger.info("Runnig the synchronization process")
-        storage.clean()
-
-        state.publish_state()
-        state.update_state()
-
-        for _ in run_postgre_layers(pg_client):
-            run_transformers()
-            run_es_loaders(es_client)
-
-        state.store_state()
+        pipeline.run()
 
-        logger.info("Going to sleep")
-        sleep(system_settings.synhronization_time_sec)
+        if replication is None:
+            logger.info("Going to sleep")
+            sleep(system_settings.synhronization_time_sec)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,6 @@
+from enum import (
+    StrEnum,
+)
 from functools import (
     lru_cache,
 )
@@ -19,6 +22,29 @@ ENV_FILE = BASE_DIR.joinpath(".env")
 ES_SCHEMAS_PATH = BASE_DIR.joinpath("configs/es_schemas")
 
 
+class ProducerMode(StrEnum):
+    # modified rows are selected from every table every cycle
+    polling = "polling"
+    # changed rows are read from a logical replication slot
+    replication = "replication"
+
+
+class EngineMode(StrEnum):
+    # stages on threads, psycopg2 and the blocking Elasticsearch client
+    threads = "threads"
+    # stages as asyncio tasks, asyncpg and AsyncElasticsearch
+    asyncio = "asyncio"
+
+
+class LoaderMode(StrEnum):
+    # a batch of merged documents per request, one request at a time
+    bulk = "bulk"
+    # documents of the cycle are streamed by chunks, failed documents are reported one by one
+    streaming = "streaming"
+    # as streaming, with chunks sent by `loader_thread_count` threads at once
+    parallel = "parallel"
+
+
 class RedisSettings(BaseModel):
     host: str = Field(alias="redis_host")
     port: int = Field(alias="redis_port")
@@ -38,6 +64,7 @@ class ESSettings(BaseModel):
     index: str = Field(alias="es_index")
     host: str = Field(alias="es_host")
     port: int = Field(alias="es_port")
+    http_compress: bool = Field(default=True, alias="es_http_compress")
 
 
 class SystemSettings(BaseSettings):
@@ -49,6 +76,28 @@ class SystemSettings(BaseSettings):
     )
     synhronization_time_sec: int = 10
 
+    # merged rows fetched from Postgres per round trip, memory of a cycle is bounded by it
+    merger_itersize: int = 2000
+
+    engine_mode: EngineMode = EngineMode.threads
+    # messages kept between two stages of the pipeline, a merged batch or a transformed bulk each
+    pipeline_queue_size: int = 8
+    # asyncio engine only: bulk requests in flight at once, every loader mode streams by chunks
+    async_bulk_concurrency: int = 8
+
+    loader_mode: LoaderMode = LoaderMode.bulk
+    # streaming and parallel modes only: a chunk is sent once it has `size` documents or `bytes`
+    loader_chunk_size: int = 500
+    loader_max_chunk_bytes: int = 10 * 1024 * 1024
+    loader_thread_count: int = 4
+
+    producer_mode: ProducerMode = ProducerMode.polling
+    replication_slot_name: str = "es_etl"
+    # replication mode only: a cycle waits for changes for up to `wait` seconds instead of sleeping
+    replication_wait_sec: float = 1
+    # replication mode only: feedback is sent this often, well within the server's `wal_sender_timeout`
+    replication_feedback_interval_sec: float = 10
+
     original_wait_for_sevice_time_sec: float = 0.1
     factor: int = 2
     max_value: float = 10
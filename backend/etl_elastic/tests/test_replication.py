@@ -0,0 +1,100 @@
+from collections import (
+    defaultdict,
+)
+
+import pytest
+from etl.logic.postgresql.replication import (
+    ReplicationProducer,
+)
+
+BOOK_ID = "5e1c4f9a-0b6f-4b8e-9d52-3f2c1a7e8b10"
+OTHER_BOOK_ID = "0c7d2e4b-6a1f-4c3d-8e9b-2f5a7c1d3e40"
+AUTHOR_ID = "9a8b7c6d-5e4f-4a3b-8c2d-1e0f9a8b7c6d"
+
+
+class FakeReplicationCursor:
+    def __init__(
+        self,
+    ) -> None:
+        self.feedbacks: list[int] = []
+
+    def send_feedback(
+        self,
+        flush_lsn: int = 0,
+    ) -> None:
+        self.feedbacks.append(flush_lsn)
+
+
+@pytest.mark.parametrize(
+    ("payload", "expected"),
+    (
+        # transaction boundaries are not changes
+        ("BEGIN", {}),
+        ("COMMIT", {}),
+        (
+            f"table public.books: INSERT: id[uuid]:'{BOOK_ID}' title[character varying]:'Dune'",
+            {"book_ids": {BOOK_ID}},
+        ),
+        # quoted values may hold quotes, brackets and colons, which do not start a column
+        (
+            f"table public.books: UPDATE: title[character varying]:'It''s id[uuid]:''{OTHER_BOOK_ID}'''"
+            f" id[uuid]:'{BOOK_ID}'",
+            {"book_ids": {BOOK_ID}},
+        ),
+        # NULLs and unchanged TOASTed values are not quoted
+        (
+            f"table public.books: UPDATE: id[uuid]:'{BOOK_ID}' description[text]:null"
+            " cover[bytea]:unchanged-toast-datum",
+            {"book_ids": {BOOK_ID}},
+        ),
+        # an update changing the key has both the old key and the new tuple
+        (
+            f"table public.books_authors: UPDATE: old-key: book_id[uuid]:'{OTHER_BOOK_ID}'"
+            f" author_id[uuid]:'{AUTHOR_ID}' new-tuple: id[uuid]:'{AUTHOR_ID}' book_id[uuid]:'{BOOK_ID}'"
+            f" author_id[uuid]:'{AUTHOR_ID}'",
+            {"book_ids": {BOOK_ID, OTHER_BOOK_ID}},
+        ),
+        (
+            f"table public.authors: DELETE: id[uuid]:'{AUTHOR_ID}'",
+            {"author_ids": {AUTHOR_ID}},
+        ),
+        # deleted books are removed from the index
+        (
+            f"table public.books: DELETE: id[uuid]:'{BOOK_ID}'",
+            {"deleted_book_ids": {BOOK_ID}},
+        ),
+        # changes of tables which are not indexed are skipped
+        (
+            f"table public.users: INSERT: id[uuid]:'{BOOK_ID}'",
+            {},
+        ),
+    ),
+)
+def test_apply_change(
+    payload: str,
+    expected: dict[str, set[str]],
+) -> None:
+    producer = ReplicationProducer(slot_name="es_etl", wait_sec=0)
+    ids_by_topic: dict[str, set[str]] = defaultdict(set)
+
+    producer.apply_change(payload, ids_by_topic)
+
+    assert ids_by_topic == expected
+
+
+def test_keep_alive_sends_feedback_once_due() -> None:
+    producer = ReplicationProducer(slot_name="es_etl", wait_sec=0, feedback_interval_sec=60)
+    producer.cursor = FakeReplicationCursor()  # type: ignore
+
+    producer.keep_alive()
+    assert producer.cursor.feedbacks == [0]  # type: ignore
+
+    # the interval has not passed since the last feedback
+    producer.keep_alive()
+    assert producer.cursor.feedbacks == [0]  # type: ignore
+
+    # the slot being read sends feedback itself
+    producer.last_feedback_at = 0
+    with producer.lock:
+        producer.keep_alive()
+    assert producer.cursor.feedbacks == [0]  # type: ignore
@@ -1,31 +1,70 @@
+import asyncio
+import hashlib
 import http
 import time
-from typing import Annotated
+from collections import OrderedDict
+from typing import Annotated, Any, Awaitable, Callable, Generic, Hashable, TypeVar
 
-from aiohttp import ClientSession
-from aiohttp.client_exceptions import ClientConnectorError
+from aiohttp import ClientError, ClientSession
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import (
     HTTPBearer,
 )
 from jose import (
+    JWTError,
     jwt,
 )
+from opentelemetry import metrics
+from src.common.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
 from src.common.clients import get_http_session
+from src.common.hedging import LatencyTracker, hedge
+from src.common.jwks import get_jwks_client
+from src.common.revocation import RevokedTokensReplica, get_revoked_tokens_replica
 from src.common.schemas import JwtClaims
 
 from src.common.exceptions import AuthIsUnavailableError
 from src.settings.app import AppSettings
+from src.settings.auth import AuthVerificationMode
 
 settings = AppSettings()
 
+T = TypeVar("T")
+
 HttpSession = Annotated[ClientSession, Depends(get_http_session)]
+RevokedTokens = Annotated[RevokedTokensReplica | None, Depends(get_revoked_tokens_replica)]
+
+
+VerificationKey = str | dict[str, Any]
+
+
+def hash_token(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
 
+async def get_verification_key(token: str, session: ClientSession) -> VerificationKey | None:
+    """Get key to verify the token signature with.
+
+    The shared secret is used for HS* algorithms, otherwise the public key is looked up
+    in the auth JWKS by the kid (key id) from the token header.
+    """
+    if settings.auth.is_symmetric:
+        return settings.auth.jwt_secret_key
 
-def decode_token(token: str) -> JwtClaims | None:
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except JWTError:
+        return None
+
+    if kid is None:
+        return None
+
+    return await get_jwks_client().get_key(kid, session)
+
+
+def decode_token(token: str, key: VerificationKey | None = None) -> JwtClaims | None:
     try:
         decoded_token = jwt.decode(
-            token, settings.auth.jwt_secret_key, algorithms=[settings.auth.jwt_encoding_algorithm]
+            token, key or settings.auth.jwt_secret_key, algorithms=[settings.auth.jwt_encoding_algorithm]
         )
         jwt_claims = JwtClaims(**decoded_token)
         return jwt_claims if jwt_claims.exp >= time.time() else None
@@ -33,35 +72,245 @@ def decode_token(token: str) -> JwtClaims | None:
         return None
 
 
-async def verify_token(token: str, session: ClientSession) -> bool:
-    url = f"{settings.auth.url}/api/v1/auth/token-verify"
+auth_circuit_breaker = CircuitBreaker(
+    name="auth",
+    failure_threshold=settings.auth.circuit_breaker_failure_threshold,
+    recovery_timeout_sec=settings.auth.circuit_breaker_recovery_timeout_sec,
+    half_open_max_calls=settings.auth.circuit_breaker_half_open_max_calls,
+    failure_exceptions=(ClientError, asyncio.TimeoutError),
+)
+auth_latency = LatencyTracker(window_size=settings.auth.hedging_window_size)
+hedged_requests = 0
+
+
+async def request_token_verification(url: str, token: str, session: ClientSession) -> bool:
+    """Verify token by a single auth replica, errors on the auth side are raised."""
     payload = {"token_string": token}
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {token}",
     }
+    started_at = time.monotonic()
+    async with session.post(
+        f"{url}/api/v1/auth/token-verify",
+        json=payload,
+        headers=headers,
+        timeout=settings.auth.request_timeout_sec,
+    ) as response:
+        if response.status >= http.HTTPStatus.INTERNAL_SERVER_ERROR:
+            response.raise_for_status()
+        if response.status != http.HTTPStatus.OK:
+            return False
+
+        data = await response.json()
+
+    auth_latency.observe(time.monotonic() - started_at)
+    return data.get("status") == "valid"
+
+
+def get_hedging_delay() -> float:
+    latency = auth_latency.quantile(settings.auth.hedging_quantile)
+    if latency is None:
+        # no hedging until there are enough samples to estimate the latency
+        return settings.auth.request_timeout_sec
+    return max(latency, settings.auth.hedging_min_delay_sec)
+
+
+async def request_hedged_token_verification(token: str, session: ClientSession) -> bool:
+    global hedged_requests
+
+    urls = [settings.auth.url, *(settings.auth.hedging_urls or [settings.auth.url])]
+    is_valid, started = await hedge(
+        [lambda url=url: request_token_verification(url, token, session) for url in urls],
+        delay_sec=get_hedging_delay(),
+    )
+    hedged_requests += started - 1
+    return is_valid
+
+
+async def verify_token(token: str, session: ClientSession) -> bool:
+    async def request() -> bool:
+        if settings.auth.hedging_enabled:
+            return await request_hedged_token_verification(token, session)
+        return await request_token_verification(settings.auth.url, token, session)
+
     try:
-        async with session.post(
-            url,
-            json=payload,
-            headers=headers,
-            timeout=settings.auth.request_timeout_sec,
-        ) as response:
-            if response.status != http.HTTPStatus.OK:
-                return False
-
-            data = await response.json()
-    except ClientConnectorError as e:
+        return await auth_circuit_breaker.call(request)
+    except (CircuitOpenError, ClientError, asyncio.TimeoutError) as e:
         raise AuthIsUnavailableError() from e
 
-    return data.get("status") == "valid"
+
+def verify_token_locally(
+    token: str, key: VerificationKey, revoked_tokens: RevokedTokensReplica
+) -> JwtClaims | None:
+    """Verify token signature and expiration locally and check it against the revoked tokens replica."""
+    decoded_token = decode_token(token, key)
+    if not decoded_token or not decoded_token.type == "access":
+        return None
+
+    if revoked_tokens.is_revoked(
+        decoded_token.access_jti,
+        decoded_token.refresh_jti,
+        user_id=decoded_token.user.id,
+        generation=decoded_token.generation,
+    ):
+        return None
+
+    return decoded_token
+
+
+class VerifiedTokensCache:
+    """In-process LRU cache of positively verified tokens.
+
+    Tokens are keyed by their SHA-256 hash and stored together with the parsed claims,
+    so repeated requests with the same token skip both verification and decoding.
+    An entry lives for `ttl_sec` but never longer than the token itself, hence `ttl_sec`
+    bounds how long a revoked token may still be accepted by this process.
+    """
+
+    def __init__(self, max_size: int, ttl_sec: float) -> None:
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, JwtClaims]] = OrderedDict()
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_sec > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> JwtClaims | None:
+        if not self.is_enabled:
+            return None
+
+        key = hash_token(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        (expires_at, claims) = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def set(self, token: str, claims: JwtClaims) -> None:
+        if not self.is_enabled:
+            return
+
+        key = hash_token(token)
+        self._entries[key] = (min(time.time() + self.ttl_sec, claims.exp), claims)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        self._entries.pop(hash_token(token), None)
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls with the same key into a single in-flight call.
+
+    The shared call is shielded, so a cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(call)
+
+
+verified_tokens = VerifiedTokensCache(
+    max_size=settings.auth.verified_tokens_cache_max_size,
+    ttl_sec=settings.auth.verified_tokens_cache_ttl_sec,
+)
+tokens_verification: SingleFlight[JwtClaims | None] = SingleFlight()
+
+meter = metrics.get_meter(__name__)
+meter.create_observable_counter(
+    "auth.verified_tokens_cache.hits",
+    callbacks=[lambda _: [metrics.Observation(verified_tokens.hits)]],
+    description="Number of tokens found in the verified tokens cache",
+)
+meter.create_observable_counter(
+    "auth.verified_tokens_cache.misses",
+    callbacks=[lambda _: [metrics.Observation(verified_tokens.misses)]],
+    description="Number of tokens not found in the verified tokens cache",
+)
+meter.create_observable_gauge(
+    "auth.verified_tokens_cache.size",
+    callbacks=[lambda _: [metrics.Observation(len(verified_tokens))]],
+    description="Number of tokens in the verified tokens cache",
+)
+meter.create_observable_gauge(
+    "auth.tokens_verification.in_flight",
+    callbacks=[lambda _: [metrics.Observation(len(tokens_verification))]],
+    description="Number of distinct tokens being verified at the moment",
+)
+meter.create_observable_gauge(
+    "auth.circuit_breaker.state",
+    callbacks=[
+        lambda _: [
+            metrics.Observation(int(auth_circuit_breaker.state == state), {"state": state.value})
+            for state in CircuitState
+        ]
+    ],
+    description="Current state of the auth circuit breaker",
+)
+meter.create_observable_counter(
+    "auth.circuit_breaker.rejected",
+    callbacks=[lambda _: [metrics.Observation(auth_circuit_breaker.rejected)]],
+    description="Number of auth requests rejected by the open circuit breaker",
+)
+meter.create_observable_counter(
+    "auth.hedging.hedged_requests",
+    callbacks=[lambda _: [metrics.Observation(hedged_requests)]],
+    description="Number of extra auth requests sent by hedging",
+)
+meter.create_observable_gauge(
+    "auth.hedging.delay",
+    callbacks=[lambda _: [metrics.Observation(get_hedging_delay())]],
+    description="Current delay before sending a hedged auth request, in seconds",
+)
+
+
+def is_locally_revoked(claims: JwtClaims, revoked_tokens: RevokedTokensReplica | None) -> bool:
+    if revoked_tokens is None or not revoked_tokens.is_synced:
+        return False
+    return revoked_tokens.is_revoked(
+        claims.access_jti, claims.refresh_jti, user_id=claims.user.id, generation=claims.generation
+    )
 
 
 class JWTBearer(HTTPBearer):
     def __init__(self, auto_error: bool = True):
         super().__init__(auto_error=auto_error)
 
-    async def __call__(self, request: Request, session: HttpSession) -> JwtClaims:  # type: ignore
+    async def __call__(  # type: ignore
+        self,
+        request: Request,
+        session: HttpSession,
+        revoked_tokens: RevokedTokens,
+    ) -> JwtClaims:
         credentials = await super().__call__(request)
         if not credentials:
             raise HTTPException(
@@ -75,21 +324,44 @@ class JWTBearer(HTTPBearer):
                 detail="Only Bearer token might be accepted",
             )
 
-        if not await verify_token(
-            credentials.credentials,
-            session,
-        ):
-            raise HTTPException(
-                status_code=http.HTTPStatus.FORBIDDEN,
-                detail="Invalid or expired token.",
-            )
-
-        decoded_token = decode_token(credentials.credentials)
+        token = credentials.credentials
+        if cached_token := verified_tokens.get(token):
+            if not is_locally_revoked(cached_token, revoked_tokens):
+                return cached_token
+            verified_tokens.discard(token)
 
+        # concurrent requests with the same token share a single verification
+        decoded_token = await tokens_verification.do(
+            hash_token(token),
+            lambda: self.verify(token, session, revoked_tokens),
+        )
         if not decoded_token:
             raise HTTPException(
                 status_code=http.HTTPStatus.FORBIDDEN,
                 detail="Invalid or expired token.",
             )
 
+        verified_tokens.set(token, decoded_token)
         return decoded_token
+
+    async def verify(
+        self,
+        token: str,
+        session: ClientSession,
+        revoked_tokens: RevokedTokensReplica | None,
+    ) -> JwtClaims | None:
+        key = await get_verification_key(token, session)
+        if key is None:
+            return None
+
+        if (
+            settings.auth.verification_mode == AuthVerificationMode.local
+            and revoked_tokens is not None
+            and revoked_tokens.is_synced
+        ):
+            return verify_token_locally(token, key, revoked_tokens)
+
+        if not await verify_token(token, session):
+            return None
+
+        return decode_token(token, key)
@@ -0,0 +1,115 @@
+import logging
+import time
+from enum import StrEnum
+from typing import Awaitable, Callable, TypeVar
+
+from src.common.exceptions import AppBaseError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitState(StrEnum):
+    # calls go through, consecutive failures are counted
+    closed = "closed"
+    # calls are rejected right away until the recovery timeout passes
+    open = "open"
+    # a limited number of probe calls go through to check whether the service has recovered
+    half_open = "half_open"
+
+
+class CircuitOpenError(AppBaseError):
+    pass
+
+
+class CircuitBreaker:
+    """Stop calling a failing service for a while instead of waiting for every call to time out.
+
+    The circuit opens after `failure_threshold` consecutive failures. Once `recovery_timeout_sec`
+    has passed it becomes half-open and lets up to `half_open_max_calls` probes through:
+    a successful probe closes the circuit, a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_timeout_sec: float,
+        half_open_max_calls: int = 1,
+        failure_exceptions: tuple[type[BaseException], ...] = (Exception,),
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout_sec = recovery_timeout_sec
+        self.half_open_max_calls = half_open_max_calls
+        self.failure_exceptions = failure_exceptions
+
+        self.rejected = 0
+        self._state = CircuitState.closed
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    @property
+    def state(self) -> CircuitState:
+        is_recovery_timeout_passed = time.monotonic() - self._opened_at >= self.recovery_timeout_sec
+        if self._state == CircuitState.open and is_recovery_timeout_passed:
+            self._set_state(CircuitState.half_open)
+        return self._state
+
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        if not self.is_enabled:
+            return await func()
+
+        self._before_call()
+        is_probe = self._state == CircuitState.half_open
+        try:
+            result = await func()
+        except self.failure_exceptions:
+            self._on_failure()
+            raise
+        finally:
+            if is_probe:
+                self._probes -= 1
+
+        self._on_success()
+        return result
+
+    def _before_call(self) -> None:
+        state = self.state
+        if state == CircuitState.open or (
+            state == CircuitState.half_open and self._probes >= self.half_open_max_calls
+        ):
+            self.rejected += 1
+            raise CircuitOpenError(f"Circuit {self.name} is {state}")
+
+        if state == CircuitState.half_open:
+            self._probes += 1
+
+    def _on_success(self) -> None:
+        self._failures = 0
+        if self._state != CircuitState.closed:
+            self._set_state(CircuitState.closed)
+
+    def _on_failure(self) -> None:
+        self._failures += 1
+        if self._state == CircuitState.half_open or (
+            self._state == CircuitState.closed and self._failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._set_state(CircuitState.open)
+
+    def _set_state(self, state: CircuitState) -> None:
+        logger.warning(
+            "Circuit %s changed state from %s to %s, consecutive failures: %s",
+            self.name,
+            self._state,
+            state,
+            self._failures,
+        )
+        self._state = state
@@ -1,11 +1,103 @@
-from typing import (
-    AsyncGenerator,
+from dataclasses import dataclass
+
+from aiohttp import ClientSession, TCPConnector
+from opentelemetry import metrics
+
+from src.settings.app import get_app_settings
+
+settings = get_app_settings()
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    limit: int
+    # connections currently used by requests
+    acquired: int
+    # keep-alive connections waiting to be reused
+    idle: int
+
+    @property
+    def utilisation(self) -> float:
+        return self.acquired / self.limit if self.limit else 0.0
+
+
+class HttpClient:
+    """Process-wide aiohttp session sharing one keep-alive connection pool.
+
+    The session is opened on startup and closed on shutdown of the application,
+    so connections (and resolved addresses) to the auth service are reused between requests.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        limit_per_host: int,
+        ttl_dns_cache_sec: int | None,
+        keepalive_timeout_sec: float,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache_sec = ttl_dns_cache_sec
+        self.keepalive_timeout_sec = keepalive_timeout_sec
+        self._session: ClientSession | None = None
+
+    @property
+    def session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            self.open()
+        return self._session
+
+    def open(self) -> None:
+        connector = TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache_sec,
+            keepalive_timeout=self.keepalive_timeout_sec,
+        )
+        self._session = ClientSession(connector=connector)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def pool_stats(self) -> PoolStats:
+        if self._session is None or self._session.closed:
+            return PoolStats(limit=self.limit, acquired=0, idle=0)
+
+        # aiohttp has no public API for the pool state, so its bookkeeping is read directly
+        connector = self._session.connector
+        return PoolStats(
+            limit=connector.limit,
+            acquired=len(connector._acquired),
+            idle=sum(len(conns) for conns in connector._conns.values()),
+        )
+
+
+http_client = HttpClient(
+    limit=settings.http_client.limit,
+    limit_per_host=settings.http_client.limit_per_host,
+    ttl_dns_cache_sec=settings.http_client.ttl_dns_cache_sec,
+    keepalive_timeout_sec=settings.http_client.keepalive_timeout_sec,
 )
 
-from aiohttp import ClientSession
+meter = metrics.get_meter(__name__)
+meter.create_observable_gauge(
+    "http_client.pool.acquired",
+    callbacks=[lambda _: [metrics.Observation(http_client.pool_stats().acquired)]],
+    description="Number of pooled connections used by requests",
+)
+meter.create_observable_gauge(
+    "http_client.pool.idle",
+    callbacks=[lambda _: [metrics.Observation(http_client.pool_stats().idle)]],
+    description="Number of pooled keep-alive connections waiting to be reused",
+)
+meter.create_observable_gauge(
+    "http_client.pool.utilisation",
+    callbacks=[lambda _: [metrics.Observation(http_client.pool_stats().utilisation)]],
+    description="Share of the connections limit used by requests",
+)
 
 
-async def get_http_session() -> AsyncGenerator[ClientSession, None]:
-    session = ClientSession()
-    yield session
-    await session.close()
+async def get_http_session() -> ClientSession:
+    return http_client.session
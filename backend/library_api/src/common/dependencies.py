@@ -8,12 +8,12 @@ from pydantic import BaseModel, Field
 
 from src.common.authorization import JWTBearer
 from src.common.enums import (
-    ServiceInternalPermission,
     ServiceInternalRoles,
     ServiceInternalActions,
     ServiceInternalSrc,
 )
 from src.common.meta_info import DefaultMetaInfo
+from src.common.permissions import PermissionChecker
 from src.common.schemas import JwtClaims
 from src.settings.app import get_app_settings
 
@@ -109,31 +109,29 @@ class FullTextSearchParams(RequestParams):
 
 
 def check_permission(src: ServiceInternalSrc, action: ServiceInternalActions) -> CheckPermissionType:
-    async def _check_permission(user_token: UserToken) -> JwtClaims:
-        if action not in user_token.user.permissions:
-            if user_token.user.role == ServiceInternalRoles.superadmin:
-                return user_token
-
-            permissions = user_token.user.permissions.get(src, [])
-
-            if ServiceInternalPermission.blocked in permissions:
-                logger.exception(f"User {user_token.user.id} has blocked permissions for service {src}.")
-                raise HTTPException(
-                    status_code=http.HTTPStatus.FORBIDDEN,
-                    detail="User does not have a permission to perform this action.",
-                )
-
-            if action.upper() not in permissions:
-                logger.exception(
-                    f"User {user_token.user.id} does not have a {action=}. Users permissions are {permissions}."
-                )
-                raise HTTPException(
-                    status_code=http.HTTPStatus.FORBIDDEN,
-                    detail="User does not have a permission to perform this action.",
-                )
+    permission_checker = PermissionChecker(src, action)
 
+    async def _check_permission(user_token: UserToken) -> JwtClaims:
+        if user_token.user.role == ServiceInternalRoles.superadmin:
             return user_token
 
+        if permission_checker.is_blocked(user_token.user.permissions):
+            logger.exception(f"User {user_token.user.id} has blocked permissions for service {src}.")
+            raise HTTPException(
+                status_code=http.HTTPStatus.FORBIDDEN,
+                detail="User does not have a permission to perform this action.",
+            )
+
+        if not permission_checker.is_granted(user_token.user.permissions):
+            logger.exception(
+                f"User {user_token.user.id} does not have a {action=}. "
+                f"Users permissions are {user_token.user.permissions.decode()}."
+            )
+            raise HTTPException(
+                status_code=http.HTTPStatus.FORBIDDEN,
+                detail="User does not have a permission to perform this action.",
+            )
+
         return user_token
 
     return _check_permission
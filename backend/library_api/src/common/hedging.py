@@ -0,0 +1,55 @@
+import asyncio
+import math
+from collections import deque
+from typing import Awaitable, Callable, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of the latest call durations."""
+
+    def __init__(self, window_size: int, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window_size)
+
+    def observe(self, duration_sec: float) -> None:
+        self._samples.append(duration_sec)
+
+    def quantile(self, q: float) -> float | None:
+        """Get q-quantile of the observed durations, None until there are enough samples."""
+        if len(self._samples) < self.min_samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+
+async def hedge(calls: Sequence[Callable[[], Awaitable[T]]], delay_sec: float) -> tuple[T, int]:
+    """Run the first call and start the next one whenever there is no result after `delay_sec`.
+
+    A failed call starts the next one right away. The first successful result wins and the
+    calls still in flight are cancelled. Returns the result and the number of calls started,
+    raises the last error if all the calls fail.
+    """
+    calls_to_start = iter(calls)
+    pending = {asyncio.ensure_future(next(calls_to_start)())}
+    started = 1
+    error: BaseException | None = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=delay_sec, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), started
+                error = task.exception()
+
+            if next_call := next(calls_to_start, None):
+                pending.add(asyncio.ensure_future(next_call()))
+                started += 1
+    finally:
+        for task in pending:
+            task.cancel()
+
+    raise error  # type: ignore[misc]
@@ -0,0 +1,82 @@
+import asyncio
+import http
+import logging
+import time
+from functools import lru_cache
+from typing import Any
+
+from aiohttp import ClientError, ClientSession
+
+from src.common.exceptions import AuthIsUnavailableError
+from src.settings.app import get_app_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_app_settings()
+
+
+class JWKSClient:
+    """Client for the auth service JWKS (JSON Web Key Set) endpoint.
+
+    Public keys are cached for `ttl_sec`. A token signed with an unknown kid (key id)
+    triggers an early refresh, so a rotated key is picked up without waiting for the TTL,
+    but not more often than once per `min_refresh_interval_sec`.
+    """
+
+    def __init__(self, url: str, ttl_sec: float, min_refresh_interval_sec: float, timeout_sec: float) -> None:
+        self.url = url
+        self.ttl_sec = ttl_sec
+        self.min_refresh_interval_sec = min_refresh_interval_sec
+        self.timeout_sec = timeout_sec
+
+        self._keys: dict[str, dict[str, Any]] = {}
+        self._fetched_at: float | None = None
+        self._refresh_attempted_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, kid: str, session: ClientSession) -> dict[str, Any] | None:
+        """Get public key (JWK) by kid."""
+        if self._is_expired() or (kid not in self._keys and self._can_refresh()):
+            await self._refresh(session)
+        return self._keys.get(kid)
+
+    def _is_expired(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at >= self.ttl_sec
+
+    def _can_refresh(self) -> bool:
+        return (
+            self._refresh_attempted_at is None
+            or time.monotonic() - self._refresh_attempted_at >= self.min_refresh_interval_sec
+        )
+
+    async def _refresh(self, session: ClientSession) -> None:
+        async with self._lock:
+            # keys might have been refreshed while waiting for the lock
+            if not self._can_refresh():
+                return
+            self._refresh_attempted_at = time.monotonic()
+
+            try:
+                async with session.get(self.url, timeout=self.timeout_sec) as response:
+                    if response.status != http.HTTPStatus.OK:
+                        raise ClientError(f"JWKS endpoint responded with {response.status}")
+                    jwks = await response.json()
+            except (ClientError, asyncio.TimeoutError) as err:
+                if not self._keys:
+                    raise AuthIsUnavailableError() from err
+                logger.warning("Failed to refresh JWKS, keep using cached keys: %s", err)
+                return
+
+            self._keys = {key["kid"]: key for key in jwks.get("keys", []) if "kid" in key}
+            self._fetched_at = time.monotonic()
+            logger.info("JWKS has been refreshed: %s keys", len(self._keys))
+
+
+@lru_cache(maxsize=1)
+def get_jwks_client() -> JWKSClient:
+    return JWKSClient(
+        url=f"{settings.auth.url}/api/v1/auth/jwks",
+        ttl_sec=settings.auth.jwks_cache_ttl_sec,
+        min_refresh_interval_sec=settings.auth.jwks_min_refresh_interval_sec,
+        timeout_sec=settings.auth.request_timeout_sec,
+    )
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class RevokedTokensReplica:
+    """Local replica of the revoked jtis (JWT IDs) maintained by the auth service.
+
+    The auth service keeps revoked jtis in a sorted set scored by their expiration
+    timestamp and announces every new revocation on a pub/sub channel. The replica
+    subscribes to the channel first and then performs a full resync from the sorted
+    set, so no revocation is lost between the two steps. The full resync is repeated
+    every time the connection to Redis is re-established.
+
+    All the tokens of a user are revoked at once by a new generation of the user's tokens,
+    generations are kept in a hash and announced on the same channel.
+    """
+
+    purge_interval_sec: float = 60.0
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        channel: str,
+        revoked_tokens_key: str,
+        tokens_generations_key: str | None = None,
+        reconnect_delay_sec: float = 1.0,
+    ) -> None:
+        self.client = redis_client
+        self.channel = channel
+        self.revoked_tokens_key = revoked_tokens_key
+        self.tokens_generations_key = tokens_generations_key
+        self.reconnect_delay_sec = reconnect_delay_sec
+
+        self._revoked: dict[str, float] = {}
+        self._generations: dict[str, int] = {}
+        self._is_synced = False
+        self._last_purge = time.monotonic()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_synced(self) -> bool:
+        """The replica holds a complete copy of the revoked jtis."""
+        return self._is_synced
+
+    def is_revoked(self, *jtis: str, user_id: str | None = None, generation: int = 0) -> bool:
+        """Check that any of the jtis is revoked or the user's tokens were revoked after their generation."""
+        if user_id is not None and generation < self._generations.get(user_id, 0):
+            return True
+
+        now = time.time()
+        for jti in jtis:
+            expires_at = self._revoked.get(jti)
+            if expires_at is not None and expires_at > now:
+                return True
+        return False
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        self._is_synced = False
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._replicate()
+            except (RedisConnectionError, RedisTimeoutError, OSError) as err:
+                self._is_synced = False
+                logger.warning("Revoked tokens replica has lost connection to Redis: %s", err)
+                await asyncio.sleep(self.reconnect_delay_sec)
+
+    async def _replicate(self) -> None:
+        pubsub = self.client.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            await self._resync()
+
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=self.purge_interval_sec,
+                )
+                if message is not None:
+                    self._apply(message["data"])
+                self._purge_expired()
+        finally:
+            self._is_synced = False
+            await pubsub.reset()
+
+    async def _resync(self) -> None:
+        revoked_tokens = await self.client.zrangebyscore(
+            self.revoked_tokens_key,
+            min=time.time(),
+            max="+inf",
+            withscores=True,
+        )
+        self._revoked = {self._decode(jti): expires_at for jti, expires_at in revoked_tokens}
+        if self.tokens_generations_key is not None:
+            generations = await self.client.hgetall(self.tokens_generations_key)
+            self._generations = {
+                self._decode(user_id): int(generation) for user_id, generation in generations.items()
+            }
+        self._is_synced = True
+        logger.info(
+            "Revoked tokens replica has been resynced: %s revoked tokens, %s users tokens generations",
+            len(self._revoked),
+            len(self._generations),
+        )
+
+    def _apply(self, data: bytes | str) -> None:
+        try:
+            revocation = orjson.loads(data)
+            if "user" in revocation:
+                user_id = revocation["user"]
+                # a resync may have already brought a newer generation
+                generation = max(self._generations.get(user_id, 0), int(revocation["generation"]))
+                self._generations[user_id] = generation
+            else:
+                self._revoked[revocation["jti"]] = float(revocation["exp"])
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+            logger.error("Malformed revocation message: %r", data)
+
+    def _purge_expired(self) -> None:
+        if time.monotonic() - self._last_purge < self.purge_interval_sec:
+            return
+
+        now = time.time()
+        self._revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now}
+        self._last_purge = time.monotonic()
+
+    @staticmethod
+    def _decode(value: bytes | str) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+
+replica: RevokedTokensReplica | None = None
+
+
+async def get_revoked_tokens_replica() -> RevokedTokensReplica | None:
+    return replica
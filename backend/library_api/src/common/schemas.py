@@ -3,17 +3,22 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
+from src.common.permissions import EncodedPermissions
+
 
 class JwtUserSchema(BaseModel):
     id: str
     role: str
-    permissions: dict[str, list[str]]
+    # accepts a mapping of src to the list of permissions as well
+    permissions: EncodedPermissions
 
 
 class JwtClaims(BaseModel):
     user: JwtUserSchema
     access_jti: str
     refresh_jti: str
+    # generation of the user's tokens at the time of issue
+    generation: int = 0
     type: str
     exp: int
     iat: int
@@ -16,10 +16,12 @@ from redis import asyncio as aioredis
 from src.authors.api.v1 import router as author_router
 from src.books.api.v1 import router as book_router
 from src.categories.api.v1 import router as category_router
-from src.common import database
+from src.common import clients, database, revocation
+from src.common.revocation import RevokedTokensReplica
 from src.common.utils import ESHandler
 from src.settings.app import get_app_settings
-from src.tracer.config import configure_tracer
+from src.settings.auth import AuthVerificationMode
+from src.tracer.config import configure_meter, configure_tracer
 
 settings = get_app_settings()
 logging.config.dictConfig(settings.logging.config)
@@ -32,7 +34,20 @@ async def lifespan(app: FastAPI):
     FastAPICache.init(RedisBackend(database.redis), prefix="fastapi-cache")
     await FastAPILimiter.init(database.redis)
     database.init_database(settings)
+    clients.http_client.open()
+    if settings.auth.verification_mode == AuthVerificationMode.local:
+        revocation.replica = RevokedTokensReplica(
+            redis_client=database.redis,
+            channel=settings.auth.revocation_channel,
+            revoked_tokens_key=settings.auth.revoked_tokens_key,
+            tokens_generations_key=settings.auth.tokens_generations_key,
+            reconnect_delay_sec=settings.auth.revocation_reconnect_delay_sec,
+        )
+        await revocation.replica.start()
     yield
+    if revocation.replica is not None:
+        await revocation.replica.stop()
+    await clients.http_client.close()
     await database.redis.close()
 
 
@@ -86,6 +101,7 @@ add_pagination(app)
 
 if settings.jaeger.enabled:
     configure_tracer(app)
+    configure_meter()
 
 if __name__ == "__main__":
     uvicorn.run(
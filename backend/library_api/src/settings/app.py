@@ -9,6 +9,7 @@ from src.settings.author import AuthorSettings
 from src.settings.books import BooksSettings
 from src.settings.category import CategorySettings
 from src.settings.db import ElasticSettings, RedisSettings, PostgresSettings
+from src.settings.http_client import HttpClientSettings
 from src.settings.jaeger import JaegerSettings
 from src.settings.logging import LoggingSettings
 from src.settings.service import ServiceSettings
@@ -35,6 +36,7 @@ class AppSettings(BaseSettings):
     category: CategorySettings
     books: BooksSettings
     author: AuthorSettings
+    http_client: HttpClientSettings = Field(default_factory=HttpClientSettings)
 
 
 @lru_cache(maxsize=1)
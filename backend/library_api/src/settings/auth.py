@@ -1,8 +1,56 @@
+from enum import StrEnum
+
 from pydantic import Field, BaseModel
 
 
+class AuthVerificationMode(StrEnum):
+    # every token is verified by the auth service
+    remote = "remote"
+    # signature and expiration are checked locally, revocations come from the local replica
+    local = "local"
+
+
 class AuthSettings(BaseModel):
     url: str = Field(alias="auth_url")
     jwt_encoding_algorithm: str = Field(alias="auth_jwt_encoding_algorithm", default="HS256")
-    jwt_secret_key: str = Field(alias="auth_jwt_secret_key")
+    # HS* algorithms only, asymmetric ones fetch public keys from the auth JWKS endpoint
+    jwt_secret_key: str | None = Field(alias="auth_jwt_secret_key", default=None)
     request_timeout_sec: int = Field(alias="auth_request_timeout_sec", default=5)
+
+    verification_mode: AuthVerificationMode = Field(
+        alias="auth_verification_mode", default=AuthVerificationMode.remote
+    )
+    revoked_tokens_key: str = Field(alias="auth_revoked_tokens_key", default="auth:revoked-tokens")
+    revocation_channel: str = Field(alias="auth_revocation_channel", default="auth:revoked-tokens")
+    tokens_generations_key: str = Field(
+        alias="auth_tokens_generations_key", default="auth:tokens-generations"
+    )
+    revocation_reconnect_delay_sec: float = Field(alias="auth_revocation_reconnect_delay_sec", default=1.0)
+
+    jwks_cache_ttl_sec: float = Field(alias="auth_jwks_cache_ttl_sec", default=300)
+    jwks_min_refresh_interval_sec: float = Field(alias="auth_jwks_min_refresh_interval_sec", default=5)
+
+    # positively verified tokens are cached for up to `ttl` seconds, 0 disables the cache
+    verified_tokens_cache_ttl_sec: float = Field(alias="auth_verified_tokens_cache_ttl_sec", default=5)
+    verified_tokens_cache_max_size: int = Field(alias="auth_verified_tokens_cache_max_size", default=10_000)
+
+    # the auth client stops calling auth after `threshold` consecutive failures, 0 disables the breaker
+    circuit_breaker_failure_threshold: int = Field(alias="auth_circuit_breaker_failure_threshold", default=5)
+    circuit_breaker_recovery_timeout_sec: float = Field(
+        alias="auth_circuit_breaker_recovery_timeout_sec", default=10
+    )
+    circuit_breaker_half_open_max_calls: int = Field(
+        alias="auth_circuit_breaker_half_open_max_calls", default=1
+    )
+
+    # a second verification request is sent when the first one is slower than the latency quantile
+    hedging_enabled: bool = Field(alias="auth_hedging_enabled", default=False)
+    # replicas to send hedged requests to, the main url is used when empty
+    hedging_urls: list[str] = Field(alias="auth_hedging_urls", default_factory=list)
+    hedging_quantile: float = Field(alias="auth_hedging_quantile", default=0.95)
+    hedging_min_delay_sec: float = Field(alias="auth_hedging_min_delay_sec", default=0.01)
+    hedging_window_size: int = Field(alias="auth_hedging_window_size", default=1000)
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.jwt_encoding_algorithm.startswith("HS")
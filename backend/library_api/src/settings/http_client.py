@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+
+class HttpClientSettings(BaseModel):
+    # total number of simultaneous connections, 0 means no limit
+    limit: int = Field(alias="http_client_limit", default=100)
+    # number of simultaneous connections to the same host, 0 means no limit
+    limit_per_host: int = Field(alias="http_client_limit_per_host", default=0)
+    # resolved addresses are cached for `ttl` seconds, None caches them forever
+    ttl_dns_cache_sec: int | None = Field(alias="http_client_ttl_dns_cache_sec", default=10)
+    keepalive_timeout_sec: float = Field(alias="http_client_keepalive_timeout_sec", default=15)
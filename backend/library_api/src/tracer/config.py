@@ -1,7 +1,9 @@
 from fastapi import FastAPI
-from opentelemetry import trace
+from opentelemetry import metrics, trace
 from opentelemetry.exporter.jaeger.thrift import JaegerExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import SERVICE_NAME, Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
@@ -21,3 +23,12 @@ def configure_tracer(app: FastAPI) -> None:
     )
     trace.get_tracer_provider().add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
     FastAPIInstrumentor.instrument_app(app)
+
+
+def configure_meter() -> None:
+    metrics.set_meter_provider(
+        MeterProvider(
+            resource=Resource.create({SERVICE_NAME: settings.jaeger.service_name}),
+            metric_readers=[PeriodicExportingMetricReader(ConsoleMetricExporter())],
+        )
+    )
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from src.common.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+from src.common.hedging import (
+    LatencyTracker,
+    hedge,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def respond(value: int, delay_sec: float = 0) -> int:
+    await asyncio.sleep(delay_sec)
+    return value
+
+
+async def fail() -> int:
+    raise ConnectionError()
+
+
+async def test_circuit_breaker_opens_and_recovers_with_probe():
+    breaker = CircuitBreaker(name="test", failure_threshold=2, recovery_timeout_sec=0.1)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+    assert breaker.state == CircuitState.open
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(lambda: respond(1))
+    assert breaker.rejected == 1
+
+    await asyncio.sleep(0.1)
+    assert breaker.state == CircuitState.half_open
+    assert await breaker.call(lambda: respond(1)) == 1
+    assert breaker.state == CircuitState.closed
+
+
+async def test_circuit_breaker_reopens_on_failed_probe():
+    breaker = CircuitBreaker(name="test", failure_threshold=1, recovery_timeout_sec=0.1)
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+    await asyncio.sleep(0.1)
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+    assert breaker.state == CircuitState.open
+
+
+@pytest.mark.parametrize(
+    "calls, expected_result",
+    [
+        ((lambda: respond(1, 0.01), lambda: respond(2, 1)), (1, 1)),
+        ((lambda: respond(1, 1), lambda: respond(2, 0.01)), (2, 2)),
+        ((fail, lambda: respond(2)), (2, 2)),
+    ],
+)
+async def test_hedge(calls, expected_result):
+    assert await hedge(calls, delay_sec=0.05) == expected_result
+
+
+async def test_hedge_all_calls_failed():
+    with pytest.raises(ConnectionError):
+        await hedge([fail, fail], delay_sec=0.05)
+
+
+def test_latency_tracker_quantile():
+    latency = LatencyTracker(window_size=100, min_samples=10)
+    assert latency.quantile(0.95) is None
+
+    for duration_sec in range(1, 101):
+        latency.observe(duration_sec)
+    assert latency.quantile(0.95) == 95
@@ -0,0 +1,39 @@
+import pytest
+from aiohttp import (
+    web,
+)
+from aiohttp.test_utils import (
+    TestServer,
+)
+
+from src.common.clients import (
+    HttpClient,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+async def ping(request: web.Request) -> web.Response:
+    return web.json_response({"ping": "pong!"})
+
+
+async def test_http_client_reuses_pooled_connections():
+    app = web.Application()
+    app.router.add_get("/ping", ping)
+    http_client = HttpClient(limit=10, limit_per_host=2, ttl_dns_cache_sec=10, keepalive_timeout_sec=15)
+
+    async with TestServer(app) as server:
+        session = http_client.session
+        for _ in range(3):
+            async with session.get(server.make_url("/ping")) as response:
+                assert response.status == 200
+                assert http_client.pool_stats().acquired == 1
+
+            assert http_client.session is session
+            assert http_client.pool_stats().acquired == 0
+            assert http_client.pool_stats().idle == 1
+
+        assert http_client.pool_stats().limit == 10
+        await http_client.close()
+
+    assert http_client.pool_stats().idle == 0
@@ -0,0 +1,41 @@
+import pytest
+
+from src.common.enums import (
+    ServiceInternalActions,
+    ServiceInternalSrc,
+)
+from src.common.permissions import (
+    EncodedPermissions,
+    PermissionChecker,
+)
+from src.common.schemas import (
+    JwtUserSchema,
+)
+
+
+@pytest.mark.parametrize(
+    "claim, src, action, is_granted, is_blocked",
+    [
+        ({"books": ["READ"]}, ServiceInternalSrc.books, ServiceInternalActions.read, True, False),
+        ({"books": ["READ"]}, ServiceInternalSrc.books, ServiceInternalActions.delete, False, False),
+        ({"books": ["BLOCKED"]}, ServiceInternalSrc.books, ServiceInternalActions.read, False, True),
+        ({"v": 1, "m": 0b1000000000000000}, ServiceInternalSrc.books, ServiceInternalActions.read, True, False),
+        ({"v": 1, "m": 0, "x": {"custom_src": 1}}, "custom_src", ServiceInternalActions.read, True, False),
+        ({"v": 999, "m": 0b1000000000000000}, ServiceInternalSrc.books, ServiceInternalActions.read, False, False),
+    ],
+)
+def test_permission_checker(claim: dict, src: str, action: str, is_granted: bool, is_blocked: bool) -> None:
+    permission_checker = PermissionChecker(src, action)
+    user = JwtUserSchema(id="user", role="guest", permissions=claim)
+
+    assert permission_checker.is_granted(user.permissions) is is_granted
+    assert permission_checker.is_blocked(user.permissions) is is_blocked
+
+
+def test_encoded_permissions_claim_is_compact() -> None:
+    permissions = {src: ["READ", "CREATE", "UPDATE", "DELETE"] for src in ServiceInternalSrc}
+
+    claim = EncodedPermissions.model_validate(permissions).model_dump()
+
+    assert claim.keys() == {"v", "m"}
+    assert EncodedPermissions.model_validate(claim).decode() == permissions
@@ -0,0 +1,95 @@
+import asyncio
+from time import (
+    time,
+)
+
+import orjson
+import pytest
+from redis import (
+    asyncio as aioredis,
+)
+
+from src.common.revocation import (
+    RevokedTokensReplica,
+)
+from src.settings.app import (
+    get_app_settings,
+)
+
+settings = get_app_settings()
+
+pytestmark = pytest.mark.asyncio
+
+REVOKED_TOKENS_KEY = "test:revoked-tokens"
+REVOCATION_CHANNEL = "test:revoked-tokens"
+TOKENS_GENERATIONS_KEY = "test:tokens-generations"
+
+
+async def wait_for(condition, timeout_sec: float = 2.0) -> bool:
+    deadline = time() + timeout_sec
+    while time() < deadline:
+        if condition():
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+async def test_revoked_tokens_replica_resync_and_updates():
+    client = aioredis.from_url(settings.redis.dsn, encoding="utf-8")
+    await client.delete(REVOKED_TOKENS_KEY)
+    await client.zadd(REVOKED_TOKENS_KEY, {"revoked": time() + 600, "expired": time() - 1})
+
+    replica = RevokedTokensReplica(
+        redis_client=client,
+        channel=REVOCATION_CHANNEL,
+        revoked_tokens_key=REVOKED_TOKENS_KEY,
+    )
+    await replica.start()
+
+    try:
+        assert await wait_for(lambda: replica.is_synced)
+        assert replica.is_revoked("revoked")
+        assert not replica.is_revoked("expired")
+        assert not replica.is_revoked("revoked-later")
+
+        await client.publish(
+            REVOCATION_CHANNEL,
+            orjson.dumps({"jti": "revoked-later", "exp": int(time()) + 600}),
+        )
+
+        assert await wait_for(lambda: replica.is_revoked("revoked-later"))
+    finally:
+        await replica.stop()
+        await client.delete(REVOKED_TOKENS_KEY)
+        await client.close()
+
+    assert not replica.is_synced
+
+
+async def test_revoked_tokens_replica_users_generations():
+    client = aioredis.from_url(settings.redis.dsn, encoding="utf-8")
+    await client.delete(REVOKED_TOKENS_KEY, TOKENS_GENERATIONS_KEY)
+    await client.hset(TOKENS_GENERATIONS_KEY, "user", 1)
+
+    replica = RevokedTokensReplica(
+        redis_client=client,
+        channel=REVOCATION_CHANNEL,
+        revoked_tokens_key=REVOKED_TOKENS_KEY,
+        tokens_generations_key=TOKENS_GENERATIONS_KEY,
+    )
+    await replica.start()
+
+    try:
+        assert await wait_for(lambda: replica.is_synced)
+        assert replica.is_revoked("jti", user_id="user", generation=0)
+        assert not replica.is_revoked("jti", user_id="user", generation=1)
+        assert not replica.is_revoked("jti", user_id="another-user", generation=0)
+
+        await client.publish(REVOCATION_CHANNEL, orjson.dumps({"user": "user", "generation": 2}))
+
+        assert await wait_for(lambda: replica.is_revoked("jti", user_id="user", generation=1))
+        assert not replica.is_revoked("jti", user_id="user", generation=2)
+    finally:
+        await replica.stop()
+        await client.delete(REVOKED_TOKENS_KEY, TOKENS_GENERATIONS_KEY)
+        await client.close()